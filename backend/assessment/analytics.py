@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Count
+from django.db.models.functions import ExtractHour, TruncWeek
+from django.utils import timezone
+
+ANALYSIS_CACHE_TIMEOUT = 300  # Seconds
+
+# Unnest a JSON array column of a subquery and count its elements
+_TRIGGER_SQL = {
+    'postgresql': (
+        "SELECT t.value, COUNT(*) AS cnt FROM ({subquery}) s "
+        "CROSS JOIN LATERAL jsonb_array_elements_text(s.triggers) AS t(value) "
+        "WHERE jsonb_typeof(s.triggers) = 'array' "
+        "GROUP BY t.value ORDER BY cnt DESC, t.value LIMIT %s"
+    ),
+    'sqlite': (
+        "SELECT t.value, COUNT(*) AS cnt FROM ({subquery}) s, json_each(s.triggers) t "
+        "WHERE json_type(s.triggers) = 'array' "
+        "GROUP BY t.value ORDER BY cnt DESC, t.value LIMIT %s"
+    ),
+}
+
+
+def common_triggers(behaviors, limit=5):
+    """Most frequent triggers across the behaviors' JSON trigger lists"""
+    sql = _TRIGGER_SQL.get(connection.vendor)
+    if sql is not None:
+        subquery, params = behaviors.values('triggers').query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(sql.format(subquery=subquery), (*params, limit))
+            return [row[0] for row in cursor.fetchall()]
+
+    # Portable fallback: stream only the triggers column
+    trigger_counts = {}
+    for triggers in behaviors.values_list('triggers', flat=True).iterator():
+        for trigger in triggers or []:
+            trigger_counts[trigger] = trigger_counts.get(trigger, 0) + 1
+    ranked = sorted(trigger_counts.items(), key=lambda x: (-x[1], str(x[0])))
+    return [trigger for trigger, _ in ranked[:limit]]
+
+
+def hourly_histogram(behaviors):
+    """Number of behaviors logged per hour of day"""
+    rows = behaviors.annotate(
+        hour=ExtractHour('logged_at')
+    ).values('hour').annotate(count=Count('id')).order_by('hour')
+    return {row['hour']: row['count'] for row in rows}
+
+
+def weekly_trends(behaviors, weeks=4):
+    """Behavior counts for the last ``weeks`` calendar weeks, oldest first"""
+    current_week = timezone.localdate() - timedelta(days=timezone.localdate().weekday())
+    first_week = current_week - timedelta(weeks=weeks - 1)
+
+    rows = behaviors.filter(
+        logged_at__date__gte=first_week
+    ).annotate(
+        week=TruncWeek('logged_at')
+    ).values('week').annotate(count=Count('id'))
+    counts = {row['week'].date(): row['count'] for row in rows}
+
+    trends = []
+    for i in range(weeks):
+        week_start = first_week + timedelta(weeks=i)
+        trends.append({
+            'week': f'Week {i+1}',
+            'count': counts.get(week_start, 0),
+            'start_date': week_start
+        })
+    return trends
+
+
+def _version_key(user_id):
+    return f'behavior_analysis:version:{user_id}'
+
+
+def analysis_cache_key(user_id, days):
+    version = cache.get_or_set(_version_key(user_id), 1, None)
+    return f'behavior_analysis:{user_id}:{days}:{version}'
+
+
+def invalidate_behavior_analysis(user_id):
+    """Expire every cached analysis window of a user"""
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        cache.set(_version_key(user_id), 2, None)
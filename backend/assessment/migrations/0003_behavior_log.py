@@ -0,0 +1,36 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:47
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assessment', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BehaviorLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('behavior_type', models.CharField(max_length=50)),
+                ('intensity', models.IntegerField(help_text='1 (mild) to 5 (severe)')),
+                ('duration', models.IntegerField(blank=True, help_text='Duration in minutes', null=True)),
+                ('triggers', models.JSONField(blank=True, default=list, help_text='List of trigger names')),
+                ('location', models.CharField(blank=True, max_length=100, null=True)),
+                ('time_of_day', models.CharField(blank=True, choices=[('morning', 'Morning'), ('afternoon', 'Afternoon'), ('evening', 'Evening'), ('night', 'Night')], max_length=10, null=True)),
+                ('notes', models.TextField(blank=True, null=True)),
+                ('logged_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='behavior_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'logged_at'], name='assessment__user_id_c9d684_idx')],
+            },
+        ),
+    ]
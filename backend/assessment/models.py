@@ -1,5 +1,9 @@
+import uuid
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.conf import settings
+from django.utils import timezone
 
 class AssessmentCategory(models.Model):
     """Categories for assessments (ADHD, focus, behavior, etc.)"""
@@ -127,3 +131,58 @@ class WeeklyProgress(models.Model):
     
     def __str__(self):
         return f"{self.user.username} - Week of {self.week_start_date}"
+
+
+class BehaviorLog(models.Model):
+    """A logged episode of behavior with its context"""
+    TIME_OF_DAY_CHOICES = (
+        ('morning', 'Morning'),
+        ('afternoon', 'Afternoon'),
+        ('evening', 'Evening'),
+        ('night', 'Night'),
+    )
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='behavior_logs')
+    behavior_type = models.CharField(max_length=50)
+    intensity = models.IntegerField(help_text="1 (mild) to 5 (severe)")
+    duration = models.IntegerField(null=True, blank=True, help_text="Duration in minutes")
+    triggers = models.JSONField(default=list, blank=True, help_text="List of trigger names")
+    location = models.CharField(max_length=100, blank=True, null=True)
+    time_of_day = models.CharField(max_length=10, choices=TIME_OF_DAY_CHOICES, blank=True, null=True)
+    notes = models.TextField(blank=True, null=True)
+    logged_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['user', 'logged_at'])]
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.behavior_type} ({self.logged_at:%Y-%m-%d})"
+
+
+class ReportJob(models.Model):
+    """Background progress report generation job; a completed job holds the report"""
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    )
+    
+    job_id = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='report_jobs')
+    report_type = models.CharField(max_length=15)
+    period_start = models.DateTimeField()
+    period_end = models.DateTimeField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    result = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder, help_text="The report, immutable once completed")
+    error = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    
+    class Meta:
+        unique_together = ('user', 'report_type', 'period_start', 'period_end')
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.report_type} report ({self.status})"
@@ -0,0 +1,232 @@
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time, timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import Avg, Count, Sum
+from django.utils import timezone
+
+from utils.db_router import replica_reads
+from .models import AssessmentResult, BehaviorLog, ReportJob, UserAssessment, WeeklyProgress
+
+logger = logging.getLogger(__name__)
+
+REPORT_PERIODS = {
+    'weekly': 7,
+    'monthly': 30,
+    'quarterly': 90,
+    'yearly': 365,
+}
+
+# Pending/running jobs older than this are assumed lost (e.g. worker restart)
+JOB_STALE_AFTER = timedelta(minutes=10)
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='progress-report')
+
+
+def report_period(report_type):
+    """
+    Period covered by a report requested now.
+
+    Periods end at the next local midnight so every request for the same
+    report type on the same day maps to the same (deduplicated) job.
+    """
+    days = REPORT_PERIODS.get(report_type, REPORT_PERIODS['quarterly'])
+    tomorrow = timezone.localdate() + timedelta(days=1)
+    period_end = timezone.make_aware(datetime.combine(tomorrow, time.min))
+    return period_end - timedelta(days=days), period_end
+
+
+def _round(value):
+    return round(value, 2) if value is not None else None
+
+
+def build_progress_report(user, report_type, period_start, period_end):
+    """
+    Progress report of a user over a period: completed assessments and
+    their results, weekly progress entries and behavior logs.
+    """
+    assessments = UserAssessment.objects.filter(
+        user=user,
+        status='completed',
+        completed_at__gte=period_start,
+        completed_at__lt=period_end
+    )
+    weekly = WeeklyProgress.objects.filter(
+        user=user,
+        week_start_date__gte=timezone.localdate(period_start),
+        week_start_date__lt=timezone.localdate(period_end)
+    ).order_by('week_start_date')
+    behaviors = BehaviorLog.objects.filter(
+        user=user,
+        logged_at__gte=period_start,
+        logged_at__lt=period_end
+    )
+    
+    assessment_stats = assessments.aggregate(completed=Count('id'), avg_score=Avg('score'))
+    risk_levels = dict(
+        AssessmentResult.objects.filter(user_assessment__in=assessments)
+        .values_list('risk_level').annotate(count=Count('id')).order_by()
+    )
+    latest_result = AssessmentResult.objects.filter(
+        user_assessment__in=assessments
+    ).order_by('-user_assessment__completed_at').first()
+    weekly_stats = weekly.aggregate(
+        avg_mood=Avg('mood_average'),
+        avg_sleep=Avg('sleep_quality_average'),
+        avg_adherence=Avg('medication_adherence_rate'),
+        avg_behavior=Avg('behavior_score'),
+        focus_sessions=Sum('focus_sessions_completed'),
+        weeks=Count('id')
+    )
+    behavior_count = behaviors.count()
+    
+    # Generate insights (mood and sleep are rated 1-5)
+    strengths = []
+    improvement_areas = []
+    recommendations = []
+    avg_mood = weekly_stats['avg_mood']
+    avg_sleep = weekly_stats['avg_sleep']
+    avg_adherence = weekly_stats['avg_adherence']
+    
+    if avg_mood is not None and avg_mood >= 4:
+        strengths.append("Maintaining positive mood")
+    elif avg_mood is not None and avg_mood < 3:
+        improvement_areas.append("Mood regulation")
+        recommendations.append("Consider mood tracking and relaxation techniques")
+    
+    if avg_sleep is not None and avg_sleep < 3:
+        improvement_areas.append("Sleep quality")
+        recommendations.append("Keep a regular bedtime routine")
+    
+    if avg_adherence is not None and avg_adherence >= 90:
+        strengths.append("Consistent medication routine")
+    elif avg_adherence is not None and avg_adherence < 70:
+        improvement_areas.append("Medication adherence")
+        recommendations.append("Use medication reminders")
+    
+    if behavior_count < 5:
+        strengths.append("Low challenging behavior frequency")
+    else:
+        improvement_areas.append("Behavior management")
+        recommendations.append("Review behavior triggers and coping strategies")
+    
+    return {
+        'report_type': report_type,
+        'period_start': period_start,
+        'period_end': period_end,
+        'overall_score': _round(assessment_stats['avg_score']),
+        'strengths': strengths,
+        'improvement_areas': improvement_areas,
+        'recommendations': recommendations,
+        'generated_data': {
+            'period_stats': {
+                'assessments_completed': assessment_stats['completed'],
+                'avg_assessment_score': _round(assessment_stats['avg_score']),
+                'risk_levels': risk_levels,
+                'behavior_logs': behavior_count,
+                'weeks_tracked': weekly_stats['weeks'],
+                'focus_sessions_completed': weekly_stats['focus_sessions'] or 0,
+                'avg_mood': _round(avg_mood),
+                'avg_sleep_quality': _round(avg_sleep),
+                'avg_medication_adherence': _round(avg_adherence),
+                'avg_behavior_score': _round(weekly_stats['avg_behavior']),
+            },
+            'trends': list(weekly.values(
+                'week_start_date', 'mood_average', 'sleep_quality_average',
+                'medication_adherence_rate', 'focus_sessions_completed'
+            )),
+            'latest_category_scores': latest_result.category_scores if latest_result else {},
+            'top_behaviors': list(
+                behaviors.values('behavior_type').annotate(count=Count('id')).order_by('-count', 'behavior_type')[:3]
+            ),
+        }
+    }
+
+
+def request_report(user, report_type):
+    """
+    Get or enqueue the report job for the user's current period.
+
+    Returns ``(job, queued)``. A completed job is returned as-is so its stored
+    report is served without recomputing; failed or stale jobs are re-queued.
+    """
+    period_start, period_end = report_period(report_type)
+
+    with transaction.atomic():
+        job, created = ReportJob.objects.select_for_update().get_or_create(
+            user=user,
+            report_type=report_type,
+            period_start=period_start,
+            period_end=period_end,
+        )
+
+        stale = (
+            job.status in ('pending', 'running')
+            and job.created_at < timezone.now() - JOB_STALE_AFTER
+        )
+        if not (created or job.status == 'failed' or stale):
+            return job, False
+
+        if not created:
+            job.status = 'pending'
+            job.error = None
+            job.created_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'created_at'])
+
+        transaction.on_commit(
+            lambda: _executor.submit(run_report_job, job.pk)
+        )
+    return job, True
+
+
+def run_report_job(job_pk):
+    """Build the report of a job in a worker thread"""
+    close_old_connections()
+    try:
+        updated = ReportJob.objects.filter(pk=job_pk, status='pending').update(
+            status='running', started_at=timezone.now()
+        )
+        if not updated:
+            return
+
+        job = ReportJob.objects.select_related('user').get(pk=job_pk)
+        try:
+            # Reports only read the user's history; the report itself is
+            # written to the primary
+            with replica_reads([job.user_id]):
+                result = build_progress_report(
+                    job.user, job.report_type, job.period_start, job.period_end
+                )
+        except Exception as e:
+            logger.exception('Progress report job %s failed', job.job_id)
+            job.status = 'failed'
+            job.error = str(e)
+            job.finished_at = timezone.now()
+            job.save(update_fields=['status', 'error', 'finished_at'])
+            return
+
+        job.status = 'completed'
+        job.result = result
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'result', 'finished_at'])
+    finally:
+        close_old_connections()
+
+
+def job_payload(job):
+    """Status payload returned to clients polling a job"""
+    payload = {
+        'job_id': str(job.job_id),
+        'status': job.status,
+        'report_type': job.report_type,
+        'period_start': job.period_start,
+        'period_end': job.period_end,
+        'created_at': job.created_at,
+        'finished_at': job.finished_at,
+    }
+    if job.status == 'completed':
+        payload['report'] = job.result
+    elif job.status == 'failed':
+        payload['error'] = job.error
+    return payload
@@ -0,0 +1,237 @@
+"""
+Assessment scoring engine.
+
+Each Assessment is compiled once into an immutable ScoringPlan holding the
+question order, per-question weights, categories and option scores. Plans are
+cached per process and keyed by the assessment version (``updated_at``), which
+is bumped whenever one of its questions changes, so a stale plan is never used.
+
+Question metadata is read from ``AssessmentQuestion.options``:
+
+    {
+        "choices": [{"value": "often", "score": 2}, ...],  # or plain values
+        "min": 0, "max": 3,          # scale range (default 1-5)
+        "weight": 1.5,               # default 1
+        "category": "inattention",   # default "general"
+        "reverse": true              # reverse-scored scale item
+    }
+
+A plain list is treated as ``{"choices": [...]}``.
+"""
+import threading
+from types import MappingProxyType
+from typing import NamedTuple
+
+DEFAULT_CATEGORY = 'general'
+DEFAULT_SCALE = (1, 5)
+
+# Upper bounds (percent of maximum score) for each risk level
+RISK_LEVELS = (
+    (34, 'low'),
+    (67, 'moderate'),
+    (100, 'high'),
+)
+
+
+class ScoringPlan(NamedTuple):
+    """Compiled, immutable scoring metadata for one assessment version"""
+    assessment_id: int
+    version: float
+    question_ids: tuple
+    required: tuple
+    positions: MappingProxyType
+    weights: tuple
+    categories: tuple
+    choice_scores: tuple
+    scale_ranges: tuple
+    max_scores: tuple
+    category_names: tuple
+
+
+class ScoreResult(NamedTuple):
+    overall_score: float
+    max_score: float
+    percentage: float
+    category_scores: dict
+    risk_level: str
+
+
+_plans = {}
+_plans_lock = threading.Lock()
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _compile_question(question_type, options):
+    """Return (weight, category, choice scores, scale range, max score)"""
+    if isinstance(options, list):
+        options = {'choices': options}
+    options = options or {}
+
+    weight = _to_number(options.get('weight'))
+    weight = 1 if weight is None else weight
+    category = options.get('category') or DEFAULT_CATEGORY
+
+    if question_type == 'text':
+        return 0, category, None, None, 0
+
+    if question_type == 'scale':
+        low = _to_number(options.get('min'))
+        high = _to_number(options.get('max'))
+        low = DEFAULT_SCALE[0] if low is None else low
+        high = DEFAULT_SCALE[1] if high is None else high
+        reverse = bool(options.get('reverse'))
+        return weight, category, None, (low, high, reverse), high
+
+    choices = options.get('choices')
+    if choices is None and question_type == 'yes_no':
+        choices = [{'value': 'no', 'score': 0}, {'value': 'yes', 'score': 1}]
+
+    scores = {}
+    for index, choice in enumerate(choices or []):
+        if isinstance(choice, dict):
+            value = choice.get('value', choice.get('label', index))
+            score = _to_number(choice.get('score'))
+            scores[str(value).lower()] = index if score is None else score
+        else:
+            scores[str(choice).lower()] = index
+    if question_type == 'yes_no':
+        scores.setdefault('true', scores.get('yes', 1))
+        scores.setdefault('false', scores.get('no', 0))
+
+    if question_type == 'checkbox':
+        max_score = sum(score for score in scores.values() if score > 0)
+    else:
+        max_score = max(scores.values(), default=0)
+    return weight, category, scores, None, max_score
+
+
+def compile_plan(assessment):
+    """Compile (or fetch from cache) the scoring plan of an assessment"""
+    version = assessment.updated_at.timestamp() if assessment.updated_at else 0
+
+    with _plans_lock:
+        plan = _plans.get(assessment.pk)
+    if plan is not None and plan.version == version:
+        return plan
+
+    rows = list(
+        assessment.questions.order_by('order', 'id').values_list(
+            'id', 'question_type', 'options', 'is_required'
+        )
+    )
+    compiled = [_compile_question(row[1], row[2]) for row in rows]
+    categories = tuple(c[1] for c in compiled)
+
+    plan = ScoringPlan(
+        assessment_id=assessment.pk,
+        version=version,
+        question_ids=tuple(row[0] for row in rows),
+        required=tuple(row[3] for row in rows),
+        positions=MappingProxyType({row[0]: i for i, row in enumerate(rows)}),
+        weights=tuple(c[0] for c in compiled),
+        categories=categories,
+        choice_scores=tuple(c[2] for c in compiled),
+        scale_ranges=tuple(c[3] for c in compiled),
+        max_scores=tuple(c[4] for c in compiled),
+        category_names=tuple(dict.fromkeys(categories)),
+    )
+
+    with _plans_lock:
+        _plans[assessment.pk] = plan
+    return plan
+
+
+def invalidate_plan(assessment_id):
+    """Drop the cached plan of an assessment"""
+    with _plans_lock:
+        _plans.pop(assessment_id, None)
+
+
+def _score_value(value, choices, scale):
+    if value is None:
+        return 0
+    if scale is not None:
+        number = _to_number(value)
+        if number is None:
+            return 0
+        low, high, reverse = scale
+        number = min(max(number, low), high)
+        return low + high - number if reverse else number
+    if choices is not None:
+        values = value if isinstance(value, list) else [value]
+        total = 0
+        for item in values:
+            score = choices.get(str(item).lower())
+            if score is None:
+                score = _to_number(item) or 0
+            total += score
+        return total
+    return 0
+
+
+def risk_level_for(percentage):
+    for upper, level in RISK_LEVELS:
+        if percentage <= upper:
+            return level
+    return RISK_LEVELS[-1][1]
+
+
+def score_responses(plan, answers):
+    """
+    Score a submission against a compiled plan.
+
+    ``answers`` maps question id to the stored response value. The raw values
+    are laid out in plan order and reduced in a single pass into overall and
+    per-category totals.
+    """
+    values = [None] * len(plan.question_ids)
+    for question_id, value in answers.items():
+        position = plan.positions.get(question_id)
+        if position is not None:
+            values[position] = value
+
+    weighted = [
+        _score_value(value, choices, scale) * weight
+        for value, choices, scale, weight in zip(
+            values, plan.choice_scores, plan.scale_ranges, plan.weights
+        )
+    ]
+    weighted_max = [m * w for m, w in zip(plan.max_scores, plan.weights)]
+
+    totals = dict.fromkeys(plan.category_names, 0)
+    maxima = dict.fromkeys(plan.category_names, 0)
+    for category, score, max_score in zip(plan.categories, weighted, weighted_max):
+        totals[category] += score
+        maxima[category] += max_score
+
+    category_scores = {
+        category: {
+            'score': round(totals[category], 2),
+            'max_score': round(maxima[category], 2),
+            'percentage': round(totals[category] / maxima[category] * 100, 2)
+            if maxima[category] else 0,
+        }
+        for category in plan.category_names
+    }
+
+    overall = sum(weighted)
+    max_score = sum(weighted_max)
+    percentage = overall / max_score * 100 if max_score else 0
+
+    return ScoreResult(
+        overall_score=round(overall, 2),
+        max_score=round(max_score, 2),
+        percentage=round(percentage, 2),
+        category_scores=category_scores,
+        risk_level=risk_level_for(percentage),
+    )
@@ -1,14 +1,18 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils import timezone
+from datetime import timedelta
+from utils.instrumentation import TimedSerializerMixin
 from .models import (
-    AssessmentTemplate, Assessment, AssessmentQuestion, 
-    AssessmentResponse, WeeklyAssessment, BehaviorLog, 
-    ProgressReport
+    AssessmentCategory, Assessment, AssessmentQuestion,
+    AssessmentResponse, AssessmentResult, UserAssessment,
+    WeeklyProgress, BehaviorLog, ReportJob
 )
 
 User = get_user_model()
 
-class UserAssessmentSerializer(serializers.ModelSerializer):
+class BasicUserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Basic user serializer for assessments"""
     full_name = serializers.CharField(source='get_full_name', read_only=True)
     
@@ -16,118 +20,171 @@ class UserAssessmentSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'full_name']
 
-class AssessmentQuestionSerializer(serializers.ModelSerializer):
+class AssessmentCategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Assessment category serializer"""
+    
+    class Meta:
+        model = AssessmentCategory
+        fields = ['id', 'name', 'description', 'icon']
+
+class AssessmentQuestionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Assessment question serializer"""
     
     class Meta:
         model = AssessmentQuestion
         fields = [
-            'id', 'template', 'question_text', 'question_type',
-            'options', 'is_required', 'order', 'scoring_criteria'
+            'id', 'assessment', 'question_text', 'question_type',
+            'options', 'is_required', 'order', 'help_text'
         ]
 
-class AssessmentTemplateSerializer(serializers.ModelSerializer):
-    """Assessment template with questions"""
+class AssessmentTemplateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Assessment form with its questions"""
+    category = AssessmentCategorySerializer(read_only=True)
     questions = AssessmentQuestionSerializer(many=True, read_only=True)
     total_questions = serializers.SerializerMethodField()
     
     class Meta:
-        model = AssessmentTemplate
+        model = Assessment
         fields = [
-            'id', 'name', 'description', 'template_type', 'age_range',
-            'estimated_duration', 'scoring_method', 'is_active',
+            'id', 'title', 'description', 'category', 'assessment_type',
+            'instructions', 'estimated_duration', 'is_active',
             'created_at', 'questions', 'total_questions'
         ]
     
     def get_total_questions(self, obj):
-        return obj.questions.count()
+        # Listing views annotate question_count to avoid a query per assessment
+        question_count = getattr(obj, 'question_count', None)
+        if question_count is None:
+            question_count = obj.questions.count()
+        return question_count
 
-class AssessmentResponseSerializer(serializers.ModelSerializer):
+class AssessmentResponseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Assessment response serializer"""
     question = AssessmentQuestionSerializer(read_only=True)
     
     class Meta:
         model = AssessmentResponse
         fields = [
-            'id', 'assessment', 'question', 'response_value',
-            'response_text', 'score', 'created_at'
+            'id', 'user_assessment', 'question', 'response_value',
+            'response_text', 'created_at', 'updated_at'
+        ]
+
+class AssessmentResultSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Scored result of a completed assessment"""
+    
+    class Meta:
+        model = AssessmentResult
+        fields = [
+            'overall_score', 'category_scores', 'insights',
+            'recommendations', 'risk_level', 'generated_at'
         ]
 
-class AssessmentSerializer(serializers.ModelSerializer):
-    """Assessment with responses"""
-    user = UserAssessmentSerializer(read_only=True)
-    template = AssessmentTemplateSerializer(read_only=True)
+class UserAssessmentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """A user's assessment with its form, responses and result"""
+    user = BasicUserSerializer(read_only=True)
+    assessment = AssessmentTemplateSerializer(read_only=True)
     responses = AssessmentResponseSerializer(many=True, read_only=True)
+    result = serializers.SerializerMethodField()
     completion_percentage = serializers.SerializerMethodField()
     
     class Meta:
-        model = Assessment
+        model = UserAssessment
         fields = [
-            'id', 'user', 'template', 'status', 'total_score',
-            'max_possible_score', 'started_at', 'completed_at',
-            'responses', 'completion_percentage', 'notes'
+            'id', 'user', 'assessment', 'status', 'score', 'due_date',
+            'started_at', 'completed_at', 'created_at', 'responses',
+            'result', 'completion_percentage'
         ]
     
+    def get_result(self, obj):
+        try:
+            return AssessmentResultSerializer(obj.result).data
+        except ObjectDoesNotExist:
+            return None
+    
     def get_completion_percentage(self, obj):
-        if obj.template:
-            total_questions = obj.template.questions.count()
+        # Listing views annotate both counts to avoid two queries per assessment
+        total_questions = getattr(obj, 'question_count', None)
+        if total_questions is None:
+            total_questions = obj.assessment.questions.count()
+        completed_responses = getattr(obj, 'response_count', None)
+        if completed_responses is None:
             completed_responses = obj.responses.count()
-            if total_questions > 0:
-                return (completed_responses / total_questions) * 100
+        if total_questions > 0:
+            return round(completed_responses / total_questions * 100, 2)
         return 0
 
-class AssessmentCreateSerializer(serializers.ModelSerializer):
-    """Serializer for creating assessments"""
-    template_id = serializers.IntegerField()
+class AssessmentCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Serializer for starting an assessment"""
+    assessment_id = serializers.IntegerField(write_only=True)
     
     class Meta:
-        model = Assessment
-        fields = ['template_id']
+        model = UserAssessment
+        fields = ['assessment_id', 'due_date']
     
-    def validate_template_id(self, value):
-        try:
-            template = AssessmentTemplate.objects.get(id=value, is_active=True)
-            return value
-        except AssessmentTemplate.DoesNotExist:
-            raise serializers.ValidationError("Template not found or inactive")
+    def validate_assessment_id(self, value):
+        if not Assessment.objects.filter(id=value, is_active=True).exists():
+            raise serializers.ValidationError("Assessment not found or inactive")
+        return value
     
     def create(self, validated_data):
-        template = AssessmentTemplate.objects.get(id=validated_data['template_id'])
-        assessment = Assessment.objects.create(
+        return UserAssessment.objects.create(
             user=self.context['request'].user,
-            template=template,
             status='in_progress',
-            max_possible_score=template.questions.count() * 5  # Assuming 5-point scale
+            started_at=timezone.now(),
+            **validated_data
         )
-        return assessment
+    
+    def to_representation(self, instance):
+        return UserAssessmentSerializer(instance, context=self.context).data
 
-class SubmitResponseSerializer(serializers.Serializer):
+class SubmitResponseSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for submitting assessment responses"""
     question_id = serializers.IntegerField()
-    response_value = serializers.IntegerField(required=False)
+    # A number, a choice or a list of choices depending on the question type
+    response_value = serializers.JSONField(required=False)
     response_text = serializers.CharField(max_length=1000, required=False)
     
     def validate(self, data):
-        if not data.get('response_value') and not data.get('response_text'):
+        if data.get('response_value') is None and not data.get('response_text'):
             raise serializers.ValidationError("Either response_value or response_text is required")
         return data
 
-class WeeklyAssessmentSerializer(serializers.ModelSerializer):
-    """Weekly assessment serializer"""
-    user = UserAssessmentSerializer(read_only=True)
+class BulkSubmitResponseSerializer(TimedSerializerMixin, serializers.Serializer):
+    """Serializer for submitting a whole questionnaire in one request"""
+    responses = SubmitResponseSerializer(many=True, allow_empty=False)
+    finalize = serializers.BooleanField(default=True)
+    
+    def validate_responses(self, value):
+        question_ids = [item['question_id'] for item in value]
+        if len(question_ids) != len(set(question_ids)):
+            raise serializers.ValidationError("Each question can only be answered once per submission")
+        return value
+
+class WeeklyProgressSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Weekly progress serializer"""
     
     class Meta:
-        model = WeeklyAssessment
+        model = WeeklyProgress
         fields = [
-            'id', 'user', 'week_start', 'mood_rating', 'focus_rating',
-            'sleep_quality', 'medication_adherence', 'behavior_notes',
-            'parent_notes', 'goals_met', 'challenges', 'created_at'
+            'id', 'week_start_date', 'focus_sessions_completed',
+            'medication_adherence_rate', 'mood_average',
+            'sleep_quality_average', 'behavior_score', 'notes', 'created_at'
         ]
-        read_only_fields = ['user', 'created_at']
+        read_only_fields = ['week_start_date', 'created_at']
+    
+    def create(self, validated_data):
+        # One entry per week: a second check-in updates the current week
+        today = timezone.localdate()
+        progress, _ = WeeklyProgress.objects.update_or_create(
+            user=self.context['request'].user,
+            week_start_date=today - timedelta(days=today.weekday()),
+            defaults=validated_data
+        )
+        return progress
 
-class BehaviorLogSerializer(serializers.ModelSerializer):
+class BehaviorLogSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Behavior log serializer"""
-    user = UserAssessmentSerializer(read_only=True)
+    user = BasicUserSerializer(read_only=True)
     
     class Meta:
         model = BehaviorLog
@@ -137,21 +194,30 @@ class BehaviorLogSerializer(serializers.ModelSerializer):
             'logged_at', 'created_at'
         ]
         read_only_fields = ['user', 'created_at']
+    
+    def validate_intensity(self, value):
+        if not 1 <= value <= 5:
+            raise serializers.ValidationError("Intensity must be between 1 and 5")
+        return value
+    
+    def validate_triggers(self, value):
+        if not isinstance(value, list):
+            raise serializers.ValidationError("Triggers must be a list")
+        return value
 
-class ProgressReportSerializer(serializers.ModelSerializer):
-    """Progress report serializer"""
-    user = UserAssessmentSerializer(read_only=True)
+class ReportJobSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """Completed progress report job and its report"""
+    job_id = serializers.CharField(read_only=True)
+    report = serializers.JSONField(source='result', read_only=True)
     
     class Meta:
-        model = ProgressReport
+        model = ReportJob
         fields = [
-            'id', 'user', 'report_type', 'period_start', 'period_end',
-            'overall_score', 'improvement_areas', 'strengths',
-            'recommendations', 'generated_data', 'created_at'
+            'job_id', 'report_type', 'period_start', 'period_end',
+            'created_at', 'finished_at', 'report'
         ]
-        read_only_fields = ['user', 'created_at']
 
-class AssessmentStatsSerializer(serializers.Serializer):
+class AssessmentStatsSerializer(TimedSerializerMixin, serializers.Serializer):
     """Assessment statistics serializer"""
     total_assessments = serializers.IntegerField()
     completed_assessments = serializers.IntegerField()
@@ -159,8 +225,8 @@ class AssessmentStatsSerializer(serializers.Serializer):
     average_score = serializers.FloatField()
     improvement_percentage = serializers.FloatField()
     recent_assessments = serializers.ListField()
-    
-class BehaviorAnalysisSerializer(serializers.Serializer):
+
+class BehaviorAnalysisSerializer(TimedSerializerMixin, serializers.Serializer):
     """Behavior analysis serializer"""
     total_logs = serializers.IntegerField()
     most_common_behavior = serializers.CharField()
@@ -168,28 +234,3 @@ class BehaviorAnalysisSerializer(serializers.Serializer):
     common_triggers = serializers.ListField()
     time_patterns = serializers.DictField()
     weekly_trends = serializers.ListField()
-
-class WeeklyAssessmentCreateSerializer(serializers.ModelSerializer):
-    """Serializer for creating weekly assessments"""
-    
-    class Meta:
-        model = WeeklyAssessment
-        fields = [
-            'mood_rating', 'focus_rating', 'sleep_quality',
-            'medication_adherence', 'behavior_notes', 'parent_notes',
-            'goals_met', 'challenges'
-        ]
-    
-    def create(self, validated_data):
-        # Set week_start to beginning of current week
-        from django.utils import timezone
-        import datetime
-        
-        now = timezone.now()
-        week_start = now - datetime.timedelta(days=now.weekday())
-        week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-        
-        validated_data['user'] = self.context['request'].user
-        validated_data['week_start'] = week_start
-        
-        return super().create(validated_data)
\ No newline at end of file
@@ -0,0 +1,107 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from .models import AssessmentResponse, AssessmentResult
+from .scoring import compile_plan, score_responses
+
+
+def _stored_value(response):
+    """response_value is required in the table; text answers store their text"""
+    value = response.get('response_value')
+    if value is None:
+        value = response.get('response_text')
+    return {} if value is None else value
+
+
+def save_responses(user_assessment, responses, finalize=True):
+    """
+    Validate and upsert a batch of responses for a user assessment.
+
+    All responses are written with a single INSERT ... ON CONFLICT statement
+    and the assessment is scored once afterwards with its compiled plan.
+    When ``finalize`` is False the responses are only saved (autosave) and
+    the assessment is left in progress even if every question has been
+    answered.
+    """
+    plan = compile_plan(user_assessment.assessment)
+    questions = dict(zip(plan.question_ids, plan.required))
+
+    unknown = sorted({r['question_id'] for r in responses} - questions.keys())
+    if unknown:
+        raise ValidationError({
+            'responses': f'Questions not found in this assessment: {unknown}'
+        })
+
+    objs = [
+        AssessmentResponse(
+            user_assessment=user_assessment,
+            question_id=r['question_id'],
+            response_value=_stored_value(r),
+            response_text=r.get('response_text'),
+        )
+        for r in responses
+    ]
+
+    with transaction.atomic():
+        saved = AssessmentResponse.objects.bulk_create(
+            objs,
+            update_conflicts=True,
+            unique_fields=['user_assessment', 'question'],
+            update_fields=['response_value', 'response_text', 'updated_at'],
+        )
+
+        answered = dict(
+            user_assessment.responses.values_list('question_id', 'response_value')
+        )
+        total_questions = len(questions)
+        missing_required = [
+            qid for qid, required in questions.items()
+            if required and qid not in answered
+        ]
+
+        update_fields = []
+        if user_assessment.started_at is None:
+            user_assessment.started_at = timezone.now()
+            update_fields.append('started_at')
+        if user_assessment.status == 'not_started':
+            user_assessment.status = 'in_progress'
+            update_fields.append('status')
+
+        if finalize and not missing_required:
+            result = score_assessment(user_assessment, answered, plan=plan)
+            user_assessment.score = result.overall_score
+            user_assessment.status = 'completed'
+            user_assessment.completed_at = timezone.now()
+            update_fields += ['score', 'status', 'completed_at']
+
+        if update_fields:
+            user_assessment.save(update_fields=list(dict.fromkeys(update_fields)))
+
+    completion_percentage = (
+        len(answered) / total_questions * 100 if total_questions > 0 else 0
+    )
+
+    return {
+        'saved': saved,
+        'answered_questions': len(answered),
+        'total_questions': total_questions,
+        'missing_required': missing_required,
+        'completion_percentage': round(completion_percentage, 2),
+    }
+
+
+def score_assessment(user_assessment, answers, plan=None):
+    """Score the answers and store the overall and per-category result"""
+    plan = plan or compile_plan(user_assessment.assessment)
+    result = score_responses(plan, answers)
+
+    AssessmentResult.objects.update_or_create(
+        user_assessment=user_assessment,
+        defaults={
+            'overall_score': result.overall_score,
+            'category_scores': result.category_scores,
+            'risk_level': result.risk_level,
+        }
+    )
+    return result
@@ -0,0 +1,25 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .analytics import invalidate_behavior_analysis
+from .models import Assessment, AssessmentQuestion, BehaviorLog
+from .scoring import invalidate_plan
+
+
+@receiver(post_save, sender=AssessmentQuestion)
+@receiver(post_delete, sender=AssessmentQuestion)
+def bump_assessment_version(sender, instance, **kwargs):
+    """Question changes create a new assessment version for the scoring plan cache"""
+    Assessment.objects.filter(pk=instance.assessment_id).update(updated_at=timezone.now())
+    invalidate_plan(instance.assessment_id)
+
+
+@receiver(post_save, sender=BehaviorLog)
+@receiver(post_delete, sender=BehaviorLog)
+def expire_behavior_analysis(sender, instance, raw=False, **kwargs):
+    """Every analysis window of the user may include the changed log"""
+    if raw:
+        return
+    transaction.on_commit(lambda: invalidate_behavior_analysis(instance.user_id))
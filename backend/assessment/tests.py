@@ -1,3 +1,311 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from users.models import User
+from .analytics import analysis_cache_key, common_triggers, hourly_histogram, weekly_trends
+from .models import (
+    Assessment, AssessmentCategory, AssessmentQuestion, AssessmentResponse, AssessmentResult,
+    BehaviorLog, ReportJob, UserAssessment, WeeklyProgress,
+)
+from .reports import report_period, request_report, run_report_job
+from .services import save_responses
+
+
+class SubmitResponseTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        category = AssessmentCategory.objects.create(name='Focus')
+        self.assessment = Assessment.objects.create(
+            title='Weekly check', description='', category=category, estimated_duration=5
+        )
+        self.scale = AssessmentQuestion.objects.create(
+            assessment=self.assessment, question_text='How focused?', question_type='scale', order=0
+        )
+        self.checkbox = AssessmentQuestion.objects.create(
+            assessment=self.assessment, question_text='Which apply?', question_type='checkbox', order=1,
+            options={'choices': [{'value': 'fidgeting', 'score': 1}, {'value': 'daydreaming', 'score': 2}]}
+        )
+        self.text = AssessmentQuestion.objects.create(
+            assessment=self.assessment, question_text='Anything else?', question_type='text', order=2,
+            is_required=False
+        )
+        self.user_assessment = UserAssessment.objects.create(user=self.user, assessment=self.assessment)
+        self.client.force_authenticate(self.user)
+
+    def _url(self, name):
+        return reverse(f'assessment:{name}', args=[self.user_assessment.id])
+
+    def test_save_responses_stores_text_only_answers(self):
+        save_responses(self.user_assessment, [{'question_id': self.text.id, 'response_text': 'hello'}])
+        response = AssessmentResponse.objects.get(question=self.text)
+        self.assertEqual(response.response_value, 'hello')
+        self.assertEqual(response.response_text, 'hello')
+
+    def test_single_submit_autosaves_without_completing(self):
+        response = self.client.post(
+            self._url('submit_response'), {'question_id': self.checkbox.id, 'response_value': ['fidgeting']},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['response']['response_value'], ['fidgeting'])
+        self.assertEqual(response.data['assessment_status'], 'in_progress')
+        self.assertEqual(response.data['completion_percentage'], 33.33)
+
+        # Answering again replaces the stored answer
+        self.client.post(
+            self._url('submit_response'), {'question_id': self.checkbox.id, 'response_value': ['daydreaming']},
+            format='json'
+        )
+        self.assertEqual(AssessmentResponse.objects.get(question=self.checkbox).response_value, ['daydreaming'])
+
+    def test_single_submit_requires_an_answer(self):
+        response = self.client.post(self._url('submit_response'), {'question_id': self.scale.id}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_bulk_submit_scores_and_completes(self):
+        response = self.client.post(self._url('submit_responses'), {'responses': [
+            {'question_id': self.scale.id, 'response_value': 4},
+            {'question_id': self.checkbox.id, 'response_value': ['fidgeting', 'daydreaming']},
+            {'question_id': self.text.id, 'response_text': 'Good week'},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['assessment_status'], 'completed')
+        self.assertEqual(response.data['score'], 7)
+        self.assertEqual(response.data['missing_required'], [])
+        self.user_assessment.refresh_from_db()
+        self.assertEqual(self.user_assessment.result.overall_score, 7)
+
+    def test_bulk_submit_keeps_open_while_required_answers_are_missing(self):
+        response = self.client.post(self._url('submit_responses'), {'responses': [
+            {'question_id': self.scale.id, 'response_value': 2},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(response.data['assessment_status'], 'in_progress')
+        self.assertEqual(response.data['missing_required'], [self.checkbox.id])
+
+    def test_bulk_submit_rejects_unknown_and_duplicate_questions(self):
+        url = self._url('submit_responses')
+        response = self.client.post(url, {'responses': [
+            {'question_id': self.scale.id, 'response_value': 2},
+            {'question_id': self.scale.id, 'response_value': 3},
+        ]}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(url, {'responses': [{'question_id': 0, 'response_value': 2}]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(AssessmentResponse.objects.exists())
+
+
+class BehaviorAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        self.other = User.objects.create_user(username='other', password='pw-123456', user_type='child')
+        now = timezone.now().replace(hour=9, minute=0)
+        for triggers, hours in ((['noise', 'homework'], 0), (['noise'], 1), (['tired'], 1), ([], 2)):
+            BehaviorLog.objects.create(
+                user=self.user, behavior_type='outburst', intensity=3,
+                triggers=triggers, logged_at=now + timedelta(hours=hours)
+            )
+        BehaviorLog.objects.create(user=self.other, behavior_type='outburst', intensity=1, triggers=['noise'])
+
+    def test_common_triggers_counts_json_lists(self):
+        behaviors = BehaviorLog.objects.filter(user=self.user)
+        self.assertEqual(common_triggers(behaviors), ['noise', 'homework', 'tired'])
+        self.assertEqual(common_triggers(behaviors, limit=1), ['noise'])
+
+    def test_hourly_histogram(self):
+        behaviors = BehaviorLog.objects.filter(user=self.user)
+        histogram = hourly_histogram(behaviors)
+        self.assertEqual(sum(histogram.values()), 4)
+        self.assertEqual(max(histogram.values()), 2)
+
+    def test_weekly_trends_covers_every_week(self):
+        trends = weekly_trends(BehaviorLog.objects.filter(user=self.user), weeks=4)
+        self.assertEqual([week['week'] for week in trends], ['Week 1', 'Week 2', 'Week 3', 'Week 4'])
+        self.assertEqual(sum(week['count'] for week in trends), 4)
+
+    def test_saving_a_log_expires_cached_analysis(self):
+        key = analysis_cache_key(self.user.id, 30)
+        with self.captureOnCommitCallbacks(execute=True):
+            BehaviorLog.objects.create(user=self.user, behavior_type='calm', intensity=1)
+        self.assertNotEqual(analysis_cache_key(self.user.id, 30), key)
+        other_key = analysis_cache_key(self.other.id, 30)
+        self.assertEqual(analysis_cache_key(self.other.id, 30), other_key)
+
+    def test_analysis_endpoint(self):
+        self.client.force_login(self.user)
+        url = reverse('assessment:behavior_analysis')
+        self.assertEqual(self.client.get(url, {'days': 'abc'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'days': 0}).status_code, 400)
+
+        data = self.client.get(url, {'days': 30}).json()
+        self.assertEqual(data['total_logs'], 4)
+        self.assertEqual(data['common_triggers'][0], 'noise')
+
+
+class ProgressReportJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        category = AssessmentCategory.objects.create(name='Focus')
+        assessment = Assessment.objects.create(
+            title='Weekly check', description='', category=category, estimated_duration=5
+        )
+        completed = UserAssessment.objects.create(
+            user=self.user, assessment=assessment, status='completed',
+            completed_at=timezone.now() - timedelta(days=2), score=12
+        )
+        AssessmentResult.objects.create(
+            user_assessment=completed, overall_score=12, risk_level='low',
+            category_scores={'general': {'score': 12, 'max_score': 20, 'percentage': 60}}
+        )
+        week = timezone.localdate() - timedelta(days=timezone.localdate().weekday())
+        WeeklyProgress.objects.create(
+            user=self.user, week_start_date=week, focus_sessions_completed=4,
+            medication_adherence_rate=95, mood_average=4.5, sleep_quality_average=2
+        )
+        BehaviorLog.objects.create(user=self.user, behavior_type='outburst', intensity=2)
+
+    def test_job_builds_report_from_assessments_and_progress(self):
+        job, queued = request_report(self.user, 'weekly')
+        self.assertTrue(queued)
+        run_report_job(job.pk)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, 'completed', job.error)
+        report = job.result
+        self.assertEqual(report['overall_score'], 12)
+        stats = report['generated_data']['period_stats']
+        self.assertEqual(stats['assessments_completed'], 1)
+        self.assertEqual(stats['risk_levels'], {'low': 1})
+        self.assertEqual(stats['focus_sessions_completed'], 4)
+        self.assertEqual(stats['behavior_logs'], 1)
+        self.assertIn('Maintaining positive mood', report['strengths'])
+        self.assertIn('Sleep quality', report['improvement_areas'])
+        self.assertEqual(report['generated_data']['top_behaviors'], [{'behavior_type': 'outburst', 'count': 1}])
+
+    def test_same_period_reuses_the_job(self):
+        job, _ = request_report(self.user, 'weekly')
+        again, queued = request_report(self.user, 'weekly')
+        self.assertEqual(again.pk, job.pk)
+        self.assertFalse(queued)
+        self.assertEqual(ReportJob.objects.count(), 1)
+
+    def test_period_ends_at_next_midnight(self):
+        start, end = report_period('weekly')
+        self.assertEqual(timezone.localtime(end).date(), timezone.localdate() + timedelta(days=1))
+        self.assertEqual(end - start, timedelta(days=7))
+
+
+class AssessmentListTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        self.other = User.objects.create_user(username='other', password='pw-123456', user_type='child')
+        self.category = AssessmentCategory.objects.create(name='Focus')
+        self.assessment = self._assessment('Weekly check', questions=4)
+        self.client.force_authenticate(self.user)
+
+    def _assessment(self, title, questions):
+        assessment = Assessment.objects.create(
+            title=title, description='', category=self.category, estimated_duration=5
+        )
+        for order in range(questions):
+            AssessmentQuestion.objects.create(
+                assessment=assessment, question_text=f'Q{order}', question_type='scale', order=order
+            )
+        return assessment
+
+    def _answer(self, user_assessment, count):
+        for question in self.assessment.questions.all()[:count]:
+            AssessmentResponse.objects.create(
+                user_assessment=user_assessment, question=question, response_value=3
+            )
+
+    def test_templates_list_counts_questions(self):
+        self._assessment('Daily check', questions=2)
+        Assessment.objects.create(
+            title='Retired', description='', category=self.category, estimated_duration=5, is_active=False
+        )
+        response = self.client.get(reverse('assessment:assessment_templates'))
+
+        self.assertEqual(response.status_code, 200)
+        counts = {item['title']: item['total_questions'] for item in response.data['results']}
+        self.assertEqual(counts, {'Daily check': 2, 'Weekly check': 4})
+
+    def test_assessments_list_shows_own_assessments_with_completion(self):
+        mine = UserAssessment.objects.create(user=self.user, assessment=self.assessment, status='in_progress')
+        self._answer(mine, 3)
+        UserAssessment.objects.create(user=self.other, assessment=self.assessment)
+
+        response = self.client.get(reverse('assessment:assessments'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 1)
+        item = response.data['results'][0]
+        self.assertEqual(item['id'], mine.id)
+        self.assertEqual(item['completion_percentage'], 75.0)
+        self.assertEqual(len(item['responses']), 3)
+        self.assertIsNone(item['result'])
+
+    def test_assessments_list_queries_do_not_grow_with_rows(self):
+        def list_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(reverse('assessment:assessments'))
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        self._answer(UserAssessment.objects.create(user=self.user, assessment=self.assessment), 2)
+        one_row = list_queries()
+        for _ in range(4):
+            self._answer(UserAssessment.objects.create(user=self.user, assessment=self.assessment), 2)
+        self.assertEqual(list_queries(), one_row)
+
+    def test_start_assessment_then_list_it(self):
+        response = self.client.post(
+            reverse('assessment:assessments'), {'assessment_id': self.assessment.id}, format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['status'], 'in_progress')
+        self.assertEqual(response.data['assessment']['id'], self.assessment.id)
+
+        response = self.client.get(reverse('assessment:assessment_detail', args=[response.data['id']]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['completion_percentage'], 0)
+
+    def test_weekly_check_in_updates_the_current_week(self):
+        url = reverse('assessment:weekly_progress')
+        self.client.post(url, {'focus_sessions_completed': 2}, format='json')
+        response = self.client.post(url, {'focus_sessions_completed': 5}, format='json')
+        self.assertEqual(response.status_code, 201)
+
+        response = self.client.get(url)
+        self.assertEqual(response.data['count'], 1)
+        self.assertEqual(response.data['results'][0]['focus_sessions_completed'], 5)
+
+    def test_dashboard_summarises_assessments(self):
+        UserAssessment.objects.create(
+            user=self.user, assessment=self.assessment, status='completed',
+            score=10, completed_at=timezone.now() - timedelta(days=7)
+        )
+        UserAssessment.objects.create(
+            user=self.user, assessment=self.assessment, status='completed',
+            score=15, completed_at=timezone.now()
+        )
+        response = self.client.get(reverse('assessment:assessment_dashboard'))
 
-# Create your tests here.
+        self.assertEqual(response.status_code, 200)
+        stats = response.data['stats']
+        self.assertEqual(stats['completed_assessments'], 2)
+        self.assertEqual(stats['average_score'], 12.5)
+        self.assertEqual(stats['improvement_percentage'], 50.0)
+        self.assertEqual(stats['recent_assessments'][0]['assessment_title'], 'Weekly check')
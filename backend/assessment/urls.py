@@ -7,16 +7,18 @@ urlpatterns = [
     # Dashboard
     path('dashboard/', views.assessment_dashboard, name='assessment_dashboard'),
     
-    # Assessment templates
+    # Assessment forms
+    path('categories/', views.AssessmentCategoryListView.as_view(), name='assessment_categories'),
     path('templates/', views.AssessmentTemplateListView.as_view(), name='assessment_templates'),
     
     # Assessments
     path('assessments/', views.AssessmentListCreateView.as_view(), name='assessments'),
     path('assessments/<int:pk>/', views.AssessmentDetailView.as_view(), name='assessment_detail'),
     path('assessments/<int:assessment_id>/respond/', views.submit_assessment_response, name='submit_response'),
+    path('assessments/<int:assessment_id>/respond/bulk/', views.submit_assessment_responses, name='submit_responses'),
     
-    # Weekly assessments
-    path('weekly/', views.WeeklyAssessmentListCreateView.as_view(), name='weekly_assessments'),
+    # Weekly progress
+    path('weekly/', views.WeeklyProgressListCreateView.as_view(), name='weekly_progress'),
     
     # Behavior logs
     path('behaviors/', views.BehaviorLogListCreateView.as_view(), name='behavior_logs'),
@@ -25,4 +27,5 @@ urlpatterns = [
     # Progress reports
     path('reports/', views.ProgressReportListView.as_view(), name='progress_reports'),
     path('reports/generate/', views.generate_progress_report, name='generate_report'),
+    path('reports/jobs/<uuid:job_id>/', views.progress_report_job, name='report_job'),
 ]
\ No newline at end of file
@@ -2,62 +2,104 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.db import transaction, models
+from django.core.cache import cache
 from django.utils import timezone
-from django.db.models import Avg, Count, Q, Sum
-from datetime import datetime, timedelta
+from django.db.models import Avg, Count, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from datetime import timedelta
 
+from utils.cache import cache_per_user
+from utils.conditional import etag_per_user
+from utils.db_router import read_from_replica
 from .models import (
     AssessmentCategory, Assessment, AssessmentQuestion,
-    AssessmentResponse, UserAssessment, WeeklyProgress, 
-    AssessmentResult
+    AssessmentResponse, UserAssessment, WeeklyProgress,
+    BehaviorLog, ReportJob
 )
-# Simplified imports for now
-from rest_framework.response import Response
+from .serializers import (
+    AssessmentCategorySerializer, AssessmentTemplateSerializer,
+    UserAssessmentSerializer, AssessmentCreateSerializer,
+    AssessmentResponseSerializer, SubmitResponseSerializer,
+    BulkSubmitResponseSerializer, WeeklyProgressSerializer,
+    BehaviorLogSerializer, ReportJobSerializer
+)
+from .analytics import (
+    ANALYSIS_CACHE_TIMEOUT, analysis_cache_key, common_triggers,
+    hourly_histogram, weekly_trends
+)
+from .reports import job_payload, request_report
+from .services import save_responses
 
 class AssessmentCategoryListView(generics.ListAPIView):
     """List available assessment categories"""
-    queryset = AssessmentCategory.objects.filter(is_active=True)
+    queryset = AssessmentCategory.objects.filter(is_active=True).order_by('name')
     serializer_class = AssessmentCategorySerializer
     permission_classes = [IsAuthenticated]
 
+def with_question_counts(queryset):
+    """Annotate assessment forms with their number of questions"""
+    return queryset.annotate(question_count=Count('questions', distinct=True))
+
+def with_completion_counts(queryset):
+    """Annotate user assessments with their form's question count and their response count"""
+    return queryset.annotate(
+        question_count=Coalesce(Subquery(
+            AssessmentQuestion.objects.filter(
+                assessment=OuterRef('assessment')
+            ).order_by().values('assessment').annotate(c=Count('id')).values('c')
+        ), 0),
+        response_count=Coalesce(Subquery(
+            AssessmentResponse.objects.filter(
+                user_assessment=OuterRef('pk')
+            ).order_by().values('user_assessment').annotate(c=Count('id')).values('c')
+        ), 0)
+    )
+
+class AssessmentTemplateListView(generics.ListAPIView):
+    """List active assessment forms"""
+    serializer_class = AssessmentTemplateSerializer
+    permission_classes = [IsAuthenticated]
+    
+    def get_queryset(self):
+        return with_question_counts(
+            Assessment.objects.filter(is_active=True)
+        ).select_related('category').prefetch_related('questions').order_by('title')
+
 class AssessmentListCreateView(generics.ListCreateAPIView):
-    """List user assessments or create new assessment"""
+    """List user assessments or start a new one"""
     permission_classes = [IsAuthenticated]
     
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return AssessmentCreateSerializer
-        return AssessmentSerializer
+        return UserAssessmentSerializer
     
     def get_queryset(self):
-        return Assessment.objects.filter(
+        return with_completion_counts(UserAssessment.objects.filter(
             user=self.request.user
-        ).select_related('template', 'user').prefetch_related(
-            'responses__question'
-        ).order_by('-started_at')
+        )).select_related('assessment__category', 'user', 'result').prefetch_related(
+            'responses__question', 'assessment__questions'
+        ).order_by('-created_at')
 
 class AssessmentDetailView(generics.RetrieveAPIView):
     """Get assessment details"""
-    serializer_class = AssessmentSerializer
+    serializer_class = UserAssessmentSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return Assessment.objects.filter(user=self.request.user)
+        return with_completion_counts(
+            UserAssessment.objects.filter(user=self.request.user)
+        ).select_related('assessment__category', 'user', 'result')
 
-class WeeklyAssessmentListCreateView(generics.ListCreateAPIView):
-    """List weekly assessments or create new one"""
+class WeeklyProgressListCreateView(generics.ListCreateAPIView):
+    """List weekly progress or check in for the current week"""
+    serializer_class = WeeklyProgressSerializer
     permission_classes = [IsAuthenticated]
     
-    def get_serializer_class(self):
-        if self.request.method == 'POST':
-            return WeeklyAssessmentCreateSerializer
-        return WeeklyAssessmentSerializer
-    
     def get_queryset(self):
-        return WeeklyAssessment.objects.filter(
+        return WeeklyProgress.objects.filter(
             user=self.request.user
-        ).order_by('-week_start')
+        ).order_by('-week_start_date')
 
 class BehaviorLogListCreateView(generics.ListCreateAPIView):
     """List behavior logs or create new log"""
@@ -67,32 +109,37 @@ class BehaviorLogListCreateView(generics.ListCreateAPIView):
     def get_queryset(self):
         return BehaviorLog.objects.filter(
             user=self.request.user
-        ).order_by('-logged_at')
+        ).select_related('user').order_by('-logged_at')
     
     def perform_create(self, serializer):
+        # Signals expire the cached analysis and pin the user to the primary
         serializer.save(user=self.request.user)
 
 class ProgressReportListView(generics.ListAPIView):
-    """List progress reports"""
-    serializer_class = ProgressReportSerializer
+    """List generated progress reports"""
+    serializer_class = ReportJobSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return ProgressReport.objects.filter(
-            user=self.request.user
-        ).order_by('-created_at')
+        return ReportJob.objects.filter(
+            user=self.request.user, status='completed'
+        ).order_by('-finished_at')
+
+def _get_open_user_assessment(request, assessment_id):
+    """Get the user's assessment instance if it still accepts responses"""
+    return UserAssessment.objects.select_related('assessment').get(
+        id=assessment_id,
+        user=request.user,
+        status__in=['not_started', 'in_progress']
+    )
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def submit_assessment_response(request, assessment_id):
-    """Submit response to assessment question"""
+    """Submit (autosave) response to a single assessment question"""
     try:
-        assessment = Assessment.objects.get(
-            id=assessment_id,
-            user=request.user,
-            status='in_progress'
-        )
-    except Assessment.DoesNotExist:
+        user_assessment = _get_open_user_assessment(request, assessment_id)
+    except UserAssessment.DoesNotExist:
         return Response(
             {'error': 'Assessment not found or not in progress'},
             status=status.HTTP_404_NOT_FOUND
@@ -102,306 +149,208 @@ def submit_assessment_response(request, assessment_id):
     if not serializer.is_valid():
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    question_id = serializer.validated_data['question_id']
+    result = save_responses(user_assessment, [serializer.validated_data])
     
+    return Response({
+        'message': 'Response submitted successfully',
+        'response': AssessmentResponseSerializer(result['saved'][0]).data,
+        'assessment_status': user_assessment.status,
+        'completion_percentage': result['completion_percentage']
+    })
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def submit_assessment_responses(request, assessment_id):
+    """Submit all responses to an assessment in one request"""
     try:
-        question = AssessmentQuestion.objects.get(
-            id=question_id,
-            template=assessment.template
-        )
-    except AssessmentQuestion.DoesNotExist:
+        user_assessment = _get_open_user_assessment(request, assessment_id)
+    except UserAssessment.DoesNotExist:
         return Response(
-            {'error': 'Question not found in this assessment'},
+            {'error': 'Assessment not found or not in progress'},
             status=status.HTTP_404_NOT_FOUND
         )
     
-    # Create or update response
-    response_obj, created = AssessmentResponse.objects.update_or_create(
-        assessment=assessment,
-        question=question,
-        defaults={
-            'response_value': serializer.validated_data.get('response_value'),
-            'response_text': serializer.validated_data.get('response_text'),
-            'score': serializer.validated_data.get('response_value', 0)
-        }
-    )
-    
-    # Check if assessment is complete
-    total_questions = assessment.template.questions.count()
-    completed_responses = assessment.responses.count()
+    serializer = BulkSubmitResponseSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
-    if completed_responses >= total_questions:
-        # Calculate total score
-        total_score = assessment.responses.aggregate(
-            total=Sum('score')
-        )['total'] or 0
-        
-        assessment.status = 'completed'
-        assessment.total_score = total_score
-        assessment.completed_at = timezone.now()
-        assessment.save()
+    result = save_responses(
+        user_assessment,
+        serializer.validated_data['responses'],
+        finalize=serializer.validated_data['finalize']
+    )
     
     return Response({
-        'message': 'Response submitted successfully',
-        'response': AssessmentResponseSerializer(response_obj).data,
-        'assessment_status': assessment.status,
-        'completion_percentage': (completed_responses / total_questions) * 100
+        'message': f"{len(result['saved'])} responses submitted successfully",
+        'assessment_status': user_assessment.status,
+        'score': user_assessment.score,
+        'answered_questions': result['answered_questions'],
+        'total_questions': result['total_questions'],
+        'missing_required': result['missing_required'],
+        'completion_percentage': result['completion_percentage']
     })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etag_per_user('assessment_dashboard')
+@cache_per_user('assessment_dashboard')
+@read_from_replica
 def assessment_dashboard(request):
     """Get assessment dashboard data"""
     user = request.user
     
     # Basic stats
-    assessments = Assessment.objects.filter(user=user)
-    total_assessments = assessments.count()
-    completed_assessments = assessments.filter(status='completed').count()
-    in_progress_assessments = assessments.filter(status='in_progress').count()
-    
-    # Average score
-    avg_score = assessments.filter(status='completed').aggregate(
-        avg=Avg('total_score')
-    )['avg'] or 0
+    assessments = UserAssessment.objects.filter(user=user)
+    totals = assessments.aggregate(
+        total=Count('id'),
+        completed=Count('id', filter=Q(status='completed')),
+        in_progress=Count('id', filter=Q(status='in_progress')),
+        avg_score=Avg('score', filter=Q(status='completed'))
+    )
     
     # Recent assessments
-    recent_assessments = assessments.select_related('template').order_by('-started_at')[:5]
+    recent_assessments = assessments.select_related('assessment').order_by('-created_at')[:5]
     recent_list = []
-    for assessment in recent_assessments:
+    for user_assessment in recent_assessments:
         recent_list.append({
-            'id': assessment.id,
-            'template_name': assessment.template.name,
-            'status': assessment.status,
-            'score': assessment.total_score,
-            'started_at': assessment.started_at,
-            'completed_at': assessment.completed_at
+            'id': user_assessment.id,
+            'assessment_title': user_assessment.assessment.title,
+            'status': user_assessment.status,
+            'score': user_assessment.score,
+            'started_at': user_assessment.started_at,
+            'completed_at': user_assessment.completed_at
         })
     
     # Improvement calculation (compare last 2 completed assessments)
-    completed = assessments.filter(status='completed').order_by('-completed_at')[:2]
+    completed = list(
+        assessments.filter(status='completed').order_by('-completed_at').values_list('score', flat=True)[:2]
+    )
     improvement_percentage = 0
     if len(completed) >= 2:
-        latest_score = completed[0].total_score or 0
-        previous_score = completed[1].total_score or 0
+        latest_score = completed[0] or 0
+        previous_score = completed[1] or 0
         if previous_score > 0:
             improvement_percentage = ((latest_score - previous_score) / previous_score) * 100
     
     stats = {
-        'total_assessments': total_assessments,
-        'completed_assessments': completed_assessments,
-        'in_progress_assessments': in_progress_assessments,
-        'average_score': round(avg_score, 2),
+        'total_assessments': totals['total'],
+        'completed_assessments': totals['completed'],
+        'in_progress_assessments': totals['in_progress'],
+        'average_score': round(totals['avg_score'] or 0, 2),
         'improvement_percentage': round(improvement_percentage, 2),
         'recent_assessments': recent_list
     }
     
-    # Weekly assessments (last 4 weeks)
-    weekly_assessments = WeeklyAssessment.objects.filter(
+    # Weekly progress (last 4 weeks)
+    weekly_progress = WeeklyProgress.objects.filter(
         user=user,
-        week_start__gte=timezone.now() - timedelta(weeks=4)
-    ).order_by('-week_start')
+        week_start_date__gte=timezone.localdate() - timedelta(weeks=4)
+    ).order_by('-week_start_date')
     
     # Behavior logs (last 7 days)
     recent_behaviors = BehaviorLog.objects.filter(
         user=user,
         logged_at__gte=timezone.now() - timedelta(days=7)
-    ).order_by('-logged_at')[:10]
+    ).select_related('user').order_by('-logged_at')[:10]
     
     return Response({
         'stats': stats,
-        'weekly_assessments': WeeklyAssessmentSerializer(weekly_assessments, many=True).data,
+        'weekly_progress': WeeklyProgressSerializer(weekly_progress, many=True).data,
         'recent_behaviors': BehaviorLogSerializer(recent_behaviors, many=True).data,
-        'templates': AssessmentTemplateSerializer(
-            AssessmentTemplate.objects.filter(is_active=True)[:5], 
+        'assessments': AssessmentTemplateSerializer(
+            with_question_counts(
+                Assessment.objects.filter(is_active=True)
+            ).select_related('category').prefetch_related('questions').order_by('title')[:5],
             many=True
         ).data
     })
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@read_from_replica
 def behavior_analysis(request):
     """Analyze behavior patterns"""
     user = request.user
-    days = int(request.GET.get('days', 30))
-    start_date = timezone.now() - timedelta(days=days)
+    try:
+        days = int(request.GET.get('days', 30))
+    except ValueError:
+        days = 0
+    if not 0 < days <= 366:
+        return Response(
+            {'error': 'days must be between 1 and 366'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
     
+    cache_key = analysis_cache_key(user.id, days)
+    data = cache.get(cache_key)
+    if data is not None:
+        return Response(data)
+    
+    start_date = timezone.now() - timedelta(days=days)
     behaviors = BehaviorLog.objects.filter(
         user=user,
         logged_at__gte=start_date
     )
     
-    total_logs = behaviors.count()
+    totals = behaviors.aggregate(total=Count('id'), avg=Avg('intensity'))
+    total_logs = totals['total']
     
     if total_logs == 0:
-        return Response({
+        data = {
             'total_logs': 0,
             'most_common_behavior': None,
             'average_intensity': 0,
             'common_triggers': [],
             'time_patterns': {},
             'weekly_trends': []
-        })
-    
-    # Most common behavior
-    most_common = behaviors.values('behavior_type').annotate(
-        count=Count('behavior_type')
-    ).order_by('-count').first()
-    
-    most_common_behavior = most_common['behavior_type'] if most_common else None
-    
-    # Average intensity
-    avg_intensity = behaviors.aggregate(avg=Avg('intensity'))['avg'] or 0
-    
-    # Common triggers
-    all_triggers = []
-    for behavior in behaviors:
-        if behavior.triggers:
-            all_triggers.extend(behavior.triggers)
-    
-    trigger_counts = {}
-    for trigger in all_triggers:
-        trigger_counts[trigger] = trigger_counts.get(trigger, 0) + 1
-    
-    common_triggers = sorted(trigger_counts.items(), key=lambda x: x[1], reverse=True)[:5]
-    common_triggers = [trigger[0] for trigger in common_triggers]
-    
-    # Time patterns (hour of day)
-    time_patterns = {}
-    for behavior in behaviors:
-        hour = behavior.logged_at.hour
-        time_patterns[hour] = time_patterns.get(hour, 0) + 1
-    
-    # Weekly trends (last 4 weeks)
-    weekly_trends = []
-    for i in range(4):
-        week_start = timezone.now() - timedelta(weeks=i+1)
-        week_end = week_start + timedelta(weeks=1)
-        
-        week_count = behaviors.filter(
-            logged_at__gte=week_start,
-            logged_at__lt=week_end
-        ).count()
+        }
+    else:
+        # Most common behavior
+        most_common = behaviors.values('behavior_type').annotate(
+            count=Count('behavior_type')
+        ).order_by('-count').first()
         
-        weekly_trends.append({
-            'week': f'Week {i+1}',
-            'count': week_count,
-            'start_date': week_start.date()
-        })
-    
-    weekly_trends.reverse()  # Show oldest to newest
+        data = {
+            'total_logs': total_logs,
+            'most_common_behavior': most_common['behavior_type'] if most_common else None,
+            'average_intensity': round(totals['avg'] or 0, 2),
+            'common_triggers': common_triggers(behaviors),
+            'time_patterns': hourly_histogram(behaviors),
+            'weekly_trends': weekly_trends(behaviors)
+        }
     
-    return Response({
-        'total_logs': total_logs,
-        'most_common_behavior': most_common_behavior,
-        'average_intensity': round(avg_intensity, 2),
-        'common_triggers': common_triggers,
-        'time_patterns': time_patterns,
-        'weekly_trends': weekly_trends
-    })
+    cache.set(cache_key, data, ANALYSIS_CACHE_TIMEOUT)
+    return Response(data)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def generate_progress_report(request):
-    """Generate progress report for user"""
-    user = request.user
+    """Request a progress report; generated in the background"""
     report_type = request.data.get('report_type', 'monthly')
     
-    # Determine date range
-    if report_type == 'weekly':
-        days = 7
-    elif report_type == 'monthly':
-        days = 30
-    else:  # quarterly
-        days = 90
-    
-    period_end = timezone.now()
-    period_start = period_end - timedelta(days=days)
-    
-    # Gather data for report
-    assessments = Assessment.objects.filter(
-        user=user,
-        completed_at__gte=period_start,
-        status='completed'
-    )
-    
-    behaviors = BehaviorLog.objects.filter(
-        user=user,
-        logged_at__gte=period_start
-    )
-    
-    weekly_assessments = WeeklyAssessment.objects.filter(
-        user=user,
-        week_start__gte=period_start
-    )
-    
-    # Calculate metrics
-    avg_assessment_score = assessments.aggregate(avg=Avg('total_score'))['avg'] or 0
-    behavior_count = behaviors.count()
-    avg_mood = weekly_assessments.aggregate(avg=Avg('mood_rating'))['avg'] or 0
-    avg_focus = weekly_assessments.aggregate(avg=Avg('focus_rating'))['avg'] or 0
-    
-    # Generate insights
-    strengths = []
-    improvement_areas = []
-    recommendations = []
-    
-    if avg_mood >= 4:
-        strengths.append("Maintaining positive mood")
-    elif avg_mood < 3:
-        improvement_areas.append("Mood regulation")
-        recommendations.append("Consider mood tracking and relaxation techniques")
-    
-    if avg_focus >= 4:
-        strengths.append("Good focus and attention")
-    elif avg_focus < 3:
-        improvement_areas.append("Focus and concentration")
-        recommendations.append("Implement focus improvement strategies")
+    job, queued = request_report(request.user, report_type)
     
-    if behavior_count < 5:
-        strengths.append("Low challenging behavior frequency")
-    else:
-        improvement_areas.append("Behavior management")
-        recommendations.append("Review behavior triggers and coping strategies")
-    
-    # Generated data structure
-    generated_data = {
-        'period_stats': {
-            'assessments_completed': assessments.count(),
-            'avg_assessment_score': round(avg_assessment_score, 2),
-            'behavior_logs': behavior_count,
-            'weekly_check_ins': weekly_assessments.count(),
-            'avg_mood_rating': round(avg_mood, 2),
-            'avg_focus_rating': round(avg_focus, 2)
-        },
-        'trends': {
-            'mood_trend': list(weekly_assessments.values_list('mood_rating', flat=True)),
-            'focus_trend': list(weekly_assessments.values_list('focus_rating', flat=True))
-        },
-        'insights': {
-            'top_behaviors': list(behaviors.values('behavior_type').annotate(
-                count=Count('behavior_type')
-            ).order_by('-count')[:3]),
-            'medication_adherence': round(
-                weekly_assessments.aggregate(avg=Avg('medication_adherence'))['avg'] or 0, 2
-            )
-        }
-    }
-    
-    # Create progress report
-    report = ProgressReport.objects.create(
-        user=user,
-        report_type=report_type,
-        period_start=period_start,
-        period_end=period_end,
-        overall_score=round(avg_assessment_score, 2),
-        improvement_areas=improvement_areas,
-        strengths=strengths,
-        recommendations=recommendations,
-        generated_data=generated_data
-    )
+    if job.status == 'completed':
+        return Response({
+            'message': 'Progress report generated successfully',
+            **job_payload(job)
+        })
     
     return Response({
-        'message': 'Progress report generated successfully',
-        'report': ProgressReportSerializer(report).data
-    })
+        'message': 'Progress report generation queued' if queued else 'Progress report is being generated',
+        **job_payload(job)
+    }, status=status.HTTP_202_ACCEPTED)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def progress_report_job(request, job_id):
+    """Poll the status of a progress report job"""
+    try:
+        job = ReportJob.objects.get(job_id=job_id, user=request.user)
+    except ReportJob.DoesNotExist:
+        return Response(
+            {'error': 'Report job not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    return Response(job_payload(job))
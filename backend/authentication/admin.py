@@ -1,3 +1,12 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import RefreshToken
+
+
+@admin.register(RefreshToken)
+class RefreshTokenAdmin(admin.ModelAdmin):
+    list_display = ['user', 'jti', 'created_at', 'expires_at', 'revoked_at']
+    list_filter = ['revoked_at']
+    search_fields = ['user__username', 'jti']
+    raw_id_fields = ['user']
+    readonly_fields = ['jti', 'created_at']
@@ -0,0 +1,196 @@
+"""
+API token authentication.
+
+DRF's TokenAuthentication loads the token and its user from the database on
+every request. CachingTokenAuthentication keeps recently used tokens in a
+bounded LRU cache with a short TTL; each request gets its own copy of the
+cached user. Entries are dropped when a token is deleted (logout) and when
+its user is saved (e.g. deactivated), see ``authentication.signals``.
+
+Other worker processes learn about these changes through revocation markers
+in the default cache, checked on every hit: an entry loaded before its user
+last changed, or for a deleted token, is loaded again. Markers only reach
+other workers through a shared cache (CACHE_BACKEND=file); with the
+process-local default, other workers keep serving a revoked token for up to
+TOKEN_CACHE_TTL seconds.
+
+JWTAuthentication validates signed access tokens (AUTH_TOKEN_MODE = 'jwt')
+without any database access; see ``authentication.tokens``.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import exceptions
+from rest_framework.authentication import (
+    BaseAuthentication, TokenAuthentication, get_authorization_header,
+)
+
+from utils import metrics
+
+from .tokens import ACCESS, TokenError, decode_token, user_from_claims
+
+
+def _revoked_token_key(key):
+    return f'token_revoked:{key}'
+
+
+def _user_changed_key(user_id):
+    return f'token_user_changed:{user_id}'
+
+
+class TokenCache:
+    """Bounded LRU cache of token key -> (user, token, load time) with expiry"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[2] <= now:
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1], entry[3]
+
+    def set(self, key, user, token, loaded_at=None):
+        """``loaded_at`` is the wall clock time the user was read from the database"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (
+                user, token, time.monotonic() + self.ttl,
+                time.time() if loaded_at is None else loaded_at
+            )
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        user = self._entries.pop(key)[0]
+        keys = self._keys_by_user.get(user.pk)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user.pk]
+
+    def invalidate_key(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+                self.invalidations += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in list(self._keys_by_user.get(user_id, ())):
+                self._remove(key)
+                self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE, settings.TOKEN_CACHE_TTL)
+
+metrics.Counter(
+    'auth_token_cache_lookups_total', 'API token cache lookups', ('result',),
+    function=lambda: {('hit',): token_cache.hits, ('miss',): token_cache.misses},
+)
+metrics.Counter(
+    'auth_token_cache_evictions_total', 'Tokens dropped from the full token cache',
+    function=lambda: {(): token_cache.evictions},
+)
+
+
+def revoke_token(key):
+    """Drop a deleted token here and, through the shared cache, in other workers"""
+    cache.set(_revoked_token_key(key), 1, settings.TOKEN_CACHE_TTL)
+    token_cache.invalidate_key(key)
+
+
+def user_changed(user_id):
+    """Reload a saved user's tokens here and, through the shared cache, in other workers"""
+    cache.set(_user_changed_key(user_id), time.time(), settings.TOKEN_CACHE_TTL)
+    token_cache.invalidate_user(user_id)
+
+
+def _is_revoked(key, user_id, loaded_at):
+    markers = cache.get_many([_revoked_token_key(key), _user_changed_key(user_id)])
+    if _revoked_token_key(key) in markers:
+        return True
+    changed_at = markers.get(_user_changed_key(user_id))
+    return changed_at is not None and changed_at >= loaded_at
+
+
+class CachingTokenAuthentication(TokenAuthentication):
+    """TokenAuthentication that serves repeated tokens from ``token_cache``"""
+
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is not None:
+            user, token, loaded_at = cached
+            if not _is_revoked(key, user.pk, loaded_at):
+                return copy.copy(user), copy.copy(token)
+            token_cache.invalidate_key(key)
+
+        # Taken before the query, so a change committed meanwhile is seen as newer
+        loaded_at = time.time()
+        user, token = super().authenticate_credentials(key)
+        token_cache.set(key, copy.copy(user), copy.copy(token), loaded_at)
+        return user, token
+
+
+class JWTAuthentication(BaseAuthentication):
+    """Stateless ``Authorization: Bearer <access token>`` authentication"""
+    keyword = 'Bearer'
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed('Invalid token header.')
+
+        try:
+            payload = decode_token(auth[1].decode(), ACCESS)
+        except (TokenError, UnicodeError) as e:
+            raise exceptions.AuthenticationFailed(str(e))
+        if not payload.get('is_active', True):
+            raise exceptions.AuthenticationFailed('User inactive or deleted.')
+        return user_from_claims(payload), payload
+
+    def authenticate_header(self, request):
+        return self.keyword
@@ -1,3 +1,15 @@
+import uuid
+
+from django.conf import settings
 from django.db import models
 
-# Create your models here.
+class RefreshToken(models.Model):
+    """Issued JWT refresh token, kept so it can be rotated and revoked"""
+    jti = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='refresh_tokens')
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    revoked_at = models.DateTimeField(null=True, blank=True)
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.jti}"
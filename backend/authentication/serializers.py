@@ -2,8 +2,9 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from users.models import User
+from utils.instrumentation import TimedSerializerMixin
 
-class LoginSerializer(serializers.Serializer):
+class LoginSerializer(TimedSerializerMixin, serializers.Serializer):
     username = serializers.CharField()
     password = serializers.CharField()
     
@@ -23,7 +24,7 @@ class LoginSerializer(serializers.Serializer):
         
         return attrs
 
-class PasswordResetSerializer(serializers.Serializer):
+class PasswordResetSerializer(TimedSerializerMixin, serializers.Serializer):
     email = serializers.EmailField()
     
     def validate_email(self, value):
@@ -33,7 +34,7 @@ class PasswordResetSerializer(serializers.Serializer):
             raise serializers.ValidationError('No user found with this email address')
         return value
 
-class PasswordResetConfirmSerializer(serializers.Serializer):
+class PasswordResetConfirmSerializer(TimedSerializerMixin, serializers.Serializer):
     token = serializers.CharField()
     password = serializers.CharField()
     password_confirm = serializers.CharField()
@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from .authentication import revoke_token, user_changed
+
+
+@receiver(post_delete, sender=Token)
+def invalidate_deleted_token(sender, instance, **kwargs):
+    revoke_token(instance.key)
+    transaction.on_commit(lambda: revoke_token(instance.key))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user_tokens(sender, instance, **kwargs):
+    """Deactivated or edited users are reloaded on their next request"""
+    user_changed(instance.pk)
+    transaction.on_commit(lambda: user_changed(instance.pk))
@@ -1,3 +1,141 @@
-from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.test import APIRequestFactory, APITestCase
 
-# Create your tests here.
+from users.models import ParentChildRelation, Profile, User
+from .authentication import JWTAuthentication, TokenCache, token_cache
+from .models import RefreshToken
+
+
+class TokenCacheTests(APITestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        self.token = Token.objects.create(user=self.user)
+        self.url = reverse('authentication:user-info')
+
+    def _user_info(self):
+        return self.client.get(self.url, HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeated_tokens_are_served_from_the_cache(self):
+        hits, misses = token_cache.hits, token_cache.misses
+        self.assertEqual(self._user_info().status_code, 200)
+        response = self._user_info()
+        self.assertEqual(response.data['username'], 'parent')
+        self.assertEqual((token_cache.hits - hits, token_cache.misses - misses), (1, 1))
+
+    def test_deactivated_users_are_rejected_at_once(self):
+        self.assertEqual(self._user_info().status_code, 200)
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._user_info().status_code, 403)
+
+    def test_deleted_tokens_are_rejected_at_once(self):
+        self.assertEqual(self._user_info().status_code, 200)
+
+        # delete() clears the primary key, which is the token's key
+        Token.objects.filter(key=self.token.key).delete()
+        self.assertEqual(self._user_info().status_code, 403)
+
+    def test_other_workers_drop_revoked_entries(self):
+        self.assertEqual(self._user_info().status_code, 200)
+        user, token, loaded_at = token_cache.get(self.token.key)
+
+        self.user.is_active = False
+        self.user.save()
+        # Another worker still holds the entry in its own token cache
+        token_cache.set(self.token.key, user, token, loaded_at)
+        self.assertEqual(self._user_info().status_code, 403)
+
+    def test_other_workers_drop_deleted_tokens(self):
+        self.assertEqual(self._user_info().status_code, 200)
+        user, token, loaded_at = token_cache.get(self.token.key)
+
+        Token.objects.filter(key=self.token.key).delete()
+        token_cache.set(self.token.key, user, token, loaded_at)
+        self.assertEqual(self._user_info().status_code, 403)
+
+    def test_least_recently_used_tokens_are_evicted(self):
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', self.user, None)
+        cache.set('b', self.user, None)
+        cache.get('a')
+        cache.set('c', self.user, None)
+
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('a'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        cache.invalidate_user(self.user.pk)
+        self.assertIsNone(cache.get('a'))
+        self.assertIsNone(cache.get('c'))
+
+
+@override_settings(AUTH_TOKEN_MODE='jwt')
+class JWTTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        response = self.client.post(
+            reverse('authentication:login'), {'username': 'parent', 'password': 'pw-123456'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.tokens = response.data
+
+    def _authenticate(self, access):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {access}')
+        return JWTAuthentication().authenticate(request)
+
+    def _refresh(self, refresh):
+        return self.client.post(reverse('authentication:token-refresh'), {'refresh': refresh})
+
+    def test_access_tokens_authenticate_without_queries(self):
+        with self.assertNumQueries(0):
+            user, payload = self._authenticate(self.tokens['access'])
+        self.assertEqual(
+            (user.pk, user.username, user.user_type, user.is_active, user.is_staff, user.is_superuser),
+            (self.user.pk, 'parent', 'parent', True, False, False)
+        )
+
+        with self.assertRaises(AuthenticationFailed):
+            self._authenticate(self.tokens['refresh'])
+
+    def test_user_dashboard_loads_each_row_once(self):
+        Profile.objects.create(user=self.user, bio='Parent')
+        for name in ('child1', 'child2'):
+            child = User.objects.create_user(username=name, password='pw-123456', user_type='child')
+            Profile.objects.create(user=child)
+            ParentChildRelation.objects.create(parent=self.user, child=child)
+        user, _ = self._authenticate(self.tokens['access'])
+        self.client.force_authenticate(user)
+
+        # The user with profile, the user's children, and their rows with profiles
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('users:dashboard-data'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['user']['profile']['bio'], 'Parent')
+        self.assertEqual([child['username'] for child in response.data['children']], ['child1', 'child2'])
+
+    def test_refresh_rotates_the_pair(self):
+        response = self._refresh(self.tokens['refresh'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data['refresh'], self.tokens['refresh'])
+        self.assertEqual(self._authenticate(response.data['access'])[0].pk, self.user.pk)
+
+        self.assertEqual(self._refresh(response.data['refresh']).status_code, 200)
+
+    def test_reusing_a_rotated_refresh_token_revokes_all_tokens(self):
+        rotated = self._refresh(self.tokens['refresh']).data
+
+        response = self._refresh(self.tokens['refresh'])
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.data['error'], 'Token has been revoked')
+        self.assertFalse(RefreshToken.objects.filter(user=self.user, revoked_at__isnull=True).exists())
+        self.assertEqual(self._refresh(rotated['refresh']).status_code, 401)
+
+    def test_inactive_users_cannot_refresh(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self._refresh(self.tokens['refresh']).status_code, 401)
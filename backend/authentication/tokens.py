@@ -0,0 +1,129 @@
+"""
+Signed access/refresh token pairs (AUTH_TOKEN_MODE = 'jwt').
+
+Access tokens are short-lived JWTs carrying the user's id and the fields
+needed for scoping checks; they are validated from the signature alone,
+without a database query. Refresh tokens are JWTs too, but their ``jti`` is
+stored in RefreshToken so they can be revoked. Every refresh rotates the
+pair; presenting an already rotated refresh token revokes all of the user's
+refresh tokens, since it indicates the token was copied.
+"""
+from datetime import timedelta
+
+import jwt
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.utils import timezone
+
+from .models import RefreshToken
+
+ACCESS = 'access'
+REFRESH = 'refresh'
+
+# User fields embedded in access tokens and available without a query: the
+# ones permission checks, scoping and display names (get_full_name) read
+USER_CLAIMS = (
+    'username', 'first_name', 'last_name', 'user_type', 'is_active', 'is_staff', 'is_superuser',
+)
+
+
+class TokenError(Exception):
+    pass
+
+
+def _encode(payload):
+    return jwt.encode(payload, settings.JWT_SIGNING_KEY, algorithm=settings.JWT_ALGORITHM)
+
+
+def decode_token(token, token_type):
+    """Verify a token's signature, expiry and type and return its claims"""
+    try:
+        payload = jwt.decode(
+            token, settings.JWT_SIGNING_KEY, algorithms=[settings.JWT_ALGORITHM],
+            options={'require': ['exp', 'iat', 'sub', 'type']}
+        )
+    except jwt.ExpiredSignatureError:
+        raise TokenError('Token has expired')
+    except jwt.InvalidTokenError:
+        raise TokenError('Invalid token')
+    if payload['type'] != token_type:
+        raise TokenError('Invalid token type')
+    return payload
+
+
+def access_token(user, now=None):
+    now = now or timezone.now()
+    payload = {
+        'type': ACCESS,
+        'sub': str(user.pk),
+        'iat': now,
+        'exp': now + timedelta(seconds=settings.JWT_ACCESS_TTL),
+    }
+    payload.update({claim: getattr(user, claim) for claim in USER_CLAIMS})
+    return _encode(payload)
+
+
+def issue_tokens(user):
+    """Create a new access/refresh pair for a user"""
+    now = timezone.now()
+    refresh = RefreshToken.objects.create(
+        user=user, expires_at=now + timedelta(seconds=settings.JWT_REFRESH_TTL)
+    )
+    return {
+        'access': access_token(user, now),
+        'refresh': _encode({
+            'type': REFRESH,
+            'sub': str(user.pk),
+            'jti': str(refresh.jti),
+            'iat': now,
+            'exp': refresh.expires_at,
+        }),
+        'token_type': 'Bearer',
+        'expires_in': settings.JWT_ACCESS_TTL,
+    }
+
+
+def rotate_tokens(refresh_token):
+    """Exchange a refresh token for a new pair, revoking the old one"""
+    payload = decode_token(refresh_token, REFRESH)
+
+    with transaction.atomic():
+        stored = RefreshToken.objects.select_for_update().select_related('user').filter(
+            jti=payload.get('jti'), user_id=payload['sub']
+        ).first()
+        if stored is None:
+            raise TokenError('Invalid token')
+        reused = stored.revoked_at is not None
+        if not reused:
+            if not stored.user.is_active:
+                raise TokenError('User is inactive')
+            stored.revoked_at = timezone.now()
+            stored.save(update_fields=['revoked_at'])
+            return stored.user, issue_tokens(stored.user)
+
+    # Revoke outside the block above so raising does not roll it back
+    revoke_user_tokens(stored.user)
+    raise TokenError('Token has been revoked')
+
+
+def revoke_user_tokens(user):
+    return RefreshToken.objects.filter(user=user, revoked_at__isnull=True).update(
+        revoked_at=timezone.now()
+    )
+
+
+def user_from_claims(payload):
+    """
+    User instance built from access token claims without a query.
+
+    Only the USER_CLAIMS in the token are loaded; any other field (email,
+    password, phone_number, ...) is deferred and costs a query on first
+    access, so views that read or serialize the whole row load it instead.
+    """
+    User = get_user_model()
+    # Tokens issued before a claim was added lack it, the field stays deferred
+    claims = {'id': int(payload['sub']), **{claim: payload[claim] for claim in USER_CLAIMS if claim in payload}}
+    # from_db() expects the values in the model's field order
+    fields = [field.attname for field in User._meta.concrete_fields if field.attname in claims]
+    return User.from_db('default', fields, [claims[field] for field in fields])
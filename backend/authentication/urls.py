@@ -8,5 +8,7 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('user-info/', views.user_info, name='user-info'),
     path('password-reset/', views.password_reset_request, name='password-reset'),
+    path('token/refresh/', views.refresh_token, name='token-refresh'),
     path('verify-token/', views.verify_token, name='verify-token'),
+    path('token-cache-stats/', views.token_cache_stats, name='token-cache-stats'),
 ]
\ No newline at end of file
@@ -1,10 +1,14 @@
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework.authtoken.models import Token
+from datetime import datetime, timezone as dt_timezone
+from django.conf import settings
 from django.contrib.auth import login, logout
+from .authentication import token_cache
 from .serializers import LoginSerializer, PasswordResetSerializer
+from .tokens import ACCESS, TokenError, decode_token, issue_tokens, revoke_user_tokens, rotate_tokens
 from users.serializers import UserSerializer
 
 @api_view(['POST'])
@@ -16,6 +20,13 @@ def login_view(request):
         user = serializer.validated_data['user']
         login(request, user)
         
+        if settings.AUTH_TOKEN_MODE == 'jwt':
+            return Response({
+                **issue_tokens(user),
+                'user': UserSerializer(user).data,
+                'message': 'Login successful'
+            })
+        
         # Create or get token
         token, created = Token.objects.get_or_create(user=user)
         
@@ -35,8 +46,10 @@ def login_view(request):
 def logout_view(request):
     """User logout endpoint"""
     try:
-        # Delete the token
+        # Delete the token and revoke refresh tokens; issued access tokens
+        # expire on their own within JWT_ACCESS_TTL
         Token.objects.filter(user=request.user).delete()
+        revoke_user_tokens(request.user)
         logout(request)
         return Response({'message': 'Logout successful'})
     except Exception as e:
@@ -79,6 +92,20 @@ def verify_token(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
+    if settings.AUTH_TOKEN_MODE == 'jwt' and token.count('.') == 2:
+        try:
+            payload = decode_token(token, ACCESS)
+        except TokenError as e:
+            return Response(
+                {'valid': False, 'error': str(e)},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
+        return Response({
+            'valid': True,
+            'user': {'id': int(payload['sub']), 'username': payload['username'], 'user_type': payload['user_type']},
+            'expires_at': datetime.fromtimestamp(payload['exp'], tz=dt_timezone.utc)
+        })
+    
     try:
         token_obj = Token.objects.get(key=token)
         user = token_obj.user
@@ -97,3 +124,29 @@ def verify_token(request):
             {'valid': False, 'error': 'Invalid token'}, 
             status=status.HTTP_401_UNAUTHORIZED
         )
+
+@api_view(['POST'])
+@permission_classes([AllowAny])
+def refresh_token(request):
+    """Exchange a refresh token for a new access/refresh pair"""
+    refresh = request.data.get('refresh')
+    if not refresh:
+        return Response(
+            {'error': 'Refresh token is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        user, tokens = rotate_tokens(refresh)
+    except TokenError as e:
+        return Response(
+            {'error': str(e)},
+            status=status.HTTP_401_UNAUTHORIZED
+        )
+    return Response(tokens)
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def token_cache_stats(request):
+    """Hit/miss statistics of this worker's token cache"""
+    return Response(token_cache.stats())
@@ -0,0 +1,345 @@
+"""
+Deterministic synthetic family dataset for benchmarks.
+
+Every family has one parent and ``children`` children with ``months`` of
+history up to the anchor date: focus sessions, medication schedules and
+logs, a daily schedule with activity completions, points, achievements and
+claimed rewards, a family chat room and AI assistant conversations.
+
+Rows are derived from ``random.Random(seed)`` and the anchor date only, so
+the same arguments always produce the same dataset (apart from primary
+keys). All users are named ``bench_*`` and share the password PASSWORD,
+including the staff user STAFF_USERNAME used for admin-only endpoints.
+Catalog rows (medications, rewards, achievements, sounds, an assessment)
+are named ``Bench *``. History is written with ``bulk_create``, so it sends
+no model signals and does not show up in the sync change log.
+"""
+import random
+from datetime import datetime, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from assessment.models import Assessment, AssessmentCategory, AssessmentQuestion
+from chat.models import AIConversation, AIMessage, ChatMessage, ChatRoom
+from focus.models import FocusSession, FocusSound, UserFocusSettings
+from medication.models import Medication, MedicationLog, MedicationSchedule, UserMedication
+from rewards.models import (
+    Achievement, PointsTransaction, Reward, RewardCategory, UserAchievement,
+    UserPoints, UserReward
+)
+from schedule.models import ActivityCompletion, Schedule, ScheduleActivity
+from users.models import ParentChildRelation, Profile, User
+
+USERNAME_PREFIX = 'bench_'
+CATALOG_PREFIX = 'Bench '
+STAFF_USERNAME = f'{USERNAME_PREFIX}staff'
+PASSWORD = 'bench-password-1'
+BATCH_SIZE = 1000
+
+WORDS = (
+    'homework', 'school', 'dinner', 'great', 'focus', 'break', 'tomorrow',
+    'math', 'reading', 'proud', 'play', 'outside', 'medicine', 'done', 'soon',
+    'remember', 'practice', 'star', 'weekend', 'park', 'music', 'tired',
+)
+ACTIVITIES = (
+    ('Morning medication', 'medication', time(7, 30), 10),
+    ('Homework', 'study', time(16, 0), 45),
+    ('Outdoor play', 'play', time(17, 0), 60),
+    ('Reading', 'focus_session', time(19, 0), 30),
+)
+MEDICATION_TIMES = (time(8, 0), time(20, 0))
+
+
+def parent_username(family):
+    return f'{USERNAME_PREFIX}parent_{family:04d}'
+
+
+def child_username(family, child):
+    return f'{USERNAME_PREFIX}child_{family:04d}_{child}'
+
+
+def _aware(day, at):
+    return timezone.make_aware(datetime.combine(day, at))
+
+
+def _sentence(rng, words=6):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _create(model, objects, backdate=()):
+    """bulk_create, then restore ``backdate`` fields that auto_now_add overwrote"""
+    values = [[getattr(obj, field) for field in backdate] for obj in objects]
+    model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+    if backdate and objects:
+        for obj, row in zip(objects, values):
+            for field, value in zip(backdate, row):
+                setattr(obj, field, value)
+        model.objects.bulk_update(objects, list(backdate), batch_size=BATCH_SIZE)
+    return objects
+
+
+def clear_dataset():
+    """Delete every benchmark user and catalog row"""
+    User.objects.filter(username__startswith=USERNAME_PREFIX).delete()
+    for model in (Medication, Reward, RewardCategory, Achievement, FocusSound, AssessmentCategory):
+        model.objects.filter(name__startswith=CATALOG_PREFIX).delete()
+
+
+def _catalog(rng):
+    medications = _create(Medication, [
+        Medication(name=f'{CATALOG_PREFIX}{name}', dosage_form='tablet', strength=strength)
+        for name, strength in (('Methylphenidate', '10mg'), ('Atomoxetine', '25mg'), ('Guanfacine', '1mg'))
+    ])
+    category = _create(RewardCategory, [RewardCategory(name=f'{CATALOG_PREFIX}rewards')])[0]
+    rewards = _create(Reward, [
+        Reward(
+            category=category, name=f'{CATALOG_PREFIX}reward {i}', description=_sentence(rng),
+            reward_type=rng.choice(('virtual', 'activity', 'privilege')), points_cost=25 * (i + 1)
+        )
+        for i in range(12)
+    ])
+    achievements = _create(Achievement, [
+        Achievement(
+            name=f'{CATALOG_PREFIX}achievement {i}', description=_sentence(rng),
+            points_reward=10 * (i + 1), criteria={'sessions': 5 * (i + 1)}
+        )
+        for i in range(8)
+    ])
+    _create(FocusSound, [
+        FocusSound(
+            name=f'{CATALOG_PREFIX}{name}', sound_file=f'focus_sounds/{name}.mp3',
+            category='nature', duration=600
+        )
+        for name in ('rain', 'forest', 'waves')
+    ])
+    assessment = Assessment.objects.create(
+        category=AssessmentCategory.objects.create(name=f'{CATALOG_PREFIX}assessments'),
+        title=f'{CATALOG_PREFIX}weekly check', description=_sentence(rng), estimated_duration=5
+    )
+    _create(AssessmentQuestion, [
+        AssessmentQuestion(
+            assessment=assessment, question_text=_sentence(rng), question_type='scale',
+            options={'min': 1, 'max': 5, 'category': category}, order=i
+        )
+        for i, category in enumerate(('inattention', 'hyperactivity', 'inattention', 'mood'))
+    ])
+    return {'medications': medications, 'rewards': rewards, 'achievements': achievements}
+
+
+def _users(spec, password, today):
+    users = []
+    for family in range(spec['families']):
+        users.append(User(
+            username=parent_username(family), password=password, user_type='parent',
+            first_name=f'Parent{family}', email=f'{parent_username(family)}@example.com'
+        ))
+        for child in range(spec['children']):
+            users.append(User(
+                username=child_username(family, child), password=password, user_type='child',
+                first_name=f'Child{family}_{child}', email=f'{child_username(family, child)}@example.com',
+                date_of_birth=today.replace(year=today.year - 8 - child)
+            ))
+    _create(User, users)
+    _create(Profile, [Profile(user=user) for user in users])
+
+    size = spec['children'] + 1
+    families = [(users[i], users[i + 1:i + size]) for i in range(0, len(users), size)]
+    _create(ParentChildRelation, [
+        ParentChildRelation(parent=parent, child=child)
+        for parent, children in families for child in children
+    ])
+    return families
+
+
+def _focus(rng, child, days, today):
+    sessions = []
+    for offset in range(days, 0, -1):
+        day = today - timedelta(days=offset - 1)
+        for _ in range(rng.randint(0, 3)):
+            start = _aware(day, time(rng.randint(14, 19), rng.choice((0, 15, 30, 45))))
+            planned = rng.choice((15, 25, 25, 45))
+            completed = rng.random() < 0.85
+            actual = planned - rng.randint(0, 5) if completed else rng.randint(1, planned - 1)
+            sessions.append(FocusSession(
+                user=child, session_type=rng.choice(('pomodoro', 'pomodoro', 'focus')),
+                title=rng.choice(('Homework', 'Reading', 'Practice', None)),
+                planned_duration=planned, actual_duration=actual,
+                status='completed' if completed else 'cancelled',
+                start_time=start, end_time=start + timedelta(minutes=actual),
+                focused_seconds=actual * 60, created_at=start
+            ))
+    _create(FocusSession, sessions, backdate=('start_time', 'created_at'))
+    _create(UserFocusSettings, [UserFocusSettings(user=child)])
+    return sessions
+
+
+def _medication(rng, child, days, today, catalog):
+    start_date = today - timedelta(days=days)
+    prescriptions = _create(UserMedication, [
+        UserMedication(
+            user=child, medication=medication, prescribed_by='Dr. Bench', dosage='1 tablet',
+            frequency='twice daily', start_date=start_date
+        )
+        for medication in rng.sample(catalog['medications'], rng.randint(1, 2))
+    ])
+    _create(MedicationSchedule, [
+        MedicationSchedule(user_medication=prescription, time=at)
+        for prescription in prescriptions for at in MEDICATION_TIMES
+    ])
+
+    logs = []
+    for offset in range(days, 0, -1):
+        day = today - timedelta(days=offset - 1)
+        for prescription in prescriptions:
+            for at in MEDICATION_TIMES:
+                scheduled = _aware(day, at)
+                status = rng.choices(('taken', 'missed', 'delayed', 'skipped'), (85, 7, 6, 2))[0]
+                logs.append(MedicationLog(
+                    user_medication=prescription, scheduled_time=scheduled, status=status,
+                    actual_time=scheduled + timedelta(minutes=rng.randint(0, 40)) if status in ('taken', 'delayed') else None
+                ))
+    _create(MedicationLog, logs)
+
+
+def _schedule(rng, child, days, today):
+    schedule = _create(Schedule, [Schedule(
+        user=child, title='School days', schedule_type='daily', start_date=today - timedelta(days=days)
+    )])[0]
+    activities = _create(ScheduleActivity, [
+        ScheduleActivity(
+            schedule=schedule, title=title, activity_type=activity_type, start_time=start,
+            end_time=(datetime.combine(today, start) + timedelta(minutes=duration)).time(),
+            duration=duration, is_recurring=True, recurrence_pattern={'days': [1, 2, 3, 4, 5, 6, 7]}
+        )
+        for title, activity_type, start, duration in ACTIVITIES
+    ])
+
+    completions = []
+    for offset in range(days, 0, -1):
+        day = today - timedelta(days=offset - 1)
+        for activity in activities:
+            scheduled = _aware(day, activity.start_time)
+            status = 'pending' if offset == 1 else rng.choices(('completed', 'missed', 'cancelled'), (75, 20, 5))[0]
+            completed = status == 'completed'
+            completions.append(ActivityCompletion(
+                activity=activity, user=child, scheduled_date=day, scheduled_start_time=scheduled,
+                actual_start_time=scheduled if completed else None,
+                actual_end_time=scheduled + timedelta(minutes=activity.duration) if completed else None,
+                status=status, rating=rng.randint(1, 5) if completed else None
+            ))
+    _create(ActivityCompletion, completions)
+
+
+def _rewards(rng, child, sessions, catalog):
+    transactions = [
+        PointsTransaction(
+            user=child, transaction_type='earned', points=10, description='Focus session completed',
+            reference_id=f'focus:{session.id}', created_at=session.end_time
+        )
+        for session in sessions if session.status == 'completed'
+    ]
+    earned = sum(t.points for t in transactions)
+
+    claimed = []
+    spent = 0
+    for reward in rng.sample(catalog['rewards'], 3):
+        if spent + reward.points_cost <= earned // 2 and transactions:
+            spent += reward.points_cost
+            claimed.append(UserReward(user=child, reward=reward, points_spent=reward.points_cost))
+            transactions.append(PointsTransaction(
+                user=child, transaction_type='spent', points=-reward.points_cost,
+                description=f'Claimed {reward.name}', created_at=rng.choice(transactions).created_at
+            ))
+    _create(PointsTransaction, transactions, backdate=('created_at',))
+    _create(UserReward, claimed)
+    _create(UserPoints, [UserPoints(
+        user=child, total_points=earned, available_points=earned - spent,
+        lifetime_earned=earned, lifetime_spent=spent
+    )])
+    _create(UserAchievement, [
+        UserAchievement(user=child, achievement=achievement)
+        for achievement in catalog['achievements'][:rng.randint(1, len(catalog['achievements']))]
+    ])
+
+
+def _chat(rng, family, parent, children, days, today):
+    members = [parent, *children]
+    room = _create(ChatRoom, [ChatRoom(name=f'Family {family}', room_type='family', created_by=parent)])[0]
+    room.participants.set(members)
+
+    messages = []
+    for offset in range(days, 0, -1):
+        day = today - timedelta(days=offset - 1)
+        for _ in range(rng.randint(0, 6)):
+            at = _aware(day, time(rng.randint(7, 21), rng.randint(0, 59)))
+            messages.append(ChatMessage(
+                room=room, sender=rng.choice(members), content=_sentence(rng, rng.randint(3, 12)), created_at=at
+            ))
+    messages.sort(key=lambda message: message.created_at)
+    _create(ChatMessage, messages, backdate=('created_at',))
+
+    conversations, replies = [], []
+    for child in children:
+        for week in range(days // 7):
+            started = _aware(today - timedelta(days=days - week * 7 - 1), time(rng.randint(15, 20), 0))
+            conversation = AIConversation(
+                user=child, session_id=f'{child.username}-{week}', title=_sentence(rng, 3),
+                created_at=started
+            )
+            conversations.append(conversation)
+            for turn in range(rng.randint(1, 4) * 2):
+                replies.append((conversation, AIMessage(
+                    role='user' if turn % 2 == 0 else 'assistant',
+                    content=_sentence(rng, rng.randint(5, 30)),
+                    tokens_used=None if turn % 2 == 0 else rng.randint(40, 600),
+                    model_used=None if turn % 2 == 0 else 'bench-model',
+                    created_at=started + timedelta(seconds=20 * turn)
+                )))
+    _create(AIConversation, conversations, backdate=('created_at',))
+    for conversation, message in replies:
+        message.conversation = conversation
+    _create(AIMessage, [message for _, message in replies], backdate=('created_at',))
+
+
+def generate_dataset(families=10, children=2, months=3, seed=42, today=None):
+    """Create the dataset and return its ``dataset_summary()``"""
+    rng = random.Random(seed)
+    today = today or timezone.localdate()
+    days = months * 30
+    spec = {'families': families, 'children': children}
+
+    password = make_password(PASSWORD)
+    with transaction.atomic():
+        catalog = _catalog(rng)
+        User.objects.create(username=STAFF_USERNAME, password=password, is_staff=True)
+        household = _users(spec, password, today)
+        for family, (parent, kids) in enumerate(household):
+            for child in kids:
+                sessions = _focus(rng, child, days, today)
+                _medication(rng, child, days, today, catalog)
+                _schedule(rng, child, days, today)
+                _rewards(rng, child, sessions, catalog)
+            _chat(rng, family, parent, kids, days, today)
+
+    return dataset_summary()
+
+
+def dataset_summary():
+    """Number of benchmark users, families and history rows per model"""
+    owner_lookups = {
+        User: 'username__startswith',
+        FocusSession: 'user__username__startswith',
+        MedicationLog: 'user_medication__user__username__startswith',
+        ActivityCompletion: 'user__username__startswith',
+        PointsTransaction: 'user__username__startswith',
+        ChatMessage: 'room__created_by__username__startswith',
+        AIMessage: 'conversation__user__username__startswith',
+    }
+    summary = {
+        'families': User.objects.filter(username__startswith=f'{USERNAME_PREFIX}parent_').count(),
+    }
+    for model, lookup in owner_lookups.items():
+        summary[model._meta.label] = model.objects.filter(**{lookup: USERNAME_PREFIX}).count()
+    return summary
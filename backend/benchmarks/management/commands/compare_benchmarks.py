@@ -0,0 +1,87 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Report field -> how to read it from an endpoint result
+METRICS = {
+    'p50 ms': lambda result: result['latency_ms']['p50'],
+    'p99 ms': lambda result: result['latency_ms']['p99'],
+    'queries': lambda result: result.get('queries', {}).get('mean'),
+    'alloc kb': lambda result: result.get('alloc_kb', {}).get('peak'),
+}
+
+
+def _load(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise CommandError(f'Cannot read benchmark report {path}: {e}')
+
+
+def _change(before, after):
+    if before is None or after is None:
+        return None
+    if before == 0:
+        return 0.0 if after == 0 else float('inf')
+    return (after - before) / before * 100
+
+
+class Command(BaseCommand):
+    help = 'Compare two run_benchmarks reports and list endpoints that got slower'
+
+    def add_arguments(self, parser):
+        parser.add_argument('base', help='Report of the baseline commit')
+        parser.add_argument('new', help='Report of the commit under test')
+        parser.add_argument(
+            '--threshold', type=float, default=10.0,
+            help='Percent increase of a timing or allocation metric counted as a regression'
+        )
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Exit with an error when there are regressions'
+        )
+
+    def handle(self, *args, **options):
+        base, new = _load(options['base']), _load(options['new'])
+        if base['meta'].get('dataset') != new['meta'].get('dataset'):
+            self.stderr.write(self.style.WARNING('The reports were run against different datasets'))
+        for field in ('database', 'cache_mode', 'auth_token_mode', 'debug'):
+            if base['meta'].get(field) != new['meta'].get(field):
+                self.stderr.write(self.style.WARNING(
+                    f"{field} differs: {base['meta'].get(field)} -> {new['meta'].get(field)}"
+                ))
+
+        self.stdout.write(f"{str(base['meta'].get('commit'))[:10]} -> {str(new['meta'].get('commit'))[:10]}")
+        self.stdout.write(f"{'endpoint':<62}" + ''.join(f'{metric:>21}' for metric in METRICS))
+
+        regressions = []
+        for name in sorted(set(base['endpoints']) & set(new['endpoints'])):
+            before, after = base['endpoints'][name], new['endpoints'][name]
+            cells = []
+            for metric, read in METRICS.items():
+                old, current = read(before), read(after)
+                change = _change(old, current)
+                if change is None:
+                    cells.append(f"{'-':>21}")
+                    continue
+                # Any extra query is a regression; timings are noisy
+                regressed = current > old if metric == 'queries' else change > options['threshold']
+                if regressed:
+                    regressions.append(f'{name} {metric}: {old} -> {current}')
+                cells.append(f"{f'{old}->{current}':>13}{change:>+6.0f}%" + ('!' if regressed else ' '))
+            self.stdout.write(f'{name:<62}' + ''.join(cells))
+
+        for name in sorted(set(new['endpoints']) - set(base['endpoints'])):
+            self.stdout.write(f'{name:<62} new endpoint')
+        for name in sorted(set(base['endpoints']) - set(new['endpoints'])):
+            self.stdout.write(f'{name:<62} no longer benchmarked')
+
+        if regressions:
+            self.stdout.write(self.style.WARNING(f'{len(regressions)} regressions:'))
+            for regression in regressions:
+                self.stdout.write(f'  {regression}')
+            if options['fail']:
+                raise CommandError('Benchmark regressions found')
+        else:
+            self.stdout.write(self.style.SUCCESS('No regressions'))
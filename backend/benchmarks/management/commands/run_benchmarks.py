@@ -0,0 +1,71 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.runner import Runner
+from benchmarks.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = (
+        'Request every /api/v1 endpoint against the benchmark dataset and report '
+        'latency percentiles, query counts and allocations as JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20, help='Timed requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per endpoint')
+        parser.add_argument(
+            '--profile-requests', type=int, default=3,
+            help='Requests per endpoint measuring queries and allocations'
+        )
+        parser.add_argument(
+            '--only', default=None,
+            help='Only run endpoints whose name ("GET /api/v1/focus/statistics/") contains this text'
+        )
+        parser.add_argument(
+            '--warm', action='store_true',
+            help='Keep the cache between requests instead of clearing it'
+        )
+        parser.add_argument('--output', default=None, help='Write the JSON report to this file')
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1 or options['warmup'] < 0 or options['profile_requests'] < 0:
+            raise CommandError('--requests must be at least 1, --warmup and --profile-requests at least 0')
+        scenarios = SCENARIOS
+        if options['only']:
+            scenarios = [scenario for scenario in SCENARIOS if options['only'] in scenario.name]
+            if not scenarios:
+                raise CommandError(f'No endpoint matches "{options["only"]}"')
+        if settings.DEBUG:
+            self.stderr.write(self.style.WARNING('DEBUG is on, latencies include debug overhead'))
+
+        def progress(name, result):
+            latency = result['latency_ms']
+            self.stderr.write(
+                f"{name:<62}{latency['p50']:>9.2f}{latency['p99']:>9.2f}"
+                f"{result.get('queries', {}).get('mean', ''):>7}  {','.join(result['status'])}"
+            )
+
+        self.stderr.write(f"{'endpoint':<62}{'p50 ms':>9}{'p99 ms':>9}{'sql':>7}  status")
+        runner = Runner(
+            requests=options['requests'], warmup=options['warmup'],
+            profile_requests=options['profile_requests'], warm_cache=options['warm'],
+            scenarios=scenarios
+        )
+        try:
+            report = runner.run(progress)
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        for endpoint in report['uncovered']:
+            self.stderr.write(self.style.WARNING(f'No benchmark scenario for {endpoint}'))
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output + '\n')
+            self.stderr.write(self.style.SUCCESS(f"Report written to {options['output']}"))
+        else:
+            self.stdout.write(output)
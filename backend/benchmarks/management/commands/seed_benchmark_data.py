@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks.dataset import USERNAME_PREFIX, clear_dataset, generate_dataset
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Create the deterministic synthetic family dataset used by run_benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--families', type=int, default=10, help='Number of families')
+        parser.add_argument('--children', type=int, default=2, help='Children per family')
+        parser.add_argument('--months', type=int, default=3, help='Months of history per child')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed')
+        parser.add_argument(
+            '--reset', action='store_true',
+            help='Delete an existing benchmark dataset first'
+        )
+
+    def handle(self, *args, **options):
+        if min(options['families'], options['children'], options['months']) < 1:
+            raise CommandError('--families, --children and --months must be at least 1')
+
+        if User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+            if not options['reset']:
+                raise CommandError('A benchmark dataset already exists, pass --reset to replace it')
+            clear_dataset()
+
+        summary = generate_dataset(
+            families=options['families'], children=options['children'],
+            months=options['months'], seed=options['seed']
+        )
+        for label, count in summary.items():
+            self.stdout.write(f'{label:<28}{count:>10}')
+        self.stdout.write(self.style.SUCCESS('Benchmark dataset created'))
@@ -0,0 +1,219 @@
+"""
+Drive every benchmark scenario through the full request stack.
+
+Each scenario runs ``warmup`` untimed requests, then ``requests`` timed
+ones and finally ``profile_requests`` instrumented ones that record the
+SQL queries (on every database alias) and the Python memory allocated
+while handling the request. Queries the async dashboards run in their
+worker threads are not captured. Timing and instrumentation are separate passes
+so query capture and tracemalloc do not inflate the latencies.
+
+Requests go through the Django test client, which runs the real
+middleware, authentication and URL routing but no network server. Unless
+``warm_cache`` is set the cache is cleared before every request, so the
+numbers describe the work a request does rather than a cache hit.
+"""
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import ExitStack
+from urllib.parse import urlencode
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from .dataset import dataset_summary
+from .scenarios import SCENARIOS, Call, credentials, load_families, staff_user, uncovered
+
+FORMAT_VERSION = 1
+
+
+def percentile(values, percent):
+    """Nearest-rank percentile of sorted ``values``"""
+    return values[max(int(round(len(values) * percent / 100)) - 1, 0)]
+
+
+def _summary(values, digits=2):
+    values = sorted(values)
+    return {
+        'mean': round(statistics.mean(values), digits),
+        'p50': round(percentile(values, 50), digits),
+        'p90': round(percentile(values, 90), digits),
+        'p99': round(percentile(values, 99), digits),
+        'min': round(values[0], digits),
+        'max': round(values[-1], digits),
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+            text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Runner:
+    def __init__(self, requests=20, warmup=2, profile_requests=3, warm_cache=False, scenarios=SCENARIOS):
+        self.requests = requests
+        self.warmup = warmup
+        self.profile_requests = profile_requests
+        self.warm_cache = warm_cache
+        self.scenarios = scenarios
+
+    def _user(self, role, family):
+        if role == 'child':
+            return family.child
+        if role == 'parent':
+            return family.parent
+        if role == 'staff':
+            return self.staff
+        return None
+
+    def _send(self, scenario, iteration):
+        """Prepare one request and return a function sending it"""
+        family = self.families[iteration % len(self.families)]
+        call = scenario.prepare(family, iteration) if scenario.prepare else Call()
+
+        extra = {}
+        user = self._user(scenario.role, family)
+        if user is not None:
+            keyword, token = credentials(user)
+            extra['HTTP_AUTHORIZATION'] = f'{keyword} {token}'
+
+        path = scenario.path(call.kwargs)
+        client = APIClient(raise_request_exception=False)
+        if scenario.method == 'GET':
+            send = lambda: client.get(path, call.query, **extra)  # noqa: E731
+        else:
+            if call.query:
+                path = f'{path}?{urlencode(call.query)}'
+            method = getattr(client, scenario.method.lower())
+            send = lambda: method(path, call.data, format=call.format, **extra)  # noqa: E731
+
+        if not self.warm_cache:
+            cache.clear()
+        return send
+
+    @staticmethod
+    def _consume(response):
+        if response.streaming:
+            return len(b''.join(response.streaming_content))
+        return len(response.content)
+
+    def _timed(self, send):
+        start = time.perf_counter()
+        response = send()
+        size = self._consume(response)
+        return (time.perf_counter() - start) * 1000, response.status_code, size
+
+    def _profiled(self, send):
+        with ExitStack() as stack:
+            captured = [
+                stack.enter_context(CaptureQueriesContext(connections[alias]))
+                for alias in connections
+            ]
+            tracemalloc.start()
+            baseline = tracemalloc.get_traced_memory()[0]
+            try:
+                self._consume(send())
+                current, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+        queries = [query for context in captured for query in context.captured_queries]
+        return {
+            'queries': len(queries),
+            'db_ms': sum(float(query['time']) for query in queries) * 1000,
+            'alloc_peak_kb': (peak - baseline) / 1024,
+            'alloc_net_kb': (current - baseline) / 1024,
+        }
+
+    def run_scenario(self, scenario):
+        iteration = 0
+        for _ in range(self.warmup):
+            self._consume(self._send(scenario, iteration)())
+            iteration += 1
+
+        timings, statuses, sizes = [], Counter(), []
+        for _ in range(self.requests):
+            elapsed, status_code, size = self._timed(self._send(scenario, iteration))
+            timings.append(elapsed)
+            statuses[str(status_code)] += 1
+            sizes.append(size)
+            iteration += 1
+
+        profiles = []
+        for _ in range(self.profile_requests):
+            profiles.append(self._profiled(self._send(scenario, iteration)))
+            iteration += 1
+
+        result = {
+            'method': scenario.method,
+            'route': scenario.route,
+            'role': scenario.role,
+            'requests': self.requests,
+            'status': dict(sorted(statuses.items())),
+            'latency_ms': _summary(timings),
+            'response_bytes': round(statistics.mean(sizes)),
+        }
+        if profiles:
+            result.update({
+                'queries': {
+                    'mean': round(statistics.mean(p['queries'] for p in profiles), 1),
+                    'max': max(p['queries'] for p in profiles),
+                },
+                'db_ms': round(statistics.mean(p['db_ms'] for p in profiles), 2),
+                'alloc_kb': {
+                    'peak': round(statistics.median(p['alloc_peak_kb'] for p in profiles), 1),
+                    'net': round(statistics.median(p['alloc_net_kb'] for p in profiles), 1),
+                },
+            })
+        return result
+
+    def run(self, progress=None):
+        """Run every scenario and return the JSON-serializable report"""
+        self.families = load_families()
+        if not self.families:
+            raise ValueError('No benchmark dataset, run seed_benchmark_data first')
+        self.staff = staff_user()
+        # Write scenarios add rows, so describe the dataset as it was before
+        dataset = dataset_summary()
+
+        endpoints = {}
+        # The test client sends Host: testserver
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for scenario in self.scenarios:
+                endpoints[scenario.name] = self.run_scenario(scenario)
+                if progress:
+                    progress(scenario.name, endpoints[scenario.name])
+
+        return {
+            'meta': {
+                'format': FORMAT_VERSION,
+                'commit': _git_commit(),
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'cache': settings.CACHES['default']['BACKEND'],
+                'cache_mode': 'warm' if self.warm_cache else 'cold',
+                'auth_token_mode': settings.AUTH_TOKEN_MODE,
+                'debug': settings.DEBUG,
+                'requests': self.requests,
+                'warmup': self.warmup,
+                'profile_requests': self.profile_requests,
+                'dataset': dataset,
+            },
+            'endpoints': endpoints,
+            'uncovered': [f'{method} /api/v1/{route}' for method, route in uncovered()],
+        }
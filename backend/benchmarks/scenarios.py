@@ -0,0 +1,373 @@
+"""
+One scenario per routed /api/v1 endpoint and method.
+
+A scenario names the Django route it drives (``focus/sessions/<int:pk>/``),
+the user it runs as and an optional ``prepare(family, iteration)`` that
+returns the Call to make. ``prepare`` runs outside the timed section and
+puts the database in the state the request needs: write endpoints that
+would otherwise fail the second time (ending a session, re-creating a
+relation) get a fresh target on every iteration.
+
+Endpoints without a scenario are reported by ``uncovered()`` so new routes
+show up in the benchmark output instead of being skipped silently.
+"""
+import re
+import uuid
+from datetime import datetime, time, timedelta
+from typing import Callable, NamedTuple
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from assessment.models import Assessment, UserAssessment
+from assessment.reports import request_report
+from authentication.tokens import access_token, issue_tokens
+from focus.live import track_session
+from focus.models import FocusSession
+from medication.models import MedicationLog, UserMedication
+from rewards.models import Reward, UserPoints
+from users.models import ParentChildRelation, User
+
+from .dataset import PASSWORD, STAFF_USERNAME, USERNAME_PREFIX, child_username, parent_username
+
+API_PREFIX = 'api/v1/'
+METHODS = ('get', 'post', 'put', 'patch', 'delete')
+# Imported rows are dated far before the seeded history
+IMPORT_EPOCH = datetime(2000, 1, 1, 9, 0)
+
+
+class Call(NamedTuple):
+    kwargs: dict = {}
+    data: object = None
+    query: dict = None
+    format: str = 'json'
+
+
+class Scenario(NamedTuple):
+    method: str
+    route: str
+    role: str = 'child'  # child, parent, staff or anonymous
+    prepare: Callable = None
+
+    @property
+    def name(self):
+        return f'{self.method} /{API_PREFIX}{self.route}'
+
+    def path(self, kwargs):
+        return '/' + API_PREFIX + re.sub(
+            r'<(?:\w+:)?(\w+)>', lambda match: str(kwargs[match.group(1)]), self.route
+        )
+
+
+class Family:
+    """A benchmark parent with their first child"""
+
+    def __init__(self, index):
+        self.index = index
+        self.parent = User.objects.get(username=parent_username(index))
+        self.child = User.objects.get(username=child_username(index, 0))
+        self.user_medication = UserMedication.objects.filter(
+            user=self.child, is_active=True, medication__name__startswith='Bench '
+        ).order_by('id').first()
+        self.session = FocusSession.objects.filter(
+            user=self.child, status='completed'
+        ).order_by('-start_time').first()
+
+
+def load_families():
+    count = User.objects.filter(username__startswith=f'{USERNAME_PREFIX}parent_').count()
+    return [Family(index) for index in range(count)]
+
+
+def staff_user():
+    return User.objects.get(username=STAFF_USERNAME)
+
+
+def credentials(user):
+    """``(keyword, token)`` authenticating ``user`` in the configured AUTH_TOKEN_MODE"""
+    if settings.AUTH_TOKEN_MODE == 'jwt':
+        return 'Bearer', access_token(user)
+    # Logging out deletes the token, so this also recreates it
+    return 'Token', Token.objects.get_or_create(user=user)[0].key
+
+
+def _live_session(family, status='active'):
+    """A running (or paused) session for the child, replacing any other"""
+    FocusSession.objects.filter(user=family.child, status__in=('active', 'paused')).update(status='cancelled')
+    session = FocusSession.objects.create(
+        user=family.child, planned_duration=25, status=status,
+        segment_started_at=timezone.now() if status == 'active' else None
+    )
+    track_session(session)
+    return session
+
+
+def _session_kwargs(status):
+    return lambda family, i: Call(kwargs={'session_id': _live_session(family, status).id})
+
+
+def _register(family, i):
+    username = f'{USERNAME_PREFIX}register_{i}'
+    User.objects.filter(username=username).delete()
+    return Call(data={
+        'username': username, 'email': f'{username}@example.com', 'user_type': 'parent',
+        'password': PASSWORD, 'password_confirm': PASSWORD,
+    })
+
+
+def _relationship(family, i):
+    ParentChildRelation.objects.filter(parent=family.parent, child=family.child).delete()
+    return Call(data={'parent_id': family.parent.id, 'child_id': family.child.id})
+
+
+def _refresh(family, i):
+    return Call(data={'refresh': issue_tokens(family.child)['refresh']})
+
+
+def _user_medication_data(family):
+    return {
+        'medication_id': family.user_medication.medication_id, 'prescribed_by': 'Dr. Bench',
+        'dosage': '1 tablet', 'frequency': 'twice daily',
+        'start_date': family.user_medication.start_date.isoformat(),
+    }
+
+
+def _delete_user_medication(family, i):
+    user_medication = UserMedication.objects.create(
+        user=family.child, medication_id=family.user_medication.medication_id, is_active=False,
+        prescribed_by='Dr. Bench', dosage='1 tablet', frequency='once daily', start_date=timezone.localdate()
+    )
+    return Call(kwargs={'pk': user_medication.id})
+
+
+def _log_medication(family, i):
+    scheduled = timezone.make_aware(datetime.combine(timezone.localdate(), time(8, 0)))
+    return Call(data={
+        'user_medication_id': family.user_medication.id, 'scheduled_time': scheduled.isoformat(),
+        'status': 'taken',
+    })
+
+
+def _create_log(family, i):
+    scheduled = timezone.make_aware(IMPORT_EPOCH + timedelta(minutes=i))
+    MedicationLog.objects.filter(user_medication=family.user_medication, scheduled_time=scheduled).delete()
+    return Call(data={
+        'user_medication_id': family.user_medication.id, 'scheduled_time': scheduled.isoformat(),
+        'status': 'taken',
+    })
+
+
+def _user_assessment(family, i):
+    """A fresh in-progress assessment of the benchmark form"""
+    assessment = Assessment.objects.get(title__startswith='Bench ')
+    user_assessment = UserAssessment.objects.create(
+        user=family.child, assessment=assessment, status='in_progress', started_at=timezone.now()
+    )
+    return user_assessment, list(assessment.questions.values_list('id', flat=True))
+
+
+def _respond(family, i):
+    user_assessment, questions = _user_assessment(family, i)
+    return Call(kwargs={'assessment_id': user_assessment.id},
+                data={'question_id': questions[0], 'response_value': i % 5 + 1})
+
+
+def _respond_bulk(family, i):
+    user_assessment, questions = _user_assessment(family, i)
+    return Call(kwargs={'assessment_id': user_assessment.id}, data={'responses': [
+        {'question_id': question, 'response_value': (i + n) % 5 + 1} for n, question in enumerate(questions)
+    ]})
+
+
+def _claim(family, i):
+    reward = Reward.objects.filter(name__startswith='Bench ', is_active=True).order_by('points_cost').first()
+    UserPoints.objects.filter(user=family.child).update(available_points=reward.points_cost * 10)
+    return Call(data={'reward_id': reward.id})
+
+
+def _import_focus(family, i):
+    # Rows already imported are skipped, so free up this iteration's slot
+    start = timezone.make_aware(IMPORT_EPOCH + timedelta(days=i))
+    FocusSession.objects.filter(user=family.child, start_time=start).delete()
+    content = (
+        'start_time,end_time,planned_duration,status\n'
+        f'{start.isoformat()},{(start + timedelta(minutes=25)).isoformat()},25,completed\n'
+    )
+    return Call(
+        kwargs={'kind': 'focus'},
+        data={'file': SimpleUploadedFile('focus.csv', content.encode(), 'text/csv'), 'child_id': family.child.id},
+        format='multipart',
+    )
+
+
+def _sync_batch(family, i):
+    return Call(data={
+        'device_id': 'bench-device',
+        'events': [{
+            'id': uuid.uuid4().hex, 'type': 'break_requested',
+            'timestamp': timezone.now().isoformat(), 'data': {'reason': 'Benchmark'},
+        }],
+    })
+
+
+def _session_detail(data=None):
+    return lambda family, i: Call(kwargs={'pk': family.session.id}, data=data and data(family))
+
+
+def _user_medication_detail(data=None):
+    return lambda family, i: Call(kwargs={'pk': family.user_medication.id}, data=data and data(family))
+
+
+def _schedules(data=None):
+    return lambda family, i: Call(
+        kwargs={'user_medication_id': family.user_medication.id}, data=data and data(family)
+    )
+
+
+def _child_query(query):
+    return lambda family, i: Call(query={'child_id': family.child.id, **query})
+
+
+SCENARIOS = (
+    Scenario('GET', '', role='anonymous'),
+
+    # Authentication
+    Scenario('POST', 'auth/login/', role='anonymous',
+             prepare=lambda family, i: Call(data={'username': family.child.username, 'password': PASSWORD})),
+    Scenario('POST', 'auth/logout/'),
+    Scenario('GET', 'auth/user-info/'),
+    Scenario('POST', 'auth/password-reset/', role='anonymous',
+             prepare=lambda family, i: Call(data={'email': family.child.email})),
+    Scenario('POST', 'auth/token/refresh/', role='anonymous', prepare=_refresh),
+    Scenario('POST', 'auth/verify-token/', role='anonymous',
+             prepare=lambda family, i: Call(data={'token': credentials(family.child)[1]})),
+    Scenario('GET', 'auth/token-cache-stats/', role='staff'),
+
+    # Users
+    Scenario('POST', 'users/register/', role='anonymous', prepare=_register),
+    Scenario('GET', 'users/profile/'),
+    Scenario('PUT', 'users/profile/', prepare=lambda family, i: Call(data={
+                 'first_name': 'Child', 'last_name': 'Bench', 'profile': {'timezone': 'UTC', 'language': 'en'}
+             })),
+    Scenario('PATCH', 'users/profile/', prepare=lambda family, i: Call(data={'profile': {'bio': f'Benchmark run {i}'}})),
+    Scenario('GET', 'users/list/', role='parent'),
+    Scenario('GET', 'users/dashboard-data/'),
+    Scenario('POST', 'users/change-password/',
+             prepare=lambda family, i: Call(data={'old_password': PASSWORD, 'new_password': PASSWORD})),
+    Scenario('GET', 'users/relationships/', role='parent'),
+    Scenario('POST', 'users/relationships/', role='parent', prepare=_relationship),
+
+    # Focus
+    Scenario('GET', 'focus/sessions/'),
+    Scenario('POST', 'focus/sessions/',
+             prepare=lambda family, i: Call(data={'session_type': 'focus', 'planned_duration': 25, 'status': 'completed'})),
+    Scenario('GET', 'focus/sessions/<int:pk>/', prepare=_session_detail()),
+    Scenario('PUT', 'focus/sessions/<int:pk>/',
+             prepare=_session_detail(lambda family: {'planned_duration': family.session.planned_duration, 'title': 'Homework'})),
+    Scenario('PATCH', 'focus/sessions/<int:pk>/', prepare=_session_detail(lambda family: {'title': 'Reading'})),
+    Scenario('POST', 'focus/sessions/start/', prepare=lambda family, i: Call(data={'planned_duration': 25})),
+    Scenario('POST', 'focus/sessions/<int:session_id>/end/', prepare=_session_kwargs('active')),
+    Scenario('POST', 'focus/sessions/<int:session_id>/pause/', prepare=_session_kwargs('active')),
+    Scenario('POST', 'focus/sessions/<int:session_id>/resume/', prepare=_session_kwargs('paused')),
+    Scenario('POST', 'focus/sessions/<int:session_id>/heartbeat/', prepare=_session_kwargs('active')),
+    Scenario('GET', 'focus/live/', role='parent'),
+    Scenario('GET', 'focus/sounds/'),
+    Scenario('GET', 'focus/settings/'),
+    Scenario('PUT', 'focus/settings/', prepare=lambda family, i: Call(data={'pomodoro_duration': 25})),
+    Scenario('PATCH', 'focus/settings/', prepare=lambda family, i: Call(data={'sound_enabled': True})),
+    Scenario('GET', 'focus/statistics/', prepare=lambda family, i: Call(query={'days': 30})),
+
+    # Medication
+    Scenario('GET', 'medication/medications/'),
+    Scenario('GET', 'medication/user-medications/'),
+    Scenario('POST', 'medication/user-medications/',
+             prepare=lambda family, i: Call(data={**_user_medication_data(family), 'is_active': False})),
+    Scenario('GET', 'medication/user-medications/<int:pk>/', prepare=_user_medication_detail()),
+    Scenario('PUT', 'medication/user-medications/<int:pk>/', prepare=_user_medication_detail(_user_medication_data)),
+    Scenario('PATCH', 'medication/user-medications/<int:pk>/',
+             prepare=_user_medication_detail(lambda family: {'instructions': 'With breakfast'})),
+    Scenario('DELETE', 'medication/user-medications/<int:pk>/', prepare=_delete_user_medication),
+    Scenario('GET', 'medication/user-medications/<int:user_medication_id>/schedules/', prepare=_schedules()),
+    Scenario('POST', 'medication/user-medications/<int:user_medication_id>/schedules/',
+             prepare=_schedules(lambda family: {
+                 'user_medication': family.user_medication.id, 'time': '12:00', 'days_of_week': '67', 'is_active': False
+             })),
+    Scenario('GET', 'medication/logs/'),
+    Scenario('POST', 'medication/logs/', prepare=_create_log),
+    Scenario('GET', 'medication/dashboard/'),
+    Scenario('GET', 'medication/dashboard/async/'),
+    Scenario('POST', 'medication/log/', prepare=_log_medication),
+    Scenario('GET', 'medication/statistics/'),
+
+    # Rewards
+    Scenario('GET', 'rewards/dashboard/'),
+    Scenario('GET', 'rewards/dashboard/async/'),
+    Scenario('GET', 'rewards/categories/'),
+    Scenario('GET', 'rewards/rewards/'),
+    Scenario('GET', 'rewards/points/'),
+    Scenario('GET', 'rewards/points/transactions/'),
+    Scenario('POST', 'rewards/points/award/', prepare=lambda family, i: Call(data={'points': 5})),
+    Scenario('POST', 'rewards/claim/', prepare=_claim),
+    Scenario('GET', 'rewards/claimed/'),
+    Scenario('GET', 'rewards/achievements/'),
+    Scenario('GET', 'rewards/achievements/earned/'),
+    Scenario('POST', 'rewards/achievements/check/',
+             prepare=lambda family, i: Call(data={'activity_type': 'focus_completed'})),
+
+    # Assessments
+    Scenario('GET', 'assessment/dashboard/'),
+    Scenario('GET', 'assessment/categories/'),
+    Scenario('GET', 'assessment/templates/'),
+    Scenario('GET', 'assessment/assessments/'),
+    Scenario('POST', 'assessment/assessments/',
+             prepare=lambda family, i: Call(data={'assessment_id': Assessment.objects.get(title__startswith='Bench ').id})),
+    Scenario('GET', 'assessment/assessments/<int:pk>/',
+             prepare=lambda family, i: Call(kwargs={'pk': _user_assessment(family, i)[0].id})),
+    Scenario('POST', 'assessment/assessments/<int:assessment_id>/respond/', prepare=_respond),
+    Scenario('POST', 'assessment/assessments/<int:assessment_id>/respond/bulk/', prepare=_respond_bulk),
+    Scenario('GET', 'assessment/weekly/'),
+    Scenario('POST', 'assessment/weekly/',
+             prepare=lambda family, i: Call(data={'focus_sessions_completed': i, 'mood_average': 4})),
+    Scenario('GET', 'assessment/behaviors/'),
+    Scenario('POST', 'assessment/behaviors/',
+             prepare=lambda family, i: Call(data={'behavior_type': 'outburst', 'intensity': 2, 'triggers': ['noise']})),
+    Scenario('GET', 'assessment/behaviors/analysis/', prepare=lambda family, i: Call(query={'days': 30})),
+    Scenario('GET', 'assessment/reports/'),
+    Scenario('POST', 'assessment/reports/generate/', prepare=lambda family, i: Call(data={'report_type': 'weekly'})),
+    Scenario('GET', 'assessment/reports/jobs/<uuid:job_id>/',
+             prepare=lambda family, i: Call(kwargs={'job_id': request_report(family.child, 'weekly')[0].job_id})),
+
+    # Parent dashboard, export and import
+    Scenario('GET', 'dashboard/family/', role='parent'),
+    Scenario('GET', 'dashboard/export/', role='parent', prepare=_child_query({'datasets': 'focus,medication'})),
+    Scenario('POST', 'dashboard/import/<str:kind>/', role='parent', prepare=_import_focus),
+    Scenario('GET', 'dashboard/profiles/', role='staff'),
+    # 403 unless PROFILING_ENABLED, then 202 or 409 while a sampler runs
+    Scenario('POST', 'dashboard/profiles/sample/', role='staff',
+             prepare=lambda family, i: Call(data={'seconds': 0.05})),
+
+    # Offline sync
+    Scenario('POST', 'sync/batch/', prepare=_sync_batch),
+    Scenario('GET', 'sync/changes/'),
+)
+
+
+def _routes(resolver, prefix=''):
+    for pattern in resolver.url_patterns:
+        route = prefix + str(pattern.pattern)
+        if isinstance(pattern, URLResolver):
+            yield from _routes(pattern, route)
+        elif isinstance(pattern, URLPattern) and route.startswith(API_PREFIX):
+            view = getattr(pattern.callback, 'cls', None)
+            for method in METHODS:
+                if view is not None and hasattr(view, method):
+                    yield method.upper(), route[len(API_PREFIX):]
+
+
+def uncovered(scenarios=SCENARIOS):
+    """Routed /api/v1 (method, route) pairs no scenario drives"""
+    covered = {(scenario.method, scenario.route) for scenario in scenarios}
+    return sorted(set(_routes(get_resolver())) - covered)
@@ -1,10 +1,11 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
+from utils.instrumentation import TimedSerializerMixin
 from .models import ChatRoom, ChatMessage, AIConversation
 
 User = get_user_model()
 
-class UserChatSerializer(serializers.ModelSerializer):
+class UserChatSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Basic user serializer for chat"""
     full_name = serializers.CharField(source='get_full_name', read_only=True)
     
@@ -12,7 +13,7 @@ class UserChatSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'full_name', 'user_type']
 
-class ChatRoomSerializer(serializers.ModelSerializer):
+class ChatRoomSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Chat room serializer with participants"""
     participants = UserChatSerializer(many=True, read_only=True)
     participant_ids = serializers.PrimaryKeyRelatedField(
@@ -60,7 +61,7 @@ class ChatRoomSerializer(serializers.ModelSerializer):
             return messages.exclude(id__in=read_message_ids).count()
         return 0
 
-class MessageSerializer(serializers.ModelSerializer):
+class MessageSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Message serializer"""
     sender = UserChatSerializer(read_only=True)
     room_name = serializers.CharField(source='room.name', read_only=True)
@@ -74,7 +75,7 @@ class MessageSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['sender', 'created_at']
 
-class MessageCreateSerializer(serializers.ModelSerializer):
+class MessageCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating messages"""
     
     class Meta:
@@ -85,14 +86,14 @@ class MessageCreateSerializer(serializers.ModelSerializer):
         validated_data['sender'] = self.context['request'].user
         return super().create(validated_data)
 
-class AIAssistantSerializer(serializers.ModelSerializer):
+class AIAssistantSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """AI Assistant serializer - to be implemented"""
     
     class Meta:
         model = AIConversation  # Temporary placeholder
         fields = ['id', 'title']
 
-class AIConversationSerializer(serializers.ModelSerializer):
+class AIConversationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """AI Conversation serializer"""
     user = UserChatSerializer(read_only=True)
     assistant = AIAssistantSerializer(read_only=True)
@@ -106,7 +107,7 @@ class AIConversationSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['user', 'created_at', 'updated_at']
 
-class AIConversationCreateSerializer(serializers.ModelSerializer):
+class AIConversationCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating AI conversations"""
     
     class Meta:
@@ -118,7 +119,7 @@ class AIConversationCreateSerializer(serializers.ModelSerializer):
         validated_data['conversation_data'] = {'messages': []}
         return super().create(validated_data)
 
-class AIChatMessageSerializer(serializers.Serializer):
+class AIChatMessageSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for AI chat messages"""
     message = serializers.CharField(max_length=2000)
     conversation_id = serializers.IntegerField()
@@ -135,7 +136,7 @@ class AIChatMessageSerializer(serializers.Serializer):
         except AIConversation.DoesNotExist:
             raise serializers.ValidationError("Conversation not found or access denied")
 
-class ChatStatsSerializer(serializers.Serializer):
+class ChatStatsSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for chat statistics"""
     total_rooms = serializers.IntegerField()
     total_messages = serializers.IntegerField()
@@ -143,21 +144,15 @@ class ChatStatsSerializer(serializers.Serializer):
     active_conversations = serializers.IntegerField()
     recent_activity = serializers.ListField()
     
-class ParentChildChatSerializer(serializers.Serializer):
+class ParentChildChatSerializer(TimedSerializerMixin, serializers.Serializer):
     """Serializer for parent-child chat functionality"""
     child_id = serializers.IntegerField()
     message = serializers.CharField(max_length=1000)
     
     def validate_child_id(self, value):
         """Validate that child belongs to parent"""
-        from users.models import ParentChildRelation
+        from utils.permissions import is_parent_of
         
-        try:
-            relation = ParentChildRelation.objects.get(
-                parent=self.context['request'].user,
-                child_id=value,
-                is_active=True
-            )
-            return value
-        except ParentChildRelation.DoesNotExist:
-            raise serializers.ValidationError("Child not found or access denied")
\ No newline at end of file
+        if not is_parent_of(self.context['request'].user, value):
+            raise serializers.ValidationError("Child not found or access denied")
+        return value
\ No newline at end of file
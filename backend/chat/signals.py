@@ -0,0 +1,27 @@
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from utils import metrics
+
+from .models import AIMessage
+
+completion_seconds = metrics.Histogram(
+    'ai_completion_seconds', 'Time from a user message to the AI reply, by model', ('model',),
+    buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120),
+)
+tokens_total = metrics.Counter('ai_tokens_total', 'Tokens used by AI replies, by model', ('model',))
+
+
+@receiver(post_save, sender=AIMessage)
+def observe_ai_reply(sender, instance, created, raw=False, **kwargs):
+    """Export the latency and token usage of new assistant messages"""
+    if not created or raw or instance.role != 'assistant':
+        return
+    model = instance.model_used or 'unknown'
+    if instance.tokens_used:
+        tokens_total.inc(instance.tokens_used, model=model)
+    asked_at = AIMessage.objects.filter(
+        conversation_id=instance.conversation_id, role='user', created_at__lte=instance.created_at,
+    ).order_by('-created_at').values_list('created_at', flat=True).first()
+    if asked_at is not None:
+        completion_seconds.observe((instance.created_at - asked_at).total_seconds(), model=model)
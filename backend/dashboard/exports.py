@@ -0,0 +1,102 @@
+"""
+Streaming exports of a child's history.
+
+Rows are read with server-side cursors (``QuerySet.iterator``) in primary key
+order and encoded one at a time, so memory stays constant whatever the size
+of the history. Every row carries its dataset and id; passing the last
+``<dataset>:<id>`` seen as ``cursor`` resumes an interrupted export.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from assessment.models import AssessmentResponse, BehaviorLog
+from focus.models import FocusSession
+from medication.models import MedicationLog
+
+EXPORT_CHUNK_SIZE = 2000
+
+# dataset -> (queryset factory, date field used for range filters, exported fields)
+DATASETS = {
+    'focus': (
+        lambda user: FocusSession.objects.filter(user=user),
+        'start_time',
+        ['id', 'session_type', 'title', 'status', 'planned_duration',
+         'actual_duration', 'focused_seconds', 'paused_seconds',
+         'start_time', 'end_time'],
+    ),
+    'medication': (
+        lambda user: MedicationLog.objects.filter(user_medication__user=user),
+        'scheduled_time',
+        ['id', 'user_medication_id', 'user_medication__medication__name',
+         'scheduled_time', 'actual_time', 'status', 'notes'],
+    ),
+    'assessment': (
+        lambda user: AssessmentResponse.objects.filter(user_assessment__user=user),
+        'created_at',
+        ['id', 'user_assessment_id', 'user_assessment__assessment__title',
+         'question_id', 'question__question_text', 'response_value',
+         'response_text', 'created_at', 'updated_at'],
+    ),
+    'behavior': (
+        lambda user: BehaviorLog.objects.filter(user=user),
+        'logged_at',
+        ['id', 'behavior_type', 'intensity', 'duration', 'triggers',
+         'location', 'time_of_day', 'notes', 'logged_at', 'created_at'],
+    ),
+}
+
+
+def parse_cursor(cursor):
+    """Split a ``<dataset>:<id>`` resume cursor"""
+    dataset, _, last_id = (cursor or '').partition(':')
+    if dataset not in DATASETS or not last_id.isdigit():
+        raise ValueError('cursor must look like <dataset>:<id>')
+    return dataset, int(last_id)
+
+
+def iter_rows(user, datasets, start=None, end=None, cursor=None):
+    """Yield ``(dataset, row)`` pairs for the requested datasets in order"""
+    resume_dataset, resume_id = cursor if cursor else (None, None)
+    if resume_dataset is not None and resume_dataset in datasets:
+        datasets = datasets[datasets.index(resume_dataset):]
+
+    for dataset in datasets:
+        queryset_factory, date_field, fields = DATASETS[dataset]
+        queryset = queryset_factory(user)
+        if start:
+            queryset = queryset.filter(**{f'{date_field}__date__gte': start})
+        if end:
+            queryset = queryset.filter(**{f'{date_field}__date__lte': end})
+        if dataset == resume_dataset:
+            queryset = queryset.filter(id__gt=resume_id)
+
+        rows = queryset.order_by('id').values(*fields)
+        for row in rows.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield dataset, row
+
+
+def ndjson_lines(rows):
+    encoder = DjangoJSONEncoder()
+    for dataset, row in rows:
+        yield encoder.encode({'dataset': dataset, **row}) + '\n'
+
+
+class _Echo:
+    """File-like object whose write() returns the written value"""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, dataset):
+    writer = csv.writer(_Echo())
+    fields = DATASETS[dataset][2]
+    yield writer.writerow(fields)
+    for _, row in rows:
+        yield writer.writerow([
+            json.dumps(row[field], cls=DjangoJSONEncoder)
+            if isinstance(row[field], (dict, list)) else row[field]
+            for field in fields
+        ])
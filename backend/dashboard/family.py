@@ -0,0 +1,125 @@
+"""
+Family overview: every child's focus, medication, schedule and rewards
+summary for a parent. Each subsystem is summarised for all children with one
+grouped query, so the cost does not grow with the number of children.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, Q, Sum
+from django.utils import timezone
+
+from focus.models import FocusSession
+from medication.models import UserMedication
+from schedule.models import ActivityCompletion
+from users.models import User
+
+FOCUS_WINDOW_DAYS = 7
+ADHERENCE_WINDOW_DAYS = 30
+
+
+def focus_summaries(child_ids, today):
+    week_ago = today - timedelta(days=FOCUS_WINDOW_DAYS)
+    completed = Q(status='completed')
+    rows = FocusSession.objects.filter(
+        user_id__in=child_ids, start_time__date__gte=week_ago
+    ).values('user_id').annotate(
+        sessions_today=Count('id', filter=completed & Q(start_time__date=today)),
+        sessions_this_week=Count('id', filter=completed),
+        focus_minutes_this_week=Sum('actual_duration', filter=completed),
+    )
+    return {
+        row['user_id']: {
+            'sessions_today': row['sessions_today'],
+            'sessions_this_week': row['sessions_this_week'],
+            'focus_minutes_this_week': row['focus_minutes_this_week'] or 0,
+        }
+        for row in rows
+    }
+
+
+def medication_summaries(child_ids, today):
+    month_ago = today - timedelta(days=ADHERENCE_WINDOW_DAYS)
+    recent = Q(logs__scheduled_time__date__gte=month_ago)
+    rows = UserMedication.objects.filter(user_id__in=child_ids).values('user_id').annotate(
+        active_medications=Count('id', filter=Q(is_active=True), distinct=True),
+        logged=Count('logs', filter=recent),
+        taken=Count('logs', filter=recent & Q(logs__status='taken')),
+        taken_today=Count('logs', filter=Q(logs__scheduled_time__date=today, logs__status='taken')),
+    )
+    return {
+        row['user_id']: {
+            'active_medications': row['active_medications'],
+            'taken_today': row['taken_today'],
+            'adherence_rate': round(row['taken'] / row['logged'] * 100, 1) if row['logged'] else 0,
+        }
+        for row in rows
+    }
+
+
+def schedule_summaries(child_ids, today):
+    rows = ActivityCompletion.objects.filter(
+        user_id__in=child_ids, scheduled_date=today
+    ).values('user_id').annotate(
+        scheduled_today=Count('id'),
+        completed_today=Count('id', filter=Q(status='completed')),
+    )
+    return {
+        row['user_id']: {
+            'scheduled_today': row['scheduled_today'],
+            'completed_today': row['completed_today'],
+        }
+        for row in rows
+    }
+
+
+def rewards_summaries(child_ids, today):
+    week_ago = timezone.now() - timedelta(days=7)
+    rows = User.objects.filter(id__in=child_ids).values(
+        'id', 'points__available_points', 'points__total_points'
+    ).annotate(
+        points_earned_this_week=Sum(
+            'points_transactions__points',
+            filter=Q(
+                points_transactions__transaction_type='earned',
+                points_transactions__created_at__gte=week_ago
+            )
+        ),
+    )
+    return {
+        row['id']: {
+            'available_points': row['points__available_points'] or 0,
+            'total_points': row['points__total_points'] or 0,
+            'points_earned_this_week': row['points_earned_this_week'] or 0,
+        }
+        for row in rows
+    }
+
+
+SUBSYSTEMS = {
+    'focus': (focus_summaries, {'sessions_today': 0, 'sessions_this_week': 0, 'focus_minutes_this_week': 0}),
+    'medication': (medication_summaries, {'active_medications': 0, 'taken_today': 0, 'adherence_rate': 0}),
+    'schedule': (schedule_summaries, {'scheduled_today': 0, 'completed_today': 0}),
+    'rewards': (rewards_summaries, {'available_points': 0, 'total_points': 0, 'points_earned_this_week': 0}),
+}
+
+
+def family_overview(children):
+    """Summaries of every subsystem for the given child users"""
+    today = timezone.localdate()
+    child_ids = [child.id for child in children]
+    summaries = {
+        name: summarise(child_ids, today) for name, (summarise, _) in SUBSYSTEMS.items()
+    }
+
+    overview = []
+    for child in children:
+        item = {
+            'id': child.id,
+            'username': child.username,
+            'first_name': child.first_name,
+            'last_name': child.last_name,
+        }
+        for name, (_, empty) in SUBSYSTEMS.items():
+            item[name] = summaries[name].get(child.id, dict(empty))
+        overview.append(item)
+    return overview
@@ -0,0 +1,263 @@
+"""
+Bulk import of historical medication logs and focus sessions from CSV.
+
+Files are read one line at a time with ``csv.DictReader`` and processed in
+chunks of IMPORT_CHUNK_SIZE rows: each chunk is validated, checked against
+existing rows with a single query and written with ``bulk_create``. Created
+rows are added to the delta-sync change log explicitly since bulk writes send
+no model signals. Invalid or duplicate rows are reported per row and never
+abort the rest of the file.
+
+Medication log columns:
+    medication or user_medication_id, scheduled_time, status,
+    actual_time (optional), notes (optional)
+
+Focus session columns:
+    start_time, planned_duration, end_time (optional),
+    actual_duration (optional), session_type (optional, default pomodoro),
+    status (optional, default completed), title (optional)
+"""
+import csv
+from itertools import islice
+
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from focus.models import FocusSession
+from medication.models import MedicationLog, UserMedication
+from sync.changelog import record_changes
+from utils.cache import bump_generation
+from utils.db_router import pin_primary
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 200
+MAX_INTEGER = 2 ** 31 - 1  # Largest IntegerField value on every database
+
+
+class RowError(ValueError):
+    pass
+
+
+def _value(row, column):
+    value = row.get(column)
+    return value.strip() if isinstance(value, str) and value.strip() else None
+
+
+def _datetime(row, column, required=True):
+    value = _value(row, column)
+    if value is None:
+        if required:
+            raise RowError(f'{column} is required')
+        return None
+    try:
+        parsed = parse_datetime(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise RowError(f'{column} is not a valid datetime')
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def _integer(row, column, required=True):
+    value = _value(row, column)
+    if value is None:
+        if required:
+            raise RowError(f'{column} is required')
+        return None
+    try:
+        number = float(value)
+    except (ValueError, OverflowError):
+        raise RowError(f'{column} must be a number')
+    # is_integer() is also False for inf and nan
+    if not number.is_integer():
+        raise RowError(f'{column} must be a whole number')
+    if number < 0:
+        raise RowError(f'{column} must not be negative')
+    if number > MAX_INTEGER:
+        raise RowError(f'{column} is too large')
+    return int(number)
+
+
+def _choice(row, column, choices, default=None):
+    value = (_value(row, column) or default or '').lower()
+    if value not in dict(choices):
+        raise RowError(f"{column} must be one of: {', '.join(dict(choices))}")
+    return value
+
+
+class _Importer:
+    """Chunked CSV import; subclasses build objects and dedupe keys"""
+    model = None
+
+    def __init__(self, user):
+        self.user = user
+        self.seen = set()
+        self.result = {
+            'processed': 0,
+            'created': 0,
+            'duplicates': 0,
+            'error_count': 0,
+            'errors': [],
+        }
+
+    def build(self, row):
+        """Return ``(dedupe key, unsaved instance)`` or raise RowError"""
+        raise NotImplementedError
+
+    def existing_keys(self, keys):
+        raise NotImplementedError
+
+    def save(self, objects):
+        self.model.objects.bulk_create(objects)
+        record_changes(self.model, objects, 'insert')
+
+    def error(self, line, message):
+        self.result['error_count'] += 1
+        if len(self.result['errors']) < MAX_REPORTED_ERRORS:
+            self.result['errors'].append({'row': line, 'error': message})
+
+    def run(self, lines):
+        reader = csv.DictReader(lines)
+        rows = enumerate(reader, start=2)  # Line 1 is the header
+        while True:
+            chunk = list(islice(rows, IMPORT_CHUNK_SIZE))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+        return self.result
+
+    def import_chunk(self, chunk):
+        built = []
+        for line, row in chunk:
+            self.result['processed'] += 1
+            try:
+                key, instance = self.build(row)
+            except RowError as e:
+                self.error(line, str(e))
+                continue
+            if key in self.seen:
+                self.result['duplicates'] += 1
+                continue
+            self.seen.add(key)
+            built.append((key, instance))
+
+        existing = self.existing_keys([key for key, _ in built]) if built else set()
+        objects = []
+        for key, instance in built:
+            if key in existing:
+                self.result['duplicates'] += 1
+            else:
+                objects.append(instance)
+
+        if objects:
+            with transaction.atomic():
+                self.save(objects)
+            self.result['created'] += len(objects)
+
+
+class MedicationLogImporter(_Importer):
+    model = MedicationLog
+
+    def __init__(self, user):
+        super().__init__(user)
+        medications = list(
+            UserMedication.objects.filter(user=user).select_related('medication')
+        )
+        self.by_id = {m.id: m for m in medications}
+        # Prefer active prescriptions when a medication name is ambiguous
+        self.by_name = {}
+        for m in sorted(medications, key=lambda m: m.is_active):
+            self.by_name[m.medication.name.lower()] = m
+
+    def _user_medication(self, row):
+        user_medication_id = _value(row, 'user_medication_id')
+        if user_medication_id is not None:
+            user_medication = self.by_id.get(int(user_medication_id)) if user_medication_id.isdigit() else None
+        else:
+            name = _value(row, 'medication')
+            if name is None:
+                raise RowError('medication or user_medication_id is required')
+            user_medication = self.by_name.get(name.lower())
+        if user_medication is None:
+            raise RowError('Medication not found')
+        return user_medication
+
+    def build(self, row):
+        user_medication = self._user_medication(row)
+        scheduled_time = _datetime(row, 'scheduled_time')
+        log = MedicationLog(
+            user_medication=user_medication,
+            scheduled_time=scheduled_time,
+            actual_time=_datetime(row, 'actual_time', required=False),
+            status=_choice(row, 'status', MedicationLog.STATUS_CHOICES),
+            notes=_value(row, 'notes'),
+        )
+        return (user_medication.id, scheduled_time), log
+
+    def existing_keys(self, keys):
+        return set(MedicationLog.objects.filter(
+            user_medication_id__in={key[0] for key in keys},
+            scheduled_time__in={key[1] for key in keys},
+        ).values_list('user_medication_id', 'scheduled_time'))
+
+
+class FocusSessionImporter(_Importer):
+    model = FocusSession
+
+    def build(self, row):
+        start_time = _datetime(row, 'start_time')
+        end_time = _datetime(row, 'end_time', required=False)
+        if end_time is not None and end_time < start_time:
+            raise RowError('end_time is before start_time')
+
+        actual_duration = _integer(row, 'actual_duration', required=False)
+        if actual_duration is None and end_time is not None:
+            actual_duration = int((end_time - start_time).total_seconds() // 60)
+
+        session = FocusSession(
+            user=self.user,
+            session_type=_choice(row, 'session_type', FocusSession.SESSION_TYPES, 'pomodoro'),
+            title=_value(row, 'title'),
+            planned_duration=_integer(row, 'planned_duration'),
+            actual_duration=actual_duration,
+            focused_seconds=(actual_duration or 0) * 60,
+            status=_choice(row, 'status', FocusSession.STATUS_CHOICES, 'completed'),
+            start_time=start_time,
+            end_time=end_time,
+        )
+        if session.status in ('active', 'paused'):
+            raise RowError('Only finished sessions can be imported')
+        return start_time, session
+
+    def existing_keys(self, keys):
+        return set(FocusSession.objects.filter(
+            user=self.user, start_time__in=keys
+        ).values_list('start_time', flat=True))
+
+    def save(self, objects):
+        # start_time is auto_now_add, so restore the imported values afterwards
+        start_times = [session.start_time for session in objects]
+        FocusSession.objects.bulk_create(objects)
+        for session, start_time in zip(objects, start_times):
+            session.start_time = start_time
+            session.created_at = start_time
+        FocusSession.objects.bulk_update(objects, ['start_time', 'created_at'])
+        record_changes(FocusSession, objects, 'insert')
+
+
+IMPORTERS = {
+    'medication': MedicationLogImporter,
+    'focus': FocusSessionImporter,
+}
+
+
+def import_csv(user, kind, lines):
+    """Import CSV ``lines`` of the given kind for a user and return a report"""
+    result = IMPORTERS[kind](user).run(lines)
+    if result['created']:
+        bump_generation(user.id)
+        pin_primary(user.id)
+    return result
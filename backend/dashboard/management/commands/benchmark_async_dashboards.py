@@ -0,0 +1,153 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from rest_framework.authtoken.models import Token
+
+# Dashboard -> (sync view path, async view path)
+DASHBOARDS = {
+    'medication': ('/api/v1/medication/dashboard/', '/api/v1/medication/dashboard/async/'),
+    'rewards': ('/api/v1/rewards/dashboard/', '/api/v1/rewards/dashboard/async/'),
+}
+
+
+def _percentile(timings, percent):
+    return timings[max(int(round(len(timings) * percent / 100)) - 1, 0)]
+
+
+def _wsgi_run(path, token, count, concurrency):
+    handler = WSGIHandler()
+    environ = {'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'HTTP_AUTHORIZATION': f'Token {token}'}
+    setup_testing_defaults(environ)
+
+    def request(_):
+        status = []
+        start = time.perf_counter()
+        response = handler(dict(environ), lambda code, headers, exc_info=None: status.append(code))
+        for _chunk in response:
+            pass
+        response.close()
+        elapsed = (time.perf_counter() - start) * 1000
+        if not status[0].startswith('200'):
+            raise CommandError(f'GET {path} failed with {status[0]}')
+        return elapsed
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(request, range(count)))
+
+
+def _asgi_run(path, token, count, concurrency):
+    handler = ASGIHandler()
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'127.0.0.1'), (b'authorization', f'Token {token}'.encode())],
+        'client': ('127.0.0.1', 50000),
+        'server': ('127.0.0.1', 80),
+    }
+
+    async def request(semaphore):
+        async with semaphore:
+            sent = []
+            received = False
+            disconnected = asyncio.Event()
+
+            async def receive():
+                nonlocal received
+                if not received:
+                    received = True
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # The client stays connected until the response is sent
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+
+            start = time.perf_counter()
+            await handler(dict(scope), receive, send)
+            elapsed = (time.perf_counter() - start) * 1000
+            disconnected.set()
+            if sent[0]['status'] != 200:
+                raise CommandError(f"GET {path} failed with {sent[0]['status']}")
+            return elapsed
+
+    async def run():
+        semaphore = asyncio.Semaphore(concurrency)
+        return await asyncio.gather(*(request(semaphore) for _ in range(count)))
+
+    return asyncio.run(run())
+
+
+class Command(BaseCommand):
+    help = (
+        'Load-test the sync dashboard views through WSGI against their async '
+        'variants through ASGI and report latency percentiles'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username or id to authenticate as')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per view')
+        parser.add_argument('--concurrency', type=int, default=8, help='Requests in flight at once')
+        parser.add_argument(
+            '--dashboards', default=','.join(DASHBOARDS),
+            help=f"Comma separated dashboards out of {', '.join(DASHBOARDS)}"
+        )
+        parser.add_argument(
+            '--cached', action='store_true',
+            help='Serve from the per-user cache instead of recomputing every request'
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        lookup = options['user']
+        try:
+            if lookup.isdigit():
+                user = User.objects.get(id=int(lookup))
+            else:
+                user = User.objects.get(username=lookup)
+        except User.DoesNotExist:
+            raise CommandError(f'User "{lookup}" does not exist')
+        token, _ = Token.objects.get_or_create(user=user)
+
+        dashboards = [name.strip() for name in options['dashboards'].split(',')]
+        unknown = set(dashboards) - set(DASHBOARDS)
+        if unknown:
+            raise CommandError(f"Unknown dashboards: {', '.join(sorted(unknown))}")
+        count, concurrency = options['requests'], options['concurrency']
+        if count < 1 or concurrency < 1:
+            raise CommandError('--requests and --concurrency must be at least 1')
+
+        self.stdout.write(f'{count} requests per view, concurrency {concurrency}')
+        self.stdout.write(
+            f"{'dashboard':<12}{'server':<8}{'mean ms':>10}{'p50 ms':>10}{'p99 ms':>10}{'req/s':>10}"
+        )
+        # A zero timeout stores nothing, so every request runs its queries
+        cache_timeout = {} if options['cached'] else {'USER_CACHE_TIMEOUT': 0}
+        with override_settings(**cache_timeout):
+            for name in dashboards:
+                sync_path, async_path = DASHBOARDS[name]
+                for server, run, path in (('wsgi', _wsgi_run, sync_path), ('asgi', _asgi_run, async_path)):
+                    run(path, token.key, min(concurrency, count), concurrency)  # Warm up
+                    start = time.perf_counter()
+                    timings = sorted(run(path, token.key, count, concurrency))
+                    throughput = count / (time.perf_counter() - start)
+                    self.stdout.write(
+                        f"{name:<12}{server:<8}{statistics.mean(timings):>10.2f}"
+                        f"{_percentile(timings, 50):>10.2f}{_percentile(timings, 99):>10.2f}"
+                        f"{throughput:>10.1f}"
+                    )
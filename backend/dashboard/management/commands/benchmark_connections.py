@@ -0,0 +1,123 @@
+import statistics
+import time
+from wsgiref.util import setup_testing_defaults
+
+from django.contrib.auth import get_user_model
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.backends.signals import connection_created
+from rest_framework.authtoken.models import Token
+
+from dashboard_backend.database import CONN_MODES, pool_options
+
+
+def _mode_settings(original, mode):
+    options = {key: value for key, value in original.get('OPTIONS', {}).items() if key != 'pool'}
+    settings_dict = {**original, 'CONN_MAX_AGE': 0, 'CONN_HEALTH_CHECKS': False, 'OPTIONS': options}
+    if mode == 'persistent':
+        settings_dict['CONN_MAX_AGE'] = original.get('CONN_MAX_AGE') or 600
+        settings_dict['CONN_HEALTH_CHECKS'] = True
+    elif mode == 'pool':
+        if connection.vendor != 'postgresql':
+            raise CommandError('Connection pooling needs the Postgres backend')
+        options['pool'] = original.get('OPTIONS', {}).get('pool') or pool_options()
+    return settings_dict
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare request latency of an API endpoint with a new database connection '
+        'per request and with persistent or pooled connections'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', required=True, help='Username or id to authenticate as')
+        parser.add_argument('--path', default='/api/v1/auth/user-info/', help='GET endpoint to request')
+        parser.add_argument('--requests', type=int, default=200, help='Measured requests per mode')
+        parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per mode')
+        parser.add_argument(
+            '--modes', default=None,
+            help=f"Comma separated modes out of {', '.join(CONN_MODES)} "
+                 "(default: none,persistent and pool when configured)"
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        lookup = options['user']
+        try:
+            if lookup.isdigit():
+                user = User.objects.get(id=int(lookup))
+            else:
+                user = User.objects.get(username=lookup)
+        except User.DoesNotExist:
+            raise CommandError(f'User "{lookup}" does not exist')
+        token, _ = Token.objects.get_or_create(user=user)
+        if options['requests'] < 1:
+            raise CommandError('--requests must be at least 1')
+
+        original = connection.settings_dict
+        if options['modes']:
+            modes = [mode.strip() for mode in options['modes'].split(',')]
+        else:
+            modes = ['none', 'persistent'] + (['pool'] if original.get('OPTIONS', {}).get('pool') else [])
+        unknown = set(modes) - set(CONN_MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': options['path'],
+            'HTTP_AUTHORIZATION': f'Token {token.key}',
+        }
+        setup_testing_defaults(environ)
+        handler = WSGIHandler()
+
+        self.stdout.write(
+            f"{connection.vendor} {original.get('HOST') or original.get('NAME')}, "
+            f"GET {options['path']}, {options['requests']} requests per mode"
+        )
+        self.stdout.write(f"{'mode':<12}{'connections':>12}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        try:
+            for mode in modes:
+                connection.close()
+                connection.settings_dict = _mode_settings(original, mode)
+                self._request(handler, environ, options['warmup'])
+
+                opened = []
+
+                def count(sender, **kwargs):
+                    opened.append(1)
+
+                connection_created.connect(count)
+                try:
+                    timings = self._request(handler, environ, options['requests'])
+                finally:
+                    connection_created.disconnect(count)
+
+                timings.sort()
+                self.stdout.write(
+                    f"{mode:<12}{len(opened):>12}{statistics.mean(timings):>10.2f}"
+                    f"{statistics.median(timings):>10.2f}"
+                    f"{timings[int(len(timings) * 0.95) - 1]:>10.2f}{timings[-1]:>10.2f}"
+                )
+        finally:
+            connection.close()
+            connection.settings_dict = original
+
+    def _request(self, handler, environ, count):
+        timings = []
+        for _ in range(count):
+            status = []
+            start = time.perf_counter()
+            # Closing the response sends request_finished, which closes or
+            # keeps the connection according to the mode's settings
+            response = handler(dict(environ), lambda code, headers, exc_info=None: status.append(code))
+            for _chunk in response:
+                pass
+            response.close()
+            timings.append((time.perf_counter() - start) * 1000)
+
+            if not status[0].startswith(('200', '304')):
+                raise CommandError(f'Request failed with {status[0]}')
+        return timings
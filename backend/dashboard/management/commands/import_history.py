@@ -0,0 +1,40 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from dashboard.imports import IMPORTERS, import_csv
+
+
+class Command(BaseCommand):
+    help = 'Bulk import historical medication logs or focus sessions from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(IMPORTERS))
+        parser.add_argument('path', help='CSV file to import')
+        parser.add_argument('--user', required=True, help='Username or id of the owner')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        lookup = options['user']
+        try:
+            if lookup.isdigit():
+                user = User.objects.get(id=int(lookup))
+            else:
+                user = User.objects.get(username=lookup)
+        except User.DoesNotExist:
+            raise CommandError(f'User "{lookup}" does not exist')
+
+        try:
+            with open(options['path'], encoding='utf-8-sig', newline='') as f:
+                result = import_csv(user, options['kind'], f)
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['error']}")
+        if result['error_count'] > len(result['errors']):
+            self.stderr.write(f"... {result['error_count'] - len(result['errors'])} more errors")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Processed {result['processed']} rows: {result['created']} created, "
+            f"{result['duplicates']} duplicates, {result['error_count']} errors"
+        ))
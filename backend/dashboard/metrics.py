@@ -0,0 +1,64 @@
+"""
+Gauges read from the database when /metrics is scraped (see utils.metrics).
+
+They describe the whole deployment rather than one worker, so they are not
+added up across processes. Reads go to the read replica when one is set up.
+"""
+from datetime import timedelta
+
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Q, Sum
+from django.utils import timezone
+
+from focus.models import FocusSession
+from medication.models import MedicationReminder
+from schedule.models import ScheduleReminder
+from utils import metrics
+from utils.db_router import replica_reads
+
+REMINDER_LAG_BUCKETS = (0, 30, 60, 120, 300, 600, 1800, 3600)  # Seconds
+RUNNING_STATUSES = ('active', 'paused')
+REMINDER_MODELS = (('medication', MedicationReminder), ('schedule', ScheduleReminder))
+
+
+@metrics.register_collector
+def focus_sessions():
+    gauge = metrics.Gauge(
+        'focus_sessions', 'Focus sessions that have not ended, by status', ('status',), register=False
+    )
+    with replica_reads():
+        counts = dict(
+            FocusSession.objects.filter(status__in=RUNNING_STATUSES)
+            .values_list('status').annotate(count=Count('id')).order_by()
+        )
+    for status in RUNNING_STATUSES:
+        gauge.set(counts.get(status, 0), status=status)
+    return [gauge]
+
+
+@metrics.register_collector
+def reminder_dispatch():
+    """How late reminders are sent, and how many are due but unsent"""
+    lag = metrics.Histogram(
+        'reminder_dispatch_lag_seconds', 'Time from the due time of a reminder to sending it',
+        ('kind',), buckets=REMINDER_LAG_BUCKETS, register=False,
+    )
+    overdue = metrics.Gauge(
+        'reminders_overdue', 'Unsent reminders past their due time', ('kind',), register=False
+    )
+    delay = ExpressionWrapper(F('sent_at') - F('reminder_time'), output_field=DurationField())
+    now = timezone.now()
+    with replica_reads():
+        for kind, model in REMINDER_MODELS:
+            sent = model.objects.filter(sent_at__isnull=False).annotate(delay=delay).aggregate(
+                count=Count('id'),
+                total=Sum('delay'),
+                **{
+                    f'le_{index}': Count('id', filter=Q(delay__lte=timedelta(seconds=bound)))
+                    for index, bound in enumerate(REMINDER_LAG_BUCKETS)
+                },
+            )
+            cumulative = [sent[f'le_{index}'] for index in range(len(REMINDER_LAG_BUCKETS))]
+            total = sent['total'].total_seconds() if sent['total'] else 0.0
+            lag.set(cumulative, sent['count'], total, kind=kind)
+            overdue.set(model.objects.filter(is_sent=False, reminder_time__lt=now).count(), kind=kind)
+    return [lag, overdue]
@@ -0,0 +1,86 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from assessment.models import (
+    Assessment, AssessmentCategory, AssessmentQuestion, AssessmentResponse, AssessmentResult,
+    BehaviorLog, UserAssessment, WeeklyProgress
+)
+from focus.models import FocusSession, UserFocusSettings
+from medication.models import Medication, MedicationLog, MedicationSchedule, UserMedication
+from rewards.models import (
+    Achievement, PointsTransaction, Reward, RewardCategory, UserAchievement, UserPoints, UserReward
+)
+from schedule.models import ActivityCompletion, Schedule, ScheduleActivity
+from sync.changelog import medication_owner, owner, schedule_owner
+from utils.cache import SHARED, bump_generation
+from utils.db_router import pin_primary
+
+
+def assessment_owner(obj):
+    return [obj.user_assessment.user_id]
+
+
+# Models shown on the per-user dashboards -> owners whose cache they affect
+CACHED_MODELS = {
+    FocusSession: owner,
+    UserFocusSettings: owner,
+    UserMedication: owner,
+    MedicationSchedule: medication_owner,
+    MedicationLog: medication_owner,
+    Schedule: owner,
+    ScheduleActivity: schedule_owner,
+    ActivityCompletion: owner,
+    UserPoints: owner,
+    PointsTransaction: owner,
+    UserReward: owner,
+    UserAchievement: owner,
+    UserAssessment: owner,
+    AssessmentResponse: assessment_owner,
+    AssessmentResult: assessment_owner,
+    WeeklyProgress: owner,
+    BehaviorLog: owner,
+}
+
+
+# Catalog rows shown on the dashboards of every user
+SHARED_MODELS = (
+    Reward, RewardCategory, Achievement, Medication,
+    AssessmentCategory, Assessment, AssessmentQuestion,
+)
+
+
+def user_data_written(user_id):
+    bump_generation(user_id)
+    pin_primary(user_id)
+
+
+def invalidate_user_cache(sender, instance, raw=False, **kwargs):
+    """
+    Bump the owner's cache generation once the write is committed and keep
+    their analytics reads on the primary until the replica catches up
+    """
+    if raw:
+        return
+    try:
+        user_ids = CACHED_MODELS[sender](instance)
+    except ObjectDoesNotExist:
+        return
+    for user_id in user_ids:
+        transaction.on_commit(lambda user_id=user_id: user_data_written(user_id))
+
+
+def invalidate_shared_cache(sender, instance, raw=False, **kwargs):
+    """Bump the shared generation, expiring every user's cache, once the write is committed"""
+    if raw:
+        return
+    transaction.on_commit(lambda: bump_generation(SHARED))
+
+
+for model in CACHED_MODELS:
+    post_save.connect(invalidate_user_cache, sender=model, dispatch_uid=f'user_cache_save_{model._meta.label_lower}')
+    post_delete.connect(invalidate_user_cache, sender=model, dispatch_uid=f'user_cache_delete_{model._meta.label_lower}')
+
+for model in SHARED_MODELS:
+    post_save.connect(invalidate_shared_cache, sender=model, dispatch_uid=f'shared_cache_save_{model._meta.label_lower}')
+    post_delete.connect(invalidate_shared_cache, sender=model, dispatch_uid=f'shared_cache_delete_{model._meta.label_lower}')
@@ -1,3 +1,352 @@
-from django.test import TestCase
+import itertools
+import json
+import shutil
+import tempfile
+from datetime import datetime, timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connections, transaction
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.test import APITestCase, APITransactionTestCase
+
+from assessment.models import BehaviorLog
+from dashboard_backend.database import check_replica_cache
+from focus.models import FocusSession
+from medication.models import Medication, MedicationLog, UserMedication
+from sync.models import ChangeLogEntry
+from users.models import ParentChildRelation, User
+from users.serializers import UserSerializer
+from utils import instrumentation
+from utils.db_router import REPLICA_DB_ALIAS, ReplicaRouter, pin_primary, replica_reads
+
+
+def _lines(response):
+    return [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+
+
+class ExportHistoryTests(APITestCase):
+    def setUp(self):
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        for day in (1, 15, 28):
+            session = FocusSession.objects.create(user=self.child, planned_duration=25, status='completed')
+            FocusSession.objects.filter(pk=session.pk).update(
+                start_time=timezone.make_aware(datetime(2024, 2, day, 9, 0))
+            )
+        self.client.force_authenticate(self.child)
+        self.url = reverse('dashboard:export-history')
+
+    def test_exports_the_requested_date_range(self):
+        response = self.client.get(self.url, {'datasets': 'focus', 'start': '2024-02-10', 'end': '2024-02-20'})
+
+        self.assertEqual(response.status_code, 200)
+        rows = _lines(response)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['dataset'], 'focus')
+        self.assertTrue(rows[0]['start_time'].startswith('2024-02-15'))
+
+    def test_cursor_resumes_after_the_last_row(self):
+        first = _lines(self.client.get(self.url, {'datasets': 'focus'}))[0]
+        rows = _lines(self.client.get(self.url, {'datasets': 'focus', 'cursor': f"focus:{first['id']}"}))
+        self.assertEqual(len(rows), 2)
+        self.assertTrue(all(row['id'] > first['id'] for row in rows))
+
+    def test_behavior_logs_are_exported(self):
+        for day, triggers in ((5, ['noise']), (20, ['homework', 'tired'])):
+            BehaviorLog.objects.create(
+                user=self.child, behavior_type='meltdown', intensity=3, triggers=triggers,
+                logged_at=timezone.make_aware(datetime(2024, 2, day, 18, 0))
+            )
+
+        rows = _lines(self.client.get(self.url, {'datasets': 'behavior', 'start': '2024-02-10'}))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual((rows[0]['dataset'], rows[0]['triggers']), ('behavior', ['homework', 'tired']))
+
+        response = self.client.get(self.url, {'datasets': 'behavior', 'output': 'csv'})
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'behavior_type', 'intensity'])
+        self.assertEqual(len(lines), 3)
+        self.assertIn('""homework"", ""tired""', lines[2])
+
+    def test_invalid_dates_are_rejected(self):
+        for query in (
+            {'start': '2024-13-45'},
+            {'end': '2024-02-30'},
+            {'start': 'yesterday'},
+            {'start': '2024-02-01', 'end': '2024-99-01'},
+        ):
+            with self.subTest(query=query):
+                response = self.client.get(self.url, {'datasets': 'focus', **query})
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('valid date', response.data['error'])
+
+
+class ImportHistoryTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        ParentChildRelation.objects.create(parent=self.parent, child=self.child)
+        self.client.force_authenticate(self.parent)
+
+    def _import(self, kind, content):
+        upload = SimpleUploadedFile('history.csv', content.encode(), content_type='text/csv')
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('dashboard:import-history', args=[kind]),
+                {'file': upload, 'child_id': self.child.id}, format='multipart'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_focus_import_skips_duplicates(self):
+        content = (
+            'start_time,planned_duration,end_time,title\n'
+            '2024-02-01T09:00:00,25,2024-02-01T09:25:00,Reading\n'
+            '2024-02-01T09:00:00,25,,Reading again\n'
+            '2024-02-02T09:00:00,abc,,\n'
+            '2024-02-03T09:00:00,30,,\n'
+        )
+        result = self._import('focus', content)
+        self.assertEqual(
+            {key: result[key] for key in ('processed', 'created', 'duplicates', 'error_count')},
+            {'processed': 4, 'created': 2, 'duplicates': 1, 'error_count': 1}
+        )
+        self.assertEqual(result['errors'], [{'row': 4, 'error': 'planned_duration must be a number'}])
+
+        sessions = FocusSession.objects.filter(user=self.child).order_by('start_time')
+        self.assertEqual([s.start_time.day for s in sessions], [1, 3])
+        self.assertEqual(sessions[0].actual_duration, 25)
+        self.assertEqual(
+            ChangeLogEntry.objects.filter(user=self.child, model='focus.focussession', action='insert').count(), 2
+        )
+
+        # Importing the same file again creates nothing
+        result = self._import('focus', content)
+        self.assertEqual((result['created'], result['duplicates']), (0, 3))
+        self.assertEqual(sessions.count(), 2)
+
+    def test_focus_import_rejects_durations_that_are_not_whole_numbers(self):
+        result = self._import('focus', (
+            'start_time,planned_duration\n'
+            '2024-02-01T09:00:00,25.5\n'
+            '2024-02-02T09:00:00,inf\n'
+            '2024-02-03T09:00:00,nan\n'
+            '2024-02-04T09:00:00,1e308\n'
+            '2024-02-05T09:00:00,1e400\n'
+            '2024-02-06T09:00:00,30.0\n'
+        ))
+        self.assertEqual(result['errors'], [
+            {'row': 2, 'error': 'planned_duration must be a whole number'},
+            {'row': 3, 'error': 'planned_duration must be a whole number'},
+            {'row': 4, 'error': 'planned_duration must be a whole number'},
+            {'row': 5, 'error': 'planned_duration is too large'},
+            {'row': 6, 'error': 'planned_duration must be a whole number'},
+        ])
+        self.assertEqual(result['created'], 1)
+        self.assertEqual(FocusSession.objects.get(user=self.child).planned_duration, 30)
+
+    def test_medication_import_matches_names_and_skips_duplicates(self):
+        medication = Medication.objects.create(name='Ritalin', dosage_form='tablet', strength='10mg')
+        user_medication = UserMedication.objects.create(
+            user=self.child, medication=medication, prescribed_by='Dr. A',
+            dosage='1 tablet', frequency='daily', start_date='2024-01-01'
+        )
+        MedicationLog.objects.create(
+            user_medication=user_medication,
+            scheduled_time=timezone.make_aware(datetime(2024, 2, 1, 8, 0)), status='taken'
+        )
+
+        result = self._import('medication', (
+            'medication,scheduled_time,status\n'
+            'ritalin,2024-02-01T08:00:00,taken\n'
+            'Ritalin,2024-02-02T08:00:00,missed\n'
+            'Aspirin,2024-02-02T08:00:00,taken\n'
+        ))
+        self.assertEqual((result['created'], result['duplicates'], result['error_count']), (1, 1, 1))
+        self.assertEqual(result['errors'][0]['error'], 'Medication not found')
+        self.assertEqual(MedicationLog.objects.filter(status='missed').count(), 1)
+
+    def test_import_refreshes_cached_statistics(self):
+        self.client.force_authenticate(self.child)
+        url = reverse('focus:statistics')
+        self.assertEqual(self.client.get(url).data['total_sessions'], 0)
+
+        start = (timezone.now() - timedelta(days=1)).replace(microsecond=0).isoformat()
+        self._import('focus', f'start_time,planned_duration,actual_duration\n{start},25,25\n')
+        self.assertEqual(self.client.get(url).data['total_sessions'], 1)
+
+    def test_other_users_data_cannot_be_imported(self):
+        stranger = User.objects.create_user(username='stranger', password='pw-123456', user_type='child')
+        upload = SimpleUploadedFile('history.csv', b'start_time,planned_duration\n', content_type='text/csv')
+        response = self.client.post(
+            reverse('dashboard:import-history', args=['focus']),
+            {'file': upload, 'child_id': stranger.id}, format='multipart'
+        )
+        self.assertEqual(response.status_code, 403)
+
+
+class ProfileRequestTests(APITestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(PROFILING_ENABLED=True, MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.url = reverse('dashboard:family-overview')
+
+    def _profiled_get(self, user):
+        self.client.force_login(user)
+        return self.client.get(self.url, HTTP_X_PROFILE='1')
+
+    def test_staff_session_gets_a_profile(self):
+        staff = User.objects.create_user(username='staff', password='pw-123456', is_staff=True)
+        response = self._profiled_get(staff)
+        self.assertIn('X-Profile-Url', response)
+        self.assertTrue(response['X-Profile-Url'].endswith('.folded'))
+
+    def test_other_users_are_not_profiled(self):
+        parent = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        response = self._profiled_get(parent)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-Profile-Url', response)
+
+    @override_settings(PROFILING_ENABLED=False)
+    def test_disabled_profiling_ignores_the_header(self):
+        staff = User.objects.create_user(username='staff', password='pw-123456', is_staff=True)
+        self.assertNotIn('X-Profile-Url', self._profiled_get(staff))
+
+
+class SerializerTimingTests(APITestCase):
+    def _serializer_ms(self, serializer):
+        stats = instrumentation.RequestStats()
+        token = instrumentation._current.set(stats)
+        # Every reading of the clock is one second later
+        clock = mock.patch.object(instrumentation.time, 'perf_counter', side_effect=itertools.count())
+        try:
+            with clock:
+                serializer.data
+        finally:
+            instrumentation._current.reset(token)
+        return stats.serializer_ms
+
+    def test_outermost_serializers_are_timed(self):
+        for i in range(2):
+            User.objects.create_user(username=f'user{i}', password='pw-123456', user_type='child')
+        # No queries, they read the clock too
+        users = list(User.objects.select_related('profile'))
+        # The nested profile is part of its user
+        self.assertEqual(self._serializer_ms(UserSerializer(users[0])), 1000)
+        self.assertEqual(self._serializer_ms(UserSerializer(users, many=True)), 2000)
+
+    def test_other_serializers_are_left_alone(self):
+        class PlainSerializer(serializers.Serializer):
+            value = serializers.IntegerField()
+
+        self.assertEqual(self._serializer_ms(PlainSerializer({'value': 1})), 0)
+
+
+class MetricsViewTests(APITestCase):
+    url = '/metrics'
+
+    def test_without_a_token_only_staff_can_read(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        parent = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        self.client.force_login(parent)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        staff = User.objects.create_user(username='staff', password='pw-123456', is_staff=True)
+        self.client.force_login(staff)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'# TYPE http_requests_total counter', response.content)
+
+    @override_settings(METRICS_TOKEN='scrape-secret')
+    def test_token_is_required_when_configured(self):
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(self.client.get(self.url, HTTP_AUTHORIZATION='Bearer wrong').status_code, 403)
+        response = self.client.get(self.url, HTTP_AUTHORIZATION='Bearer scrape-secret')
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(REPLICA_READS=True)
+class ReplicaRoutingTests(APITransactionTestCase):
+    """
+    The test replica mirrors the test primary, so the tests tell which
+    connection served a read. Not a TestCase, whose transaction keeps reads on
+    the primary.
+    """
+    databases = {'default', REPLICA_DB_ALIAS}
+
+    def setUp(self):
+        cache.clear()
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+
+    def _complete_session(self):
+        # Commits at once, running the signal's on_commit callbacks
+        FocusSession.objects.create(
+            user=self.child, planned_duration=25, actual_duration=25, status='completed'
+        )
+
+    def _replica_queries(self, read):
+        with CaptureQueriesContext(connections[REPLICA_DB_ALIAS]) as queries:
+            read()
+        return len(queries)
+
+    def _count_sessions(self):
+        with replica_reads([self.child.id]):
+            return FocusSession.objects.filter(user=self.child).count()
+
+    def test_reads_go_to_the_replica_unless_pinned(self):
+        self.assertEqual(self._replica_queries(self._count_sessions), 1)
+
+        pin_primary(self.child.id)
+        self.assertEqual(self._replica_queries(self._count_sessions), 0)
+
+        other = User.objects.create_user(username='other', password='pw-123456', user_type='child')
+        with replica_reads([other.id]) as use_replica:
+            self.assertTrue(use_replica)
+
+    def test_writes_pin_the_owner_to_the_primary(self):
+        self._complete_session()
+        self.assertEqual(self._replica_queries(self._count_sessions), 0)
+
+        cache.clear()  # The pin expired
+        self.assertEqual(self._replica_queries(self._count_sessions), 1)
+
+    def test_writes_and_transactions_use_the_primary(self):
+        router = ReplicaRouter()
+        with replica_reads():
+            self.assertEqual(router.db_for_read(FocusSession), REPLICA_DB_ALIAS)
+            self.assertEqual(router.db_for_write(FocusSession), 'default')
+            with transaction.atomic():
+                self.assertEqual(router.db_for_read(FocusSession), 'default')
+        self.assertIsNone(router.db_for_read(FocusSession))
+
+    @override_settings(REPLICA_READS=False)
+    def test_replica_reads_can_be_switched_off(self):
+        self.assertEqual(self._replica_queries(self._count_sessions), 0)
+
+    def test_statistics_show_the_users_own_write(self):
+        self.client.force_authenticate(self.child)
+        url = reverse('focus:statistics')
+        self._complete_session()
+        self.assertEqual(self._replica_queries(lambda: self.client.get(url)), 0)
+
+        cache.clear()
+        self.assertGreater(self._replica_queries(lambda: self.client.get(url)), 0)
+
+
+class ReplicaCacheCheckTests(APITestCase):
+    def test_replica_needs_a_shared_cache(self):
+        for backend in ('locmem.LocMemCache', 'dummy.DummyCache'):
+            with self.subTest(backend=backend), self.assertRaises(ImproperlyConfigured):
+                check_replica_cache({'default': {'BACKEND': f'django.core.cache.backends.{backend}'}})
+        check_replica_cache({'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache'}})
@@ -4,5 +4,9 @@ from . import views
 app_name = 'dashboard'
 
 urlpatterns = [
-    # Add your dashboard URLs here
-]
\ No newline at end of file
+    path('family/', views.family_overview_view, name='family-overview'),
+    path('export/', views.export_history, name='export-history'),
+    path('import/<str:kind>/', views.import_history, name='import-history'),
+    path('profiles/', views.profile_list, name='profile-list'),
+    path('profiles/sample/', views.start_profile_sampling, name='profile-sample'),
+]
@@ -1,3 +1,215 @@
-from django.shortcuts import render
+import codecs
+import os
 
-# Create your views here.
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import HttpResponse, HttpResponseForbidden, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_date
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
+from rest_framework.response import Response
+
+from focus.live import entry_data, live_sessions
+from users.models import User
+from utils import metrics
+from utils.cache import get_or_compute, user_cache_key
+from utils.db_router import replica_reads
+from utils.permissions import IsSelfOrParent, children_of, staff_user
+from utils.profiling import list_profiles, start_sampling
+from .exports import DATASETS, csv_lines, iter_rows, ndjson_lines, parse_cursor
+from .family import family_overview
+from . import metrics as database_metrics  # noqa: F401 (registers the collectors)
+from .imports import IMPORTERS, import_csv
+
+def _get_target_user(user, child_id):
+    """The user whose data is accessed; IsSelfOrParent has checked access"""
+    if not child_id or str(child_id) == str(user.id):
+        return user
+    return User.objects.get(pk=child_id)
+
+def _query_date(request, name):
+    """Optional YYYY-MM-DD query parameter; ValueError when it is not a valid date"""
+    value = request.GET.get(name)
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:  # Well formed but impossible, e.g. 2024-13-45
+        parsed = None
+    if parsed is None:
+        raise ValueError(f'{name} must be a valid date (YYYY-MM-DD)')
+    return parsed
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated, IsSelfOrParent])
+def export_history(request):
+    """Stream a child's full history as NDJSON or CSV"""
+    child = _get_target_user(request.user, request.GET.get('child_id'))
+    
+    datasets = [d for d in request.GET.get('datasets', ','.join(DATASETS)).split(',') if d]
+    unknown = [d for d in datasets if d not in DATASETS]
+    if unknown or not datasets:
+        return Response(
+            {'error': f"datasets must be a comma separated list of: {', '.join(DATASETS)}"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    output = request.GET.get('output', 'ndjson')
+    if output not in ('ndjson', 'csv'):
+        return Response(
+            {'error': 'output must be ndjson or csv'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    if output == 'csv' and len(datasets) != 1:
+        return Response(
+            {'error': 'CSV exports contain exactly one dataset'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    try:
+        start, end = _query_date(request, 'start'), _query_date(request, 'end')
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    cursor = None
+    if request.GET.get('cursor'):
+        try:
+            cursor = parse_cursor(request.GET['cursor'])
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    rows = iter_rows(child, datasets, start=start, end=end, cursor=cursor)
+    filename = f"history-{child.username}-{timezone.localdate().isoformat()}"
+    
+    if output == 'csv':
+        response = StreamingHttpResponse(csv_lines(rows, datasets[0]), content_type='text/csv')
+        response['Content-Disposition'] = f'attachment; filename="{filename}-{datasets[0]}.csv"'
+    else:
+        response = StreamingHttpResponse(ndjson_lines(rows), content_type='application/x-ndjson')
+        response['Content-Disposition'] = f'attachment; filename="{filename}.ndjson"'
+    return response
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated, IsSelfOrParent])
+@parser_classes([MultiPartParser])
+def import_history(request, kind):
+    """Bulk import historical medication logs or focus sessions from a CSV file"""
+    if kind not in IMPORTERS:
+        return Response(
+            {'error': f"Unknown import type, expected one of: {', '.join(IMPORTERS)}"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response(
+            {'error': 'A CSV file is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    child = _get_target_user(request.user, request.data.get('child_id'))
+    
+    try:
+        result = import_csv(child, kind, codecs.iterdecode(upload, 'utf-8-sig'))
+    except UnicodeDecodeError:
+        return Response(
+            {'error': 'File must be UTF-8 encoded CSV'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(result)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def family_overview_view(request):
+    """Focus, medication, schedule and rewards summary of all of a parent's children"""
+    user = request.user
+    if user.user_type != 'parent':
+        return Response(
+            {'error': 'Only parents have a family overview'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    children = list(User.objects.filter(id__in=children_of(user)).order_by('id'))
+    child_ids = [child.id for child in children]
+    
+    # Any child's change invalidates the overview through its generation
+    key = user_cache_key('family_overview', [user.id] + child_ids, timezone.localdate())
+    
+    def compute():
+        with replica_reads([user.id] + child_ids):
+            return family_overview(children)
+    
+    overview = get_or_compute(key, compute)
+    
+    # Live focus state changes every few seconds and is never cached
+    sessions = live_sessions(child_ids)
+    children_data = [
+        {**item, 'live_session': entry_data(sessions[item['id']]) if item['id'] in sessions else None}
+        for item in overview
+    ]
+    
+    return Response({
+        'children': children_data,
+        'generated_at': timezone.now()
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def profile_list(request):
+    """Stored request and sampling profiles, newest first"""
+    return Response({
+        'enabled': settings.PROFILING_ENABLED,
+        'profiles': list_profiles()
+    })
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+def start_profile_sampling(request):
+    """Sample the stacks of the worker handling this request for a number of seconds"""
+    if not settings.PROFILING_ENABLED:
+        return Response(
+            {'error': 'Profiling is disabled, set PROFILING_ENABLED'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    try:
+        seconds = float(request.data.get('seconds', 30))
+    except (TypeError, ValueError):
+        seconds = 0
+    if not 0 < seconds <= settings.PROFILING_MAX_SECONDS:
+        return Response(
+            {'error': f'seconds must be between 0 and {settings.PROFILING_MAX_SECONDS}'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    path = start_sampling(seconds)
+    if path is None:
+        return Response(
+            {'error': 'This worker is already being sampled'},
+            status=status.HTTP_409_CONFLICT
+        )
+    return Response({
+        'pid': os.getpid(),
+        'seconds': seconds,
+        'profile': path,
+        'url': default_storage.url(path)
+    }, status=status.HTTP_202_ACCEPTED)
+
+@require_GET
+def metrics_view(request):
+    """
+    Prometheus scrape endpoint. Needs ``Authorization: Bearer <METRICS_TOKEN>``
+    when that is set, otherwise only staff users may read it.
+    """
+    token = settings.METRICS_TOKEN
+    if token:
+        if not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+            return HttpResponseForbidden()
+    elif staff_user(request) is None:
+        return HttpResponseForbidden()
+    return HttpResponse(metrics.generate_latest(), content_type=metrics.CONTENT_TYPE)
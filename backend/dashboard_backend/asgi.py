@@ -3,6 +3,16 @@ ASGI config for dashboard_backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Serve it with uvicorn, one event loop per worker process:
+
+    uvicorn dashboard_backend.asgi:application --host 0.0.0.0 --port 8000 \
+        --workers 4 --lifespan off
+
+Sync views keep working under ASGI (each request gets its own thread for
+them); the ``dashboard/async/`` views run their query groups concurrently in
+up to ASYNC_QUERY_THREADS threads per worker, so size the database
+connection limit for workers x (ASYNC_QUERY_THREADS + concurrent requests).
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
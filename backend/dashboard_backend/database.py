@@ -0,0 +1,95 @@
+"""
+Connection settings for the Postgres backend.
+
+Three strategies are available through DB_CONN_MODE:
+
+- ``persistent`` (default): each worker keeps its connection open for
+  DB_CONN_MAX_AGE seconds and checks it before reuse (CONN_HEALTH_CHECKS),
+  so only the first request of a worker pays for the TLS handshake;
+- ``pool``: each worker process keeps a psycopg (v3) connection pool of
+  DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections, useful for threaded
+  workers;
+- ``none``: a new connection per request, Django's default.
+
+Size the pool per worker process: workers x DB_POOL_MAX_SIZE must stay below
+the server's (or Supabase pooler's) connection limit.
+
+A read replica needs a cache shared by the workers, see
+``check_replica_cache``.
+"""
+from decouple import config
+from django.core.exceptions import ImproperlyConfigured
+
+CONN_MODES = ('persistent', 'pool', 'none')
+# Cache backends whose entries only the process that wrote them can see
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def pool_options():
+    try:
+        import psycopg  # noqa: F401
+        import psycopg_pool  # noqa: F401
+    except ImportError:
+        raise ImproperlyConfigured(
+            "DB_CONN_MODE=pool requires psycopg 3 with the pool extra "
+            "(pip install 'psycopg[binary,pool]')"
+        )
+    return {
+        'min_size': config('DB_POOL_MIN_SIZE', default=1, cast=int),
+        'max_size': config('DB_POOL_MAX_SIZE', default=4, cast=int),
+        'timeout': config('DB_POOL_TIMEOUT', default=10, cast=float),
+        'max_idle': config('DB_POOL_MAX_IDLE', default=300, cast=float),
+        'max_lifetime': config('DB_POOL_MAX_LIFETIME', default=1800, cast=float),
+    }
+
+
+def postgres_connection_settings(options=None):
+    """
+    CONN_MAX_AGE, CONN_HEALTH_CHECKS and OPTIONS for a Postgres database.
+
+    ``options`` are merged into OPTIONS (e.g. the sslmode parsed from a URL).
+    """
+    mode = config('DB_CONN_MODE', default='persistent')
+    if mode not in CONN_MODES:
+        raise ImproperlyConfigured(f"DB_CONN_MODE must be one of: {', '.join(CONN_MODES)}")
+
+    options = {
+        'sslmode': config('DB_SSLMODE', default='require'),
+        'connect_timeout': config('DB_CONNECT_TIMEOUT', default=10, cast=int),
+        **(options or {}),
+    }
+    conn_max_age = 0
+    if mode == 'persistent':
+        conn_max_age = config('DB_CONN_MAX_AGE', default=600, cast=int)
+    elif mode == 'pool':
+        # Django returns pooled connections after each request; it refuses
+        # persistent connections together with a pool
+        options['pool'] = pool_options()
+
+    return {
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': mode == 'persistent',
+        # Server-side cursors do not survive transaction-mode poolers
+        # (Supabase on port 6543 / PgBouncer)
+        'DISABLE_SERVER_SIDE_CURSORS': config('DB_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+        'OPTIONS': options,
+    }
+
+
+def check_replica_cache(caches):
+    """
+    Refuse a process-local default cache when reads go to a replica.
+
+    The read-your-writes pins of utils.db_router are stored in the default
+    cache; if each worker had its own, a user's next request served by
+    another worker would read rows older than their own write.
+    """
+    backend = caches['default']['BACKEND']
+    if backend in PROCESS_LOCAL_CACHES:
+        raise ImproperlyConfigured(
+            f"A read replica needs a cache shared by all workers, not {backend} "
+            "(set CACHE_BACKEND=file, or REPLICA_READS=False to read from the primary)"
+        )
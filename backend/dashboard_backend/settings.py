@@ -14,6 +14,8 @@ from pathlib import Path
 from decouple import config
 import dj_database_url
 
+from .database import PROCESS_LOCAL_CACHES, check_replica_cache, postgres_connection_settings
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,6 +44,7 @@ INSTALLED_APPS = [
     
     # Third party apps
     'rest_framework',
+    'rest_framework.authtoken',
     'corsheaders',
     
     # Local apps
@@ -54,15 +57,20 @@ INSTALLED_APPS = [
     'medication',
     'rewards',
     'schedule',
+    'sync',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'utils.instrumentation.RequestMetricsMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    # After AuthenticationMiddleware so session logins are recognised as staff
+    'utils.profiling.ProfileRequestMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -94,9 +102,12 @@ WSGI_APPLICATION = 'dashboard_backend.wsgi.application'
 DATABASE_URL = config('DATABASE_URL', default=None)
 USE_SQLITE_FOR_DEV = config('USE_SQLITE_FOR_DEV', default=True, cast=bool)
 
+# Persistent connections or a per-worker pool for Postgres, see database.py
 if DATABASE_URL and not USE_SQLITE_FOR_DEV:
+    default_database = dj_database_url.parse(DATABASE_URL)
+    default_database.update(postgres_connection_settings(default_database.get('OPTIONS')))
     DATABASES = {
-        'default': dj_database_url.parse(DATABASE_URL, conn_max_age=600, ssl_require=True)
+        'default': default_database
     }
 elif USE_SQLITE_FOR_DEV:
     # Use SQLite for development
@@ -106,6 +117,13 @@ elif USE_SQLITE_FOR_DEV:
             'NAME': BASE_DIR / 'db.sqlite3',
         }
     }
+    # A second SQLite file can stand in for a read replica to try routing locally
+    SQLITE_REPLICA_NAME = config('SQLITE_REPLICA_NAME', default=None)
+    if SQLITE_REPLICA_NAME:
+        DATABASES['replica'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': SQLITE_REPLICA_NAME,
+        }
 else:
     DATABASES = {
         'default': {
@@ -115,13 +133,106 @@ else:
             'PASSWORD': config('DB_PASSWORD'),
             'HOST': config('DB_HOST'),
             'PORT': config('DB_PORT', default='5432'),
-            'OPTIONS': {
-                'sslmode': 'require',
-            },
+            **postgres_connection_settings(),
         }
     }
 
 
+# Threads per worker process running the query groups of async dashboard
+# views concurrently (see utils/async_views.py); each holds a DB connection
+ASYNC_QUERY_THREADS = config('ASYNC_QUERY_THREADS', default=8, cast=int)
+
+# Read replica for analytics reads (see utils/db_router.py)
+DATABASE_REPLICA_URL = config('DATABASE_REPLICA_URL', default=None)
+if DATABASE_REPLICA_URL and not USE_SQLITE_FOR_DEV:
+    replica_database = dj_database_url.parse(DATABASE_REPLICA_URL)
+    replica_database.update(postgres_connection_settings(replica_database.get('OPTIONS')))
+    DATABASES['replica'] = replica_database
+
+DATABASE_ROUTERS = ['utils.db_router.ReplicaRouter']
+# Send analytics reads to the replica when one is configured
+REPLICA_READS = 'replica' in DATABASES and config('REPLICA_READS', default=True, cast=bool)
+# Without a replica the alias names the primary (unused unless a test turns
+# REPLICA_READS on); tests read the replica through the test primary
+DATABASES.setdefault('replica', dict(DATABASES['default']))
+DATABASES['replica']['TEST'] = {'MIRROR': 'default'}
+
+# Seconds a user's analytics reads stay on the primary after they write
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=10, cast=int)
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# locmem is per process; use the file backend to share entries between the
+# workers of a single box.
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+
+if CACHE_BACKEND == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': config('CACHE_LOCATION', default=str(BASE_DIR / '.cache')),
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'dashboard-backend',
+            'TIMEOUT': 300,
+            'OPTIONS': {'MAX_ENTRIES': 10000},
+        }
+    }
+
+# Read-your-writes pins live in the cache, so every worker must see them
+if REPLICA_READS:
+    check_replica_cache(CACHES)
+
+USER_CACHE_TIMEOUT = config('USER_CACHE_TIMEOUT', default=300, cast=int)  # Seconds
+
+# Per-process cache of authenticated API tokens. Revocations reach other
+# workers through the default cache, so only when it is shared
+# (CACHE_BACKEND=file); with locmem they take up to TOKEN_CACHE_TTL seconds.
+TOKEN_CACHE_SIZE = config('TOKEN_CACHE_SIZE', default=10000, cast=int)
+TOKEN_CACHE_TTL = config('TOKEN_CACHE_TTL', default=60, cast=int)  # Seconds
+
+# Per-request query and timing instrumentation (see utils/instrumentation.py)
+REQUEST_SERVER_TIMING = config('REQUEST_SERVER_TIMING', default=True, cast=bool)
+REQUEST_SLOW_MS = config('REQUEST_SLOW_MS', default=500, cast=int)
+REQUEST_SLOW_SAMPLE_RATE = config('REQUEST_SLOW_SAMPLE_RATE', default=1.0, cast=float)
+REQUEST_SLOW_MAX_QUERIES = config('REQUEST_SLOW_MAX_QUERIES', default=200, cast=int)
+
+# Staff-only request profiling and stack sampling (see utils/profiling.py)
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SAMPLE_INTERVAL = config('PROFILING_SAMPLE_INTERVAL', default=0.01, cast=float)  # Seconds
+PROFILING_MAX_SECONDS = config('PROFILING_MAX_SECONDS', default=300, cast=int)
+
+# Prometheus metrics at /metrics (see utils/metrics.py)
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+METRICS_DIR = config('METRICS_DIR', default='')  # Shared by all worker processes
+METRICS_FLUSH_INTERVAL = config('METRICS_FLUSH_INTERVAL', default=10, cast=float)  # Seconds
+METRICS_COLLECT_SECONDS = config('METRICS_COLLECT_SECONDS', default=15, cast=int)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # Slow requests as warnings; INFO adds one JSON line per request
+        'request_metrics': {
+            'handlers': ['console'],
+            'level': config('REQUEST_METRICS_LOG_LEVEL', default='WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -169,11 +280,24 @@ MEDIA_ROOT = BASE_DIR / 'media'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 # REST Framework configuration
+# API authentication mode: 'token' issues opaque DRF tokens at login, 'jwt'
+# issues short-lived signed access tokens plus revocable refresh tokens.
+# DRF tokens keep working in both modes.
+AUTH_TOKEN_MODE = config('AUTH_TOKEN_MODE', default='token')
+JWT_SIGNING_KEY = config('JWT_SIGNING_KEY', default=SECRET_KEY)
+JWT_ALGORITHM = config('JWT_ALGORITHM', default='HS256')
+JWT_ACCESS_TTL = config('JWT_ACCESS_TTL', default=300, cast=int)  # Seconds
+JWT_REFRESH_TTL = config('JWT_REFRESH_TTL', default=14 * 24 * 3600, cast=int)  # Seconds
+
+API_AUTHENTICATION_CLASSES = [
+    'rest_framework.authentication.SessionAuthentication',
+    'authentication.authentication.CachingTokenAuthentication',
+]
+if AUTH_TOKEN_MODE == 'jwt':
+    API_AUTHENTICATION_CLASSES.append('authentication.authentication.JWTAuthentication')
+
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.SessionAuthentication',
-        'rest_framework.authentication.TokenAuthentication',
-    ],
+    'DEFAULT_AUTHENTICATION_CLASSES': API_AUTHENTICATION_CLASSES,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
@@ -200,5 +324,18 @@ SUPABASE_API_KEY = config('SUPABASE_API_KEY')
 # API versioning
 API_VERSION = config('API_VERSION', default='v1')
 
+# Focus live sessions, kept in the cache whenever it is shared between workers
+FOCUS_LIVE_STORE = config(
+    'FOCUS_LIVE_STORE',
+    default='focus.live.InMemoryLiveStore'
+    if CACHES['default']['BACKEND'] in PROCESS_LOCAL_CACHES else 'focus.live.CacheLiveStore'
+)
+FOCUS_HEARTBEAT_FLUSH_INTERVAL = config('FOCUS_HEARTBEAT_FLUSH_INTERVAL', default=60, cast=int)  # Seconds
+FOCUS_HEARTBEAT_TIMEOUT = config('FOCUS_HEARTBEAT_TIMEOUT', default=120, cast=int)  # Seconds
+
+# Delta sync change log (see sync/delta.py)
+SYNC_COMMIT_LAG = config('SYNC_COMMIT_LAG', default=2, cast=float)  # Seconds
+SYNC_LOG_RETENTION_DAYS = config('SYNC_LOG_RETENTION_DAYS', default=30, cast=int)
+
 # Custom User Model
 AUTH_USER_MODEL = 'users.User'
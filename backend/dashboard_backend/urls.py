@@ -25,6 +25,8 @@ from rest_framework.documentation import include_docs_urls
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 
+from dashboard.views import metrics_view
+
 @api_view(['GET'])
 def api_root(request):
     """API Root - Available endpoints"""
@@ -41,6 +43,7 @@ def api_root(request):
             'assessment': '/api/v1/assessment/',
             'schedule': '/api/v1/schedule/',
             'dashboard': '/api/v1/dashboard/',
+            'sync': '/api/v1/sync/',
             'admin': '/admin/',
             'docs': '/docs/',
         }
@@ -59,12 +62,16 @@ urlpatterns = [
     path('api/v1/medication/', include('medication.urls')),
     path('api/v1/rewards/', include('rewards.urls')),
     # path('api/v1/chat/', include('chat.urls')),  # Temporarily disabled
-    # path('api/v1/assessment/', include('assessment.urls')),  # Temporarily disabled
+    path('api/v1/assessment/', include('assessment.urls')),
     # path('api/v1/schedule/', include('schedule.urls')),  # Temporarily disabled
     path('api/v1/dashboard/', include('dashboard.urls')),
+    path('api/v1/sync/', include('sync.urls')),
     
     # API Documentation
     path('docs/', include_docs_urls(title='Dashboard API')),
+    
+    # Prometheus metrics
+    path('metrics', metrics_view, name='metrics'),
 ]
 
 # Serve media files in development
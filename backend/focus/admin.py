@@ -1,12 +1,18 @@
 from django.contrib import admin
-from .models import FocusSession, FocusSound, UserFocusSettings
+from .models import FocusSession, FocusInterval, FocusSound, UserFocusSettings
+
+class FocusIntervalInline(admin.TabularInline):
+    model = FocusInterval
+    extra = 0
+    readonly_fields = ['started_at', 'ended_at', 'end_reason']
 
 @admin.register(FocusSession)
 class FocusSessionAdmin(admin.ModelAdmin):
     list_display = ['user', 'session_type', 'title', 'planned_duration', 'actual_duration', 'status', 'start_time']
     list_filter = ['session_type', 'status', 'start_time']
     search_fields = ['user__username', 'title']
-    readonly_fields = ['start_time', 'created_at']
+    readonly_fields = ['start_time', 'created_at', 'focused_seconds', 'paused_seconds', 'segment_started_at']
+    inlines = [FocusIntervalInline]
 
 @admin.register(FocusSound)
 class FocusSoundAdmin(admin.ModelAdmin):
@@ -0,0 +1,104 @@
+"""
+Pause/resume-aware duration accounting for focus sessions.
+
+Each uninterrupted stretch of focus is stored as a FocusInterval when it is
+closed by a pause or stop. The session row keeps running totals
+(``focused_seconds``, ``paused_seconds``) and the start of the currently open
+interval, so durations never require rescanning intervals.
+
+Every transition locks the session row and works on its current state, so
+concurrent requests (a device replaying its events while the app stops the
+session) cannot close the same interval twice or undo each other.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from .models import FocusInterval, FocusSession
+
+LIVE_STATUSES = ('active', 'paused')
+# Fields a transition reads; reloaded under the row lock
+STATE_FIELDS = (
+    'status', 'start_time', 'end_time', 'focused_seconds', 'paused_seconds',
+    'segment_started_at', 'actual_duration',
+)
+
+
+def _lock(session):
+    """Lock the session row and load its current state into ``session``"""
+    current = FocusSession.objects.select_for_update().only(*STATE_FIELDS).get(pk=session.pk)
+    for field in STATE_FIELDS:
+        setattr(session, field, getattr(current, field))
+
+
+def _segment_start(session):
+    if session.segment_started_at:
+        return session.segment_started_at
+    # Sessions started before interval tracking have no open segment recorded
+    if session.status == 'active':
+        return session.start_time
+    return None
+
+
+def _close_segment(session, at, reason):
+    started_at = _segment_start(session)
+    if started_at is None:
+        return
+    at = max(at, started_at)
+    FocusInterval.objects.create(
+        session=session,
+        started_at=started_at,
+        ended_at=at,
+        end_reason=reason
+    )
+    session.focused_seconds += int((at - started_at).total_seconds())
+    session.segment_started_at = None
+
+
+def _paused_seconds(session, at):
+    if not session.start_time:
+        return session.paused_seconds
+    wall_seconds = int((at - session.start_time).total_seconds())
+    return max(wall_seconds - session.focused_seconds, 0)
+
+
+def pause_session(session, at=None):
+    at = at or timezone.now()
+    with transaction.atomic():
+        _lock(session)
+        if session.status != 'active':
+            return
+        _close_segment(session, at, 'pause')
+        session.status = 'paused'
+        session.actual_duration = session.focused_seconds // 60
+        session.save(update_fields=[
+            'status', 'focused_seconds', 'segment_started_at', 'actual_duration'
+        ])
+
+
+def resume_session(session, at=None):
+    at = at or timezone.now()
+    with transaction.atomic():
+        _lock(session)
+        if session.status != 'paused':
+            return
+        session.paused_seconds = _paused_seconds(session, at)
+        session.segment_started_at = at
+        session.status = 'active'
+        session.save(update_fields=['status', 'paused_seconds', 'segment_started_at'])
+
+
+def stop_session(session, status='completed', at=None):
+    at = at or timezone.now()
+    with transaction.atomic():
+        _lock(session)
+        if session.status not in LIVE_STATUSES:
+            return
+        _close_segment(session, at, 'stop')
+        session.status = status
+        session.end_time = at
+        session.paused_seconds = _paused_seconds(session, at)
+        session.actual_duration = session.focused_seconds // 60
+        session.save(update_fields=[
+            'status', 'end_time', 'focused_seconds', 'paused_seconds',
+            'segment_started_at', 'actual_duration'
+        ])
@@ -0,0 +1,268 @@
+"""
+Live state of running focus sessions.
+
+Active and paused sessions are kept in a small per-child store so clients can
+send frequent heartbeats and parents can ask "who is focusing now" without
+touching the database. Heartbeats only update the store; their timestamps are
+written back to FocusSession in one bulk update by a timer thread, at most
+FOCUS_HEARTBEAT_FLUSH_INTERVAL seconds after they arrive, even when no more
+heartbeats follow. A session's last heartbeat is also written when it ends,
+and pending ones when the process exits. Focus time itself is accounted by
+``focus.intervals`` when a session is paused, resumed or stopped.
+
+The store backend is selected with the FOCUS_LIVE_STORE setting:
+
+- ``focus.live.InMemoryLiveStore`` keeps state in the worker process.
+- ``focus.live.CacheLiveStore`` keeps state in the Django cache so it is shared
+  between workers. It is the default whenever that cache is shared.
+"""
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, connection
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils.module_loading import import_string
+
+from .intervals import LIVE_STATUSES, pause_session, resume_session
+from .models import FocusSession
+
+logger = logging.getLogger(__name__)
+
+
+class LiveSession(NamedTuple):
+    session_id: int
+    user_id: int
+    session_type: str
+    status: str
+    planned_duration: int
+    started_at: float
+    focused_seconds: int
+    segment_started_at: float
+    last_heartbeat: float
+
+
+class InMemoryLiveStore:
+    """Process-local live session store"""
+
+    def __init__(self):
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        return self._sessions.get(user_id)
+
+    def get_many(self, user_ids):
+        sessions = self._sessions
+        return {uid: sessions[uid] for uid in user_ids if uid in sessions}
+
+    def set(self, entry):
+        with self._lock:
+            self._sessions[entry.user_id] = entry
+
+    def delete(self, user_id):
+        with self._lock:
+            self._sessions.pop(user_id, None)
+
+
+class CacheLiveStore:
+    """Live session store backed by the Django cache"""
+    key_prefix = 'focus:live:'
+
+    def _key(self, user_id):
+        return f'{self.key_prefix}{user_id}'
+
+    def get(self, user_id):
+        value = cache.get(self._key(user_id))
+        return LiveSession(*value) if value else None
+
+    def get_many(self, user_ids):
+        values = cache.get_many([self._key(uid) for uid in user_ids])
+        prefix_length = len(self.key_prefix)
+        return {
+            int(key[prefix_length:]): LiveSession(*value)
+            for key, value in values.items()
+        }
+
+    def set(self, entry):
+        timeout = settings.FOCUS_HEARTBEAT_TIMEOUT * 10
+        cache.set(self._key(entry.user_id), tuple(entry), timeout)
+
+    def delete(self, user_id):
+        cache.delete(self._key(user_id))
+
+
+_store = None
+_store_lock = threading.Lock()
+
+# Heartbeats received by this process that are not yet in the database
+_dirty = {}
+_dirty_lock = threading.Lock()
+_flush_timer = None
+
+
+def get_store():
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = import_string(settings.FOCUS_LIVE_STORE)()
+    return _store
+
+
+def _timestamp(value):
+    return value.timestamp() if value else None
+
+
+def _entry_from_session(session):
+    segment_started_at = session.segment_started_at
+    if segment_started_at is None and session.status == 'active':
+        segment_started_at = session.start_time
+    return LiveSession(
+        session_id=session.id,
+        user_id=session.user_id,
+        session_type=session.session_type,
+        status=session.status,
+        planned_duration=session.planned_duration,
+        started_at=_timestamp(session.start_time) or time.time(),
+        focused_seconds=session.focused_seconds,
+        segment_started_at=_timestamp(segment_started_at),
+        last_heartbeat=time.time(),
+    )
+
+
+def track_session(session):
+    """Start tracking a session or refresh it after a state change"""
+    if session.status not in LIVE_STATUSES:
+        untrack_session(session.user_id)
+        return None
+
+    entry = _entry_from_session(session)
+    get_store().set(entry)
+    return entry
+
+
+def change_status(session, status):
+    """Pause or resume a session, writing the new state through to the DB"""
+    if status == 'paused':
+        pause_session(session)
+    else:
+        resume_session(session)
+    return track_session(session)
+
+
+def _heartbeat_time(entry):
+    return datetime.fromtimestamp(entry.last_heartbeat, dt_timezone.utc)
+
+
+def untrack_session(user_id):
+    """Stop tracking a user's session, writing its pending heartbeat"""
+    get_store().delete(user_id)
+    with _dirty_lock:
+        entry = _dirty.pop(user_id, None)
+    if entry is not None:
+        FocusSession.objects.filter(id=entry.session_id).update(last_heartbeat=_heartbeat_time(entry))
+
+
+def elapsed_seconds(entry, now=None):
+    """Focus time of a live session, including the running interval"""
+    if entry.status != 'active' or entry.segment_started_at is None:
+        return entry.focused_seconds
+    now = now or time.time()
+    return entry.focused_seconds + max(now - entry.segment_started_at, 0)
+
+
+def record_heartbeat(entry):
+    """Apply a heartbeat to a tracked session; the DB write is batched"""
+    global _flush_timer
+
+    entry = entry._replace(last_heartbeat=time.time())
+    get_store().set(entry)
+    with _dirty_lock:
+        _dirty[entry.user_id] = entry
+        if _flush_timer is None:
+            _flush_timer = threading.Timer(settings.FOCUS_HEARTBEAT_FLUSH_INTERVAL, _flush_in_background)
+            _flush_timer.daemon = True
+            _flush_timer.start()
+    return entry
+
+
+def _flush_in_background():
+    try:
+        flush_heartbeats()
+    except DatabaseError:
+        logger.exception('Could not write focus heartbeats')
+    finally:
+        connection.close()  # This thread's connection
+
+
+def flush_heartbeats():
+    """
+    Write pending heartbeats to FocusSession in one update; sessions that
+    ended meanwhile (e.g. through another worker) keep their final heartbeat
+    """
+    global _flush_timer
+
+    with _dirty_lock:
+        # The next heartbeat schedules a new flush
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+        pending = list(_dirty.values())
+        _dirty.clear()
+    if not pending:
+        return 0
+
+    last_heartbeat = Case(
+        *[When(id=entry.session_id, then=Value(_heartbeat_time(entry))) for entry in pending],
+        output_field=DateTimeField()
+    )
+    try:
+        updated = FocusSession.objects.filter(
+            id__in=[entry.session_id for entry in pending], status__in=LIVE_STATUSES
+        ).update(last_heartbeat=last_heartbeat)
+    except DatabaseError:
+        # Keep them for the next flush unless newer heartbeats arrived
+        with _dirty_lock:
+            for entry in pending:
+                _dirty.setdefault(entry.user_id, entry)
+        raise
+    return updated
+
+
+@atexit.register
+def _flush_at_exit():
+    if _dirty and settings.configured:
+        try:
+            flush_heartbeats()
+        except DatabaseError:
+            logger.exception('Could not write focus heartbeats at exit')
+
+
+def live_sessions(user_ids):
+    """Currently running sessions of the given users, keyed by user id"""
+    cutoff = time.time() - settings.FOCUS_HEARTBEAT_TIMEOUT
+    return {
+        user_id: entry
+        for user_id, entry in get_store().get_many(user_ids).items()
+        if entry.last_heartbeat >= cutoff
+    }
+
+
+def entry_data(entry):
+    """JSON-friendly representation of a live session"""
+    return {
+        'session_id': entry.session_id,
+        'user_id': entry.user_id,
+        'session_type': entry.session_type,
+        'status': entry.status,
+        'planned_duration': entry.planned_duration,
+        'started_at': datetime.fromtimestamp(entry.started_at, dt_timezone.utc),
+        'elapsed_seconds': int(elapsed_seconds(entry)),
+        'last_heartbeat': _heartbeat_time(entry),
+    }
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('focus', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='focussession',
+            name='last_heartbeat',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
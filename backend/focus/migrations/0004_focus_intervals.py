@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('focus', '0003_focussession_last_heartbeat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='focussession',
+            name='focused_seconds',
+            field=models.IntegerField(default=0, help_text='Focus time of closed intervals'),
+        ),
+        migrations.AddField(
+            model_name='focussession',
+            name='paused_seconds',
+            field=models.IntegerField(default=0, help_text='Time spent paused'),
+        ),
+        migrations.AddField(
+            model_name='focussession',
+            name='segment_started_at',
+            field=models.DateTimeField(blank=True, help_text='Start of the running interval', null=True),
+        ),
+        migrations.CreateModel(
+            name='FocusInterval',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField()),
+                ('end_reason', models.CharField(choices=[('pause', 'Pause'), ('stop', 'Stop')], max_length=5)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='intervals', to='focus.focussession')),
+            ],
+            options={
+                'ordering': ['started_at'],
+            },
+        ),
+    ]
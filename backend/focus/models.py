@@ -25,11 +25,33 @@ class FocusSession(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='active')
     start_time = models.DateTimeField(auto_now_add=True)
     end_time = models.DateTimeField(null=True, blank=True)
+    focused_seconds = models.IntegerField(default=0, help_text="Focus time of closed intervals")
+    paused_seconds = models.IntegerField(default=0, help_text="Time spent paused")
+    segment_started_at = models.DateTimeField(null=True, blank=True, help_text="Start of the running interval")
+    last_heartbeat = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     
     def __str__(self):
         return f"{self.user.username} - {self.session_type.title()} ({self.planned_duration}min)"
 
+class FocusInterval(models.Model):
+    """Uninterrupted focus segment of a session, closed by a pause or stop"""
+    END_REASONS = (
+        ('pause', 'Pause'),
+        ('stop', 'Stop'),
+    )
+    
+    session = models.ForeignKey(FocusSession, on_delete=models.CASCADE, related_name='intervals')
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField()
+    end_reason = models.CharField(max_length=5, choices=END_REASONS)
+    
+    class Meta:
+        ordering = ['started_at']
+    
+    def __str__(self):
+        return f"{self.session} - {self.started_at:%H:%M} to {self.ended_at:%H:%M} ({self.end_reason})"
+
 class FocusSound(models.Model):
     """Focus sounds for concentration"""
     name = models.CharField(max_length=100)
@@ -1,8 +1,9 @@
 # Focus serializers
 from rest_framework import serializers
+from utils.instrumentation import TimedSerializerMixin
 from .models import FocusSession, FocusSound, UserFocusSettings
 
-class FocusSessionSerializer(serializers.ModelSerializer):
+class FocusSessionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     
     class Meta:
@@ -14,13 +15,13 @@ class FocusSessionSerializer(serializers.ModelSerializer):
         validated_data['user'] = self.context['request'].user
         return super().create(validated_data)
 
-class FocusSoundSerializer(serializers.ModelSerializer):
+class FocusSoundSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = FocusSound
         fields = '__all__'
         read_only_fields = ['id', 'created_at']
 
-class UserFocusSettingsSerializer(serializers.ModelSerializer):
+class UserFocusSettingsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     preferred_sound = FocusSoundSerializer(read_only=True)
     preferred_sound_id = serializers.IntegerField(write_only=True, required=False)
     
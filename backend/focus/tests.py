@@ -1,3 +1,159 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient, APITestCase
 
-# Create your tests here.
+from users.models import User
+from . import live
+from .intervals import pause_session, stop_session
+from .models import FocusInterval, FocusSession
+
+
+class HeartbeatFlushTests(TestCase):
+    def setUp(self):
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        self.client = APIClient()
+        self.client.force_authenticate(self.child)
+        self.session_id = self.client.post(reverse('focus:start-session'), {'planned_duration': 25}).data['id']
+        # Leaves no pending heartbeats or timer behind
+        self.addCleanup(live.flush_heartbeats)
+
+    def _heartbeat(self):
+        response = self.client.post(reverse('focus:session-heartbeat', args=[self.session_id]))
+        self.assertEqual(response.status_code, 200)
+
+    def _last_heartbeat(self):
+        return FocusSession.objects.get(id=self.session_id).last_heartbeat
+
+    def test_heartbeats_are_buffered_until_flushed(self):
+        self._heartbeat()
+        self.assertIsNone(self._last_heartbeat())
+
+        self.assertEqual(live.flush_heartbeats(), 1)
+        self.assertIsNotNone(self._last_heartbeat())
+        self.assertEqual(live.flush_heartbeats(), 0)
+
+    def test_ending_a_session_writes_its_last_heartbeat(self):
+        self._heartbeat()
+        response = self.client.post(reverse('focus:end-session', args=[self.session_id]))
+
+        self.assertEqual(response.status_code, 200)
+        session = FocusSession.objects.get(id=self.session_id)
+        self.assertEqual(session.status, 'completed')
+        self.assertIsNotNone(session.last_heartbeat)
+        self.assertEqual(live.flush_heartbeats(), 0)
+
+
+    def test_sessions_ended_elsewhere_keep_their_heartbeat(self):
+        self._heartbeat()
+        # Another worker ended the session; this one still holds its heartbeat
+        FocusSession.objects.filter(id=self.session_id).update(status='completed')
+
+        self.assertEqual(live.flush_heartbeats(), 0)
+        self.assertIsNone(self._last_heartbeat())
+
+
+class SessionTransitionTests(TestCase):
+    def setUp(self):
+        child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        self.session = FocusSession.objects.create(
+            user=child, planned_duration=25, status='active', segment_started_at=timezone.now()
+        )
+
+    def test_transitions_work_on_the_current_row(self):
+        # Two requests loaded the session before either changed it
+        first = FocusSession.objects.get(pk=self.session.pk)
+        second = FocusSession.objects.get(pk=self.session.pk)
+
+        stop_session(first, 'completed')
+        stop_session(second, 'cancelled')
+        pause_session(second)
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.status, 'completed')
+        self.assertEqual((second.status, second.end_time), ('completed', self.session.end_time))
+        self.assertEqual(FocusInterval.objects.filter(session=self.session).count(), 1)
+
+
+@override_settings(FOCUS_HEARTBEAT_FLUSH_INTERVAL=0.1)
+class HeartbeatTimerTests(TransactionTestCase):
+    def test_timer_flushes_without_further_heartbeats(self):
+        child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        session = FocusSession.objects.create(
+            user=child, planned_duration=25, status='active', segment_started_at=timezone.now()
+        )
+        live.record_heartbeat(live.track_session(session))
+        timer = live._flush_timer
+        self.assertIsNotNone(timer)
+
+        timer.join(5)
+        session.refresh_from_db()
+        self.assertIsNotNone(session.last_heartbeat)
+        self.assertIsNone(live._flush_timer)
+
+
+class StatisticsCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        self.client.force_authenticate(self.child)
+        self.url = reverse('focus:statistics')
+
+    def _complete_session(self, user=None, signals=True):
+        session = FocusSession(user=user or self.child, planned_duration=25, actual_duration=25, status='completed')
+        if not signals:
+            FocusSession.objects.bulk_create([session])
+            return
+        with self.captureOnCommitCallbacks(execute=True):
+            session.save()
+
+    def _total_sessions(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return response.data['total_sessions']
+
+    def test_statistics_are_cached_until_the_user_writes(self):
+        self.assertEqual(self._total_sessions(), 0)
+
+        self._complete_session(signals=False)
+        self.assertEqual(self._total_sessions(), 0)
+
+        self._complete_session()
+        self.assertEqual(self._total_sessions(), 2)
+
+    def test_other_users_writes_keep_the_cache(self):
+        self.assertEqual(self._total_sessions(), 0)
+        self._complete_session(signals=False)
+
+        other = User.objects.create_user(username='other', password='pw-123456', user_type='child')
+        self._complete_session(user=other)
+        self.assertEqual(self._total_sessions(), 0)
+
+    def test_current_etag_gets_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        self._complete_session()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['total_sessions'], 1)
+
+    def test_session_list_gets_not_modified(self):
+        url = reverse('focus:session-list')
+        self._complete_session()
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        # Sessions have no updated_at: the user's generation catches edits
+        session = FocusSession.objects.get(user=self.child)
+        with self.captureOnCommitCallbacks(execute=True):
+            session.title = 'Homework'
+            session.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['title'], 'Homework')
@@ -8,6 +8,10 @@ urlpatterns = [
     path('sessions/<int:pk>/', views.FocusSessionDetailView.as_view(), name='session-detail'),
     path('sessions/start/', views.start_focus_session, name='start-session'),
     path('sessions/<int:session_id>/end/', views.end_focus_session, name='end-session'),
+    path('sessions/<int:session_id>/pause/', views.pause_focus_session, name='pause-session'),
+    path('sessions/<int:session_id>/resume/', views.resume_focus_session, name='resume-session'),
+    path('sessions/<int:session_id>/heartbeat/', views.focus_heartbeat, name='session-heartbeat'),
+    path('live/', views.live_focus_status, name='live-status'),
     path('sounds/', views.FocusSoundListView.as_view(), name='sound-list'),
     path('settings/', views.UserFocusSettingsView.as_view(), name='user-settings'),
     path('statistics/', views.focus_statistics, name='statistics'),
@@ -2,15 +2,26 @@ from rest_framework import generics, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDate
 from django.utils import timezone
 from datetime import timedelta
+from utils.cache import cache_per_user
+from utils.conditional import ConditionalGetMixin, etag_per_user
+from utils.db_router import read_from_replica
+from utils.permissions import children_of
+from .intervals import stop_session
+from .live import (
+    LIVE_STATUSES, change_status, entry_data, get_store, live_sessions,
+    record_heartbeat, track_session, untrack_session
+)
 from .models import FocusSession, FocusSound, UserFocusSettings
 from .serializers import (
     FocusSessionSerializer, FocusSoundSerializer, 
     UserFocusSettingsSerializer
 )
 
-class FocusSessionListCreateView(generics.ListCreateAPIView):
+class FocusSessionListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create focus sessions"""
     serializer_class = FocusSessionSerializer
     permission_classes = [IsAuthenticated]
@@ -52,11 +63,9 @@ def start_focus_session(request):
     title = request.data.get('title', '')
     planned_duration = request.data.get('planned_duration', 25)
     
-    # End any active sessions
-    FocusSession.objects.filter(
-        user=user, 
-        status='active'
-    ).update(status='cancelled', end_time=timezone.now())
+    # End any active or paused sessions
+    for running in FocusSession.objects.filter(user=user, status__in=LIVE_STATUSES):
+        stop_session(running, 'cancelled')
     
     # Create new session
     session = FocusSession.objects.create(
@@ -64,8 +73,10 @@ def start_focus_session(request):
         session_type=session_type,
         title=title,
         planned_duration=planned_duration,
-        status='active'
+        status='active',
+        segment_started_at=timezone.now()
     )
+    track_session(session)
     
     return Response(FocusSessionSerializer(session).data)
 
@@ -79,21 +90,15 @@ def end_focus_session(request, session_id):
             user=request.user
         )
         
-        if session.status != 'active':
+        if session.status not in LIVE_STATUSES:
             return Response(
                 {'error': 'Session is not active'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        session.end_time = timezone.now()
-        session.status = request.data.get('status', 'completed')
-        
-        # Calculate actual duration
-        if session.start_time:
-            duration = session.end_time - session.start_time
-            session.actual_duration = int(duration.total_seconds() / 60)
-        
-        session.save()
+        # Close the running interval; paused time is not counted
+        stop_session(session, request.data.get('status', 'completed'))
+        untrack_session(session.user_id)
         
         return Response(FocusSessionSerializer(session).data)
         
@@ -103,8 +108,86 @@ def end_focus_session(request, session_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+def _change_session_status(request, session_id, from_status, to_status):
+    try:
+        session = FocusSession.objects.get(
+            id=session_id,
+            user=request.user
+        )
+    except FocusSession.DoesNotExist:
+        return Response(
+            {'error': 'Session not found'}, 
+            status=status.HTTP_404_NOT_FOUND
+        )
+    
+    if session.status != from_status:
+        return Response(
+            {'error': f'Session is not {from_status}'}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    change_status(session, to_status)
+    return Response(FocusSessionSerializer(session).data)
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def pause_focus_session(request, session_id):
+    """Pause an active focus session"""
+    return _change_session_status(request, session_id, 'active', 'paused')
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def resume_focus_session(request, session_id):
+    """Resume a paused focus session"""
+    return _change_session_status(request, session_id, 'paused', 'active')
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def focus_heartbeat(request, session_id):
+    """Record a heartbeat from a running focus session"""
+    entry = get_store().get(request.user.id)
+    
+    if entry is None or entry.session_id != session_id:
+        # Not tracked by this store yet (e.g. after a restart)
+        try:
+            session = FocusSession.objects.get(
+                id=session_id,
+                user=request.user,
+                status__in=LIVE_STATUSES
+            )
+        except FocusSession.DoesNotExist:
+            return Response(
+                {'error': 'Session not found or not running'}, 
+                status=status.HTTP_404_NOT_FOUND
+            )
+        entry = track_session(session)
+    
+    entry = record_heartbeat(entry)
+    return Response(entry_data(entry))
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+def live_focus_status(request):
+    """Children (or the current user) currently in a focus session"""
+    user = request.user
+    
+    if user.user_type == 'parent':
+        user_ids = list(children_of(user))
+    else:
+        user_ids = [user.id]
+    
+    sessions = live_sessions(user_ids)
+    
+    return Response({
+        'focusing_now': [uid for uid, entry in sessions.items() if entry.status == 'active'],
+        'sessions': [entry_data(entry) for entry in sessions.values()]
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@etag_per_user('focus_statistics')
+@cache_per_user('focus_statistics')
+@read_from_replica
 def focus_statistics(request):
     """Get focus session statistics"""
     user = request.user
@@ -119,28 +202,34 @@ def focus_statistics(request):
         status='completed'
     )
     
-    total_sessions = sessions.count()
-    total_minutes = sum(s.actual_duration or 0 for s in sessions)
+    totals = sessions.aggregate(
+        total_sessions=Count('id'),
+        total_minutes=Sum('actual_duration'),
+        paused_seconds=Sum('paused_seconds')
+    )
+    total_sessions = totals['total_sessions']
+    total_minutes = totals['total_minutes'] or 0
     avg_session_length = total_minutes / total_sessions if total_sessions > 0 else 0
     
     # Sessions by type
-    session_types = {}
-    for session in sessions:
-        session_types[session.session_type] = session_types.get(session.session_type, 0) + 1
+    session_types = {
+        row['session_type']: row['count']
+        for row in sessions.values('session_type').annotate(count=Count('id')).order_by()
+    }
     
     # Daily breakdown
-    daily_stats = {}
-    for session in sessions:
-        date_str = session.start_time.date().isoformat()
-        if date_str not in daily_stats:
-            daily_stats[date_str] = {'sessions': 0, 'minutes': 0}
-        daily_stats[date_str]['sessions'] += 1
-        daily_stats[date_str]['minutes'] += session.actual_duration or 0
+    daily_stats = {
+        row['day'].isoformat(): {'sessions': row['sessions'], 'minutes': row['minutes'] or 0}
+        for row in sessions.annotate(day=TruncDate('start_time')).values('day').annotate(
+            sessions=Count('id'), minutes=Sum('actual_duration')
+        ).order_by('day')
+    }
     
     return Response({
         'total_sessions': total_sessions,
         'total_minutes': total_minutes,
         'average_session_length': round(avg_session_length, 1),
+        'total_paused_minutes': (totals['paused_seconds'] or 0) // 60,
         'session_types': session_types,
         'daily_stats': daily_stats,
         'period_days': days
@@ -0,0 +1,88 @@
+"""
+Medication dashboard data, split into independent query groups.
+
+The sync view runs the groups one after another; the async view runs them
+concurrently (see ``utils.async_views``). Both build the same response.
+"""
+from datetime import datetime, timedelta
+
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .models import MedicationLog, UserMedication
+from .serializers import MedicationLogSerializer, UserMedicationSerializer
+
+
+def medications_today(user):
+    today = timezone.now().date()
+    weekday = str(today.isoweekday())  # 1=Monday, 7=Sunday
+
+    user_medications = list(
+        UserMedication.objects.filter(user=user, is_active=True)
+        .select_related('medication')
+        .prefetch_related('schedules')
+    )
+    logged = {
+        (user_medication_id, timezone.localtime(scheduled_time).time())
+        for user_medication_id, scheduled_time in MedicationLog.objects.filter(
+            user_medication__in=user_medications,
+            scheduled_time__date=today
+        ).values_list('user_medication_id', 'scheduled_time')
+    }
+
+    serialized = UserMedicationSerializer(user_medications, many=True).data
+    today_schedules = []
+    for user_med, user_med_data in zip(user_medications, serialized):
+        for schedule in user_med.schedules.all():
+            if not schedule.is_active or weekday not in schedule.days_of_week:
+                continue
+            today_schedules.append({
+                'id': schedule.id,
+                'user_medication': user_med_data,
+                'scheduled_time': timezone.make_aware(datetime.combine(today, schedule.time)),
+                'is_logged': (user_med.id, schedule.time) in logged
+            })
+
+    return {
+        'user_medications': serialized,
+        'today_schedules': today_schedules,
+    }
+
+
+def recent_logs(user):
+    week_ago = timezone.now().date() - timedelta(days=7)
+    logs = MedicationLog.objects.filter(
+        user_medication__user=user,
+        scheduled_time__date__gte=week_ago
+    ).select_related('user_medication__medication').prefetch_related(
+        'user_medication__schedules'
+    ).order_by('-scheduled_time')[:10]
+    return {'recent_logs': MedicationLogSerializer(logs, many=True).data}
+
+
+def adherence(user):
+    month_ago = timezone.now().date() - timedelta(days=30)
+    counts = MedicationLog.objects.filter(
+        user_medication__user=user,
+        scheduled_time__date__gte=month_ago
+    ).aggregate(total=Count('id'), taken=Count('id', filter=Q(status='taken')))
+    rate = (counts['taken'] / counts['total'] * 100) if counts['total'] > 0 else 0
+    return {'adherence_rate': round(rate, 1)}
+
+
+QUERY_GROUPS = (medications_today, recent_logs, adherence)
+
+
+def build_dashboard(results):
+    today_schedules = results['today_schedules']
+    return {
+        'user_medications': results['user_medications'],
+        'today_schedules': today_schedules,
+        'recent_logs': results['recent_logs'],
+        'adherence_rate': results['adherence_rate'],
+        'stats': {
+            'total_medications': len(results['user_medications']),
+            'scheduled_today': len(today_schedules),
+            'taken_today': sum(1 for s in today_schedules if s['is_logged']),
+        }
+    }
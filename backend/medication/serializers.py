@@ -1,23 +1,24 @@
 # Medication serializers
 from rest_framework import serializers
+from utils.instrumentation import TimedSerializerMixin
 from .models import (
     Medication, UserMedication, MedicationSchedule, 
     MedicationLog, MedicationReminder
 )
 
-class MedicationSerializer(serializers.ModelSerializer):
+class MedicationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Medication
         fields = '__all__'
         read_only_fields = ['id', 'created_at']
 
-class MedicationScheduleSerializer(serializers.ModelSerializer):
+class MedicationScheduleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = MedicationSchedule
         fields = '__all__'
         read_only_fields = ['id', 'created_at']
 
-class UserMedicationSerializer(serializers.ModelSerializer):
+class UserMedicationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     medication = MedicationSerializer(read_only=True)
     medication_id = serializers.IntegerField(write_only=True)
     schedules = MedicationScheduleSerializer(many=True, read_only=True)
@@ -27,7 +28,7 @@ class UserMedicationSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
 
-class MedicationLogSerializer(serializers.ModelSerializer):
+class MedicationLogSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user_medication = UserMedicationSerializer(read_only=True)
     user_medication_id = serializers.IntegerField(write_only=True)
     
@@ -36,7 +37,7 @@ class MedicationLogSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['id', 'created_at']
 
-class MedicationReminderSerializer(serializers.ModelSerializer):
+class MedicationReminderSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user_medication = UserMedicationSerializer(read_only=True)
     
     class Meta:
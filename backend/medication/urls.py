@@ -10,6 +10,7 @@ urlpatterns = [
     path('user-medications/<int:user_medication_id>/schedules/', views.MedicationScheduleListCreateView.as_view(), name='medication-schedule-list'),
     path('logs/', views.MedicationLogListCreateView.as_view(), name='medication-log-list'),
     path('dashboard/', views.medication_dashboard, name='dashboard'),
+    path('dashboard/async/', views.MedicationDashboardAsyncView.as_view(), name='dashboard-async'),
     path('log/', views.log_medication, name='log-medication'),
     path('statistics/', views.medication_statistics, name='statistics'),
 ]
\ No newline at end of file
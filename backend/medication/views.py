@@ -4,6 +4,11 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
 from datetime import datetime, timedelta
+from utils.async_views import AsyncDashboardView, run_query_groups
+from utils.cache import cache_per_user
+from utils.conditional import ConditionalGetMixin, etag_per_user
+from utils.db_router import read_from_replica
+from .dashboard import QUERY_GROUPS, build_dashboard
 from .models import (
     Medication, UserMedication, MedicationSchedule, 
     MedicationLog, MedicationReminder
@@ -20,7 +25,7 @@ class MedicationListView(generics.ListAPIView):
     serializer_class = MedicationSerializer
     permission_classes = [IsAuthenticated]
 
-class UserMedicationListCreateView(generics.ListCreateAPIView):
+class UserMedicationListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create user medications"""
     serializer_class = UserMedicationSerializer
     permission_classes = [IsAuthenticated]
@@ -63,7 +68,7 @@ class MedicationScheduleListCreateView(generics.ListCreateAPIView):
         )
         serializer.save(user_medication=user_medication)
 
-class MedicationLogListCreateView(generics.ListCreateAPIView):
+class MedicationLogListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     """List and create medication logs"""
     serializer_class = MedicationLogSerializer
     permission_classes = [IsAuthenticated]
@@ -82,80 +87,19 @@ class MedicationLogListCreateView(generics.ListCreateAPIView):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etag_per_user('medication_dashboard')
+@cache_per_user('medication_dashboard')
 def medication_dashboard(request):
     """Get medication dashboard data"""
-    user = request.user
-    today = timezone.now().date()
-    
-    # Get user medications
-    user_medications = UserMedication.objects.filter(
-        user=user, 
-        is_active=True
-    ).select_related('medication')
-    
-    # Today's scheduled medications
-    today_schedules = []
-    for user_med in user_medications:
-        schedules = MedicationSchedule.objects.filter(
-            user_medication=user_med,
-            is_active=True
-        )
-        
-        for schedule in schedules:
-            # Check if today matches the schedule
-            weekday = str(today.isoweekday())  # 1=Monday, 7=Sunday
-            if weekday in schedule.days_of_week:
-                scheduled_datetime = timezone.make_aware(
-                    datetime.combine(today, schedule.time)
-                )
-                
-                # Check if already logged
-                log_exists = MedicationLog.objects.filter(
-                    user_medication=user_med,
-                    scheduled_time__date=today,
-                    scheduled_time__time=schedule.time
-                ).exists()
-                
-                today_schedules.append({
-                    'id': schedule.id,
-                    'user_medication': UserMedicationSerializer(user_med).data,
-                    'scheduled_time': scheduled_datetime,
-                    'is_logged': log_exists
-                })
-    
-    # Recent logs (last 7 days)
-    week_ago = today - timedelta(days=7)
-    recent_logs = MedicationLog.objects.filter(
-        user_medication__user=user,
-        scheduled_time__date__gte=week_ago
-    ).order_by('-scheduled_time')
-    
-    # Adherence rate (last 30 days)
-    month_ago = today - timedelta(days=30)
-    total_scheduled = MedicationLog.objects.filter(
-        user_medication__user=user,
-        scheduled_time__date__gte=month_ago
-    ).count()
-    
-    taken_count = MedicationLog.objects.filter(
-        user_medication__user=user,
-        scheduled_time__date__gte=month_ago,
-        status='taken'
-    ).count()
-    
-    adherence_rate = (taken_count / total_scheduled * 100) if total_scheduled > 0 else 0
+    return Response(build_dashboard(run_query_groups(QUERY_GROUPS, request.user)))
+
+class MedicationDashboardAsyncView(AsyncDashboardView):
+    """Medication dashboard with its query groups run concurrently"""
+    cache_name = 'medication_dashboard'
+    query_groups = QUERY_GROUPS
     
-    return Response({
-        'user_medications': UserMedicationSerializer(user_medications, many=True).data,
-        'today_schedules': today_schedules,
-        'recent_logs': MedicationLogSerializer(recent_logs[:10], many=True).data,
-        'adherence_rate': round(adherence_rate, 1),
-        'stats': {
-            'total_medications': user_medications.count(),
-            'scheduled_today': len(today_schedules),
-            'taken_today': sum(1 for s in today_schedules if s['is_logged']),
-        }
-    })
+    def build(self, results):
+        return build_dashboard(results)
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -209,6 +153,9 @@ def log_medication(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etag_per_user('medication_statistics')
+@cache_per_user('medication_statistics')
+@read_from_replica
 def medication_statistics(request):
     """Get medication adherence statistics"""
     user = request.user
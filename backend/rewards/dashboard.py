@@ -0,0 +1,79 @@
+"""
+Rewards dashboard data, split into independent query groups.
+
+The sync view runs the groups one after another; the async view runs them
+concurrently (see ``utils.async_views``). Both build the same response.
+"""
+from datetime import timedelta
+
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import PointsTransaction, Reward, UserAchievement, UserPoints, UserReward
+from .serializers import (
+    PointsTransactionSerializer, RewardSerializer, UserAchievementSerializer,
+    UserPointsSerializer, UserRewardSerializer
+)
+
+
+def points_and_affordable_rewards(user):
+    user_points, _ = UserPoints.objects.select_related('user').get_or_create(user=user)
+    affordable_rewards = Reward.objects.filter(
+        is_active=True,
+        points_cost__lte=user_points.available_points
+    ).select_related('category')[:5]
+    return {
+        'user_points': UserPointsSerializer(user_points).data,
+        'affordable_rewards': RewardSerializer(affordable_rewards, many=True).data,
+    }
+
+
+def transactions(user):
+    recent = PointsTransaction.objects.filter(
+        user=user
+    ).select_related('user').order_by('-created_at')[:10]
+    earned = PointsTransaction.objects.filter(
+        user=user,
+        transaction_type='earned',
+        created_at__gte=timezone.now() - timedelta(days=7)
+    ).aggregate(total=Sum('points'))['total']
+    return {
+        'recent_transactions': PointsTransactionSerializer(recent, many=True).data,
+        'points_earned_this_week': earned or 0,
+    }
+
+
+def achievements(user):
+    achieved = UserAchievement.objects.filter(user=user)
+    recent = achieved.select_related('user', 'achievement').order_by('-earned_at')[:5]
+    return {
+        'recent_achievements': UserAchievementSerializer(recent, many=True).data,
+        'total_achievements': achieved.count(),
+    }
+
+
+def claimed_rewards(user):
+    claimed = UserReward.objects.filter(user=user)
+    recent = claimed.select_related('user', 'reward__category').order_by('-claimed_at')[:5]
+    return {
+        'recent_rewards': UserRewardSerializer(recent, many=True).data,
+        'total_rewards_claimed': claimed.count(),
+    }
+
+
+QUERY_GROUPS = (points_and_affordable_rewards, transactions, achievements, claimed_rewards)
+
+
+def build_dashboard(results):
+    return {
+        'user_points': results['user_points'],
+        'recent_transactions': results['recent_transactions'],
+        'affordable_rewards': results['affordable_rewards'],
+        'recent_achievements': results['recent_achievements'],
+        'recent_rewards': results['recent_rewards'],
+        'stats': {
+            'total_achievements': results['total_achievements'],
+            'total_rewards_claimed': results['total_rewards_claimed'],
+            'points_earned_this_week': results['points_earned_this_week'],
+        }
+    }
@@ -1,17 +1,18 @@
 # Rewards serializers
 from rest_framework import serializers
+from utils.instrumentation import TimedSerializerMixin
 from .models import (
     RewardCategory, Reward, UserPoints, PointsTransaction,
     UserReward, Achievement, UserAchievement
 )
 
-class RewardCategorySerializer(serializers.ModelSerializer):
+class RewardCategorySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = RewardCategory
         fields = '__all__'
         read_only_fields = ['id', 'created_at']
 
-class RewardSerializer(serializers.ModelSerializer):
+class RewardSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     category = RewardCategorySerializer(read_only=True)
     
     class Meta:
@@ -19,7 +20,7 @@ class RewardSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['id', 'created_at', 'updated_at']
 
-class UserPointsSerializer(serializers.ModelSerializer):
+class UserPointsSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     
     class Meta:
@@ -27,7 +28,7 @@ class UserPointsSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
 
-class PointsTransactionSerializer(serializers.ModelSerializer):
+class PointsTransactionSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     user = serializers.StringRelatedField(read_only=True)
     
     class Meta:
@@ -35,7 +36,7 @@ class PointsTransactionSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['id', 'user', 'created_at']
 
-class UserRewardSerializer(serializers.ModelSerializer):
+class UserRewardSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     reward = RewardSerializer(read_only=True)
     reward_id = serializers.IntegerField(write_only=True)
     user = serializers.StringRelatedField(read_only=True)
@@ -45,13 +46,13 @@ class UserRewardSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ['id', 'user', 'claimed_at']
 
-class AchievementSerializer(serializers.ModelSerializer):
+class AchievementSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Achievement
         fields = '__all__'
         read_only_fields = ['id', 'created_at']
 
-class UserAchievementSerializer(serializers.ModelSerializer):
+class UserAchievementSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     achievement = AchievementSerializer(read_only=True)
     user = serializers.StringRelatedField(read_only=True)
     
@@ -1,3 +1,45 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
 
-# Create your tests here.
+from users.models import User
+from .models import Reward, RewardCategory, UserPoints
+
+
+class RewardsDashboardCacheTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        UserPoints.objects.create(user=self.child, total_points=100, available_points=100)
+        self.category = RewardCategory.objects.create(name='Treats')
+        self.client.force_authenticate(self.child)
+        self.url = reverse('rewards:rewards_dashboard')
+
+    def _affordable(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        return [reward['name'] for reward in response.data['affordable_rewards']], response['ETag']
+
+    def test_catalog_changes_expire_the_cached_dashboard(self):
+        names, etag = self._affordable()
+        self.assertEqual(names, [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reward = Reward.objects.create(name='Ice cream', description='', category=self.category, points_cost=50)
+        names, new_etag = self._affordable()
+        self.assertEqual(names, ['Ice cream'])
+        self.assertNotEqual(new_etag, etag)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reward.is_active = False
+            reward.save()
+        self.assertEqual(self._affordable()[0], [])
+
+    def test_unchanged_catalog_is_served_from_the_cache(self):
+        Reward.objects.create(name='Ice cream', description='', category=self.category, points_cost=50)
+        cache.clear()
+        self.assertEqual(self._affordable()[0], ['Ice cream'])
+
+        # Bulk updates send no signals, so the cached response stays
+        Reward.objects.update(is_active=False)
+        self.assertEqual(self._affordable()[0], ['Ice cream'])
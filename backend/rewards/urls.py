@@ -6,6 +6,7 @@ app_name = 'rewards'
 urlpatterns = [
     # Dashboard
     path('dashboard/', views.rewards_dashboard, name='rewards_dashboard'),
+    path('dashboard/async/', views.RewardsDashboardAsyncView.as_view(), name='rewards_dashboard_async'),
     
     # Reward categories and rewards
     path('categories/', views.RewardCategoryListView.as_view(), name='reward_categories'),
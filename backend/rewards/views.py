@@ -4,6 +4,10 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.db import transaction, models
 from django.utils import timezone
+from utils.async_views import AsyncDashboardView, run_query_groups
+from utils.cache import cache_per_user
+from utils.conditional import ConditionalGetMixin, etag_per_user
+from .dashboard import QUERY_GROUPS, build_dashboard
 from .models import (
     RewardCategory, Reward, UserPoints, PointsTransaction,
     UserReward, Achievement, UserAchievement
@@ -20,7 +24,7 @@ class RewardCategoryListView(generics.ListAPIView):
     serializer_class = RewardCategorySerializer
     permission_classes = [IsAuthenticated]
 
-class RewardListView(generics.ListAPIView):
+class RewardListView(ConditionalGetMixin, generics.ListAPIView):
     """List available rewards"""
     serializer_class = RewardSerializer
     permission_classes = [IsAuthenticated]
@@ -45,7 +49,7 @@ class UserPointsView(generics.RetrieveAPIView):
         )
         return obj
 
-class PointsTransactionListView(generics.ListAPIView):
+class PointsTransactionListView(ConditionalGetMixin, generics.ListAPIView):
     """List user points transactions"""
     serializer_class = PointsTransactionSerializer
     permission_classes = [IsAuthenticated]
@@ -55,7 +59,7 @@ class PointsTransactionListView(generics.ListAPIView):
             user=self.request.user
         ).order_by('-created_at')
 
-class UserRewardListView(generics.ListAPIView):
+class UserRewardListView(ConditionalGetMixin, generics.ListAPIView):
     """List user's claimed rewards"""
     serializer_class = UserRewardSerializer
     permission_classes = [IsAuthenticated]
@@ -71,7 +75,7 @@ class AchievementListView(generics.ListAPIView):
     serializer_class = AchievementSerializer
     permission_classes = [IsAuthenticated]
 
-class UserAchievementListView(generics.ListAPIView):
+class UserAchievementListView(ConditionalGetMixin, generics.ListAPIView):
     """List user's earned achievements"""
     serializer_class = UserAchievementSerializer
     permission_classes = [IsAuthenticated]
@@ -246,47 +250,16 @@ def check_achievements(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etag_per_user('rewards_dashboard')
+@cache_per_user('rewards_dashboard')
 def rewards_dashboard(request):
     """Get rewards dashboard data"""
-    user = request.user
-    
-    # User points
-    user_points, _ = UserPoints.objects.get_or_create(user=user)
-    
-    # Recent transactions (last 10)
-    recent_transactions = PointsTransaction.objects.filter(
-        user=user
-    ).order_by('-created_at')[:10]
-    
-    # Available rewards (that user can afford)
-    affordable_rewards = Reward.objects.filter(
-        is_active=True,
-        points_cost__lte=user_points.available_points
-    ).select_related('category')[:5]
-    
-    # Recent achievements (last 5)
-    recent_achievements = UserAchievement.objects.filter(
-        user=user
-    ).select_related('achievement').order_by('-earned_at')[:5]
-    
-    # Claimed rewards (last 5)
-    recent_rewards = UserReward.objects.filter(
-        user=user
-    ).select_related('reward').order_by('-claimed_at')[:5]
+    return Response(build_dashboard(run_query_groups(QUERY_GROUPS, request.user)))
+
+class RewardsDashboardAsyncView(AsyncDashboardView):
+    """Rewards dashboard with its query groups run concurrently"""
+    cache_name = 'rewards_dashboard'
+    query_groups = QUERY_GROUPS
     
-    return Response({
-        'user_points': UserPointsSerializer(user_points).data,
-        'recent_transactions': PointsTransactionSerializer(recent_transactions, many=True).data,
-        'affordable_rewards': RewardSerializer(affordable_rewards, many=True).data,
-        'recent_achievements': UserAchievementSerializer(recent_achievements, many=True).data,
-        'recent_rewards': UserRewardSerializer(recent_rewards, many=True).data,
-        'stats': {
-            'total_achievements': UserAchievement.objects.filter(user=user).count(),
-            'total_rewards_claimed': UserReward.objects.filter(user=user).count(),
-            'points_earned_this_week': PointsTransaction.objects.filter(
-                user=user,
-                transaction_type='earned',
-                created_at__gte=timezone.now() - timezone.timedelta(days=7)
-            ).aggregate(total=models.Sum('points'))['total'] or 0
-        }
-    })
+    def build(self, results):
+        return build_dashboard(results)
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from utils.instrumentation import TimedSerializerMixin
 from .models import (
     ScheduleTemplate, Schedule, ScheduleActivity,
     ActivityCompletion, ScheduleReminder
@@ -8,7 +9,7 @@ from .models import (
 
 User = get_user_model()
 
-class UserScheduleSerializer(serializers.ModelSerializer):
+class UserScheduleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Basic user serializer for schedules"""
     full_name = serializers.CharField(source='get_full_name', read_only=True)
     
@@ -16,7 +17,7 @@ class UserScheduleSerializer(serializers.ModelSerializer):
         model = User
         fields = ['id', 'username', 'first_name', 'last_name', 'full_name']
 
-class ScheduleActivitySerializer(serializers.ModelSerializer):
+class ScheduleActivitySerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Schedule activity serializer"""
     is_completed = serializers.SerializerMethodField()
     is_overdue = serializers.SerializerMethodField()
@@ -51,7 +52,7 @@ class ScheduleActivitySerializer(serializers.ModelSerializer):
         today_end = timezone.make_aware(timezone.datetime.combine(today, obj.end_time))
         return now > today_end
 
-class ScheduleTemplateSerializer(serializers.ModelSerializer):
+class ScheduleTemplateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Schedule template serializer"""
     items_count = serializers.SerializerMethodField()
     
@@ -65,7 +66,7 @@ class ScheduleTemplateSerializer(serializers.ModelSerializer):
     def get_items_count(self, obj):
         return obj.template_items.count()
 
-class ScheduleSerializer(serializers.ModelSerializer):
+class ScheduleSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Schedule with items"""
     user = UserScheduleSerializer(read_only=True)
     template = ScheduleTemplateSerializer(read_only=True)
@@ -109,7 +110,7 @@ class ScheduleSerializer(serializers.ModelSerializer):
                 }
         return None
 
-class ScheduleCreateSerializer(serializers.ModelSerializer):
+class ScheduleCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating schedules"""
     template_id = serializers.IntegerField(required=False)
     
@@ -143,7 +144,7 @@ class ScheduleCreateSerializer(serializers.ModelSerializer):
         
         return schedule
 
-class ScheduleActivityCreateSerializer(serializers.ModelSerializer):
+class ScheduleActivityCreateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     """Serializer for creating schedule activities"""
     
     class Meta:
@@ -175,7 +176,7 @@ class ScheduleActivityCreateSerializer(serializers.ModelSerializer):
 #     """Recurring event serializer - to be implemented"""
 #     pass
 
-class ScheduleStatsSerializer(serializers.Serializer):
+class ScheduleStatsSerializer(TimedSerializerMixin, serializers.Serializer):
     """Schedule statistics serializer"""
     total_schedules = serializers.IntegerField()
     active_schedules = serializers.IntegerField()
@@ -184,7 +185,7 @@ class ScheduleStatsSerializer(serializers.Serializer):
     upcoming_items = serializers.ListField()
     weekly_progress = serializers.ListField()
 
-class DailyScheduleSerializer(serializers.Serializer):
+class DailyScheduleSerializer(TimedSerializerMixin, serializers.Serializer):
     """Daily schedule overview serializer"""
     date = serializers.DateField()
     total_items = serializers.IntegerField()
@@ -194,7 +195,7 @@ class DailyScheduleSerializer(serializers.Serializer):
     completion_rate = serializers.FloatField()
     activities = ScheduleActivitySerializer(many=True)
 
-class WeeklyScheduleSerializer(serializers.Serializer):
+class WeeklyScheduleSerializer(TimedSerializerMixin, serializers.Serializer):
     """Weekly schedule overview serializer"""
     week_start = serializers.DateField()
     week_end = serializers.DateField()
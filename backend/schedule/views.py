@@ -5,6 +5,9 @@ from rest_framework.permissions import IsAuthenticated
 from django.db import transaction
 from django.utils import timezone
 
+from utils.cache import cache_per_user
+from utils.conditional import etag_per_user
+from utils.db_router import read_from_replica
 from .models import ScheduleTemplate, Schedule, ScheduleActivity
 from .serializers import (
     ScheduleTemplateSerializer, ScheduleSerializer, ScheduleCreateSerializer,
@@ -273,6 +276,9 @@ def weekly_schedule(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@etag_per_user('schedule_dashboard')
+@cache_per_user('schedule_dashboard')
+@read_from_replica
 def schedule_dashboard(request):
     """Get schedule dashboard data"""
     user = request.user
@@ -0,0 +1,9 @@
+from django.contrib import admin
+from .models import SyncEvent
+
+@admin.register(SyncEvent)
+class SyncEventAdmin(admin.ModelAdmin):
+    list_display = ['user', 'device_id', 'event_type', 'client_timestamp', 'created_at']
+    list_filter = ['event_type', 'created_at']
+    search_fields = ['user__username', 'device_id', 'client_event_id']
+    readonly_fields = ['client_event_id', 'payload', 'result', 'created_at']
@@ -0,0 +1,97 @@
+"""
+Per-user change log for delta sync.
+
+Model signals append one ChangeLogEntry per affected user whenever a tracked
+row is inserted, updated or deleted. Entry ids increase monotonically, so the
+last id a client has seen is its sync token and ``id > token`` is everything
+it is missing (see ``sync.delta`` for entries that commit out of id order).
+Entries are written once the surrounding transaction commits, so rolled back
+changes never show up.
+
+Rows reach the users their REST endpoints show them to, and no further: a
+parent follows the changes of a child's rows only for models registered with
+``family_fields``, and gets only those fields.
+"""
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, transaction
+
+from .models import ChangeLogEntry
+
+# model -> function returning the ids of the users who see a row
+# (``[None]`` for rows shared by everyone)
+TRACKED_MODELS = {}
+# model label -> fields sent to the owners (None for every field)
+FEED_FIELDS = {}
+# model label -> fields sent to the owners' parents
+FAMILY_FIELDS = {}
+
+
+def track(model, owners, fields=None, family_fields=None):
+    TRACKED_MODELS[model] = owners
+    FEED_FIELDS[model_label(model)] = fields
+    if family_fields is not None:
+        FAMILY_FIELDS[model_label(model)] = family_fields
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def record_changes(model, objects, action, user_ids=None):
+    """
+    Log a change of ``objects`` once the current transaction commits.
+
+    ``user_ids`` defaults to the owners registered for the model. Also used
+    directly by bulk writes, which do not send model signals.
+    """
+    owners = TRACKED_MODELS[model]
+    entries = [
+        ChangeLogEntry(user_id=user_id, model=model_label(model), object_id=obj.pk, action=action)
+        for obj in objects
+        for user_id in (owners(obj) if user_ids is None else user_ids)
+    ]
+    if entries:
+        transaction.on_commit(lambda: _write(entries))
+
+
+def _write(entries):
+    try:
+        with transaction.atomic():
+            ChangeLogEntry.objects.bulk_create(entries)
+    except IntegrityError:
+        # Deleting a user cascades to their rows; the user has no feed left
+        user_ids = {entry.user_id for entry in entries if entry.user_id is not None}
+        existing = set(get_user_model().objects.filter(id__in=user_ids).values_list('id', flat=True))
+        ChangeLogEntry.objects.bulk_create([
+            entry for entry in entries if entry.user_id is None or entry.user_id in existing
+        ])
+
+
+def owner(obj):
+    return [obj.user_id]
+
+
+def medication_owner(obj):
+    return [obj.user_medication.user_id]
+
+
+def schedule_owner(obj):
+    return [obj.schedule.user_id]
+
+
+def shared(obj):
+    return [None]
+
+
+def room_participants(room):
+    return list(room.participants.values_list('id', flat=True))
+
+
+def message_participants(message):
+    return room_participants(message.room)
+
+
+def notification_targets(notification):
+    if notification.is_global:
+        return [None]
+    return list(notification.target_users.values_list('id', flat=True))
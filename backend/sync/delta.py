@@ -0,0 +1,151 @@
+"""
+Delta sync over the change log.
+
+A sync token is the id of the last ChangeLogEntry a client has received.
+Changes are returned in log order, collapsed to one item per row, with the
+current values of inserted and updated rows fetched in one query per model.
+
+Ids are allocated when an entry is inserted, not when its transaction
+commits, so an entry can become visible after one with a higher id. Only
+entries older than SYNC_COMMIT_LAG are served, and the feed stops before the
+first younger one, so a token never moves past a row that is about to
+appear. The log is pruned after SYNC_LOG_RETENTION_DAYS (``prune_changelog``);
+tokens older than that raise TokenExpired and the client reloads.
+
+A parent's feed includes their children's rows only for the models and
+fields registered as family-visible in ``sync.changelog``.
+"""
+from datetime import timedelta
+
+from django.apps import apps
+from django.conf import settings
+from django.db.models import Max, Min, Q
+from django.utils import timezone
+
+from .changelog import FAMILY_FIELDS, FEED_FIELDS
+from .models import ChangeLogEntry
+
+CHANGES_PAGE_SIZE = 500
+
+# Rows relevant to devices syncing through the batch endpoint
+DEVICE_MODELS = (
+    'focus.focussession',
+    'medication.medicationlog',
+    'schedule.activitycompletion',
+)
+
+
+class TokenExpired(Exception):
+    """The changes after a sync token have been pruned from the log"""
+
+
+def parse_token(token):
+    """Change log id encoded in a sync token; raises ValueError when invalid"""
+    if token is None or not str(token).isdigit():
+        raise ValueError('Invalid sync token')
+    return int(token)
+
+
+def _horizon(entries):
+    """Lowest id among ``entries`` that are still within the commit lag"""
+    cutoff = timezone.now() - timedelta(seconds=settings.SYNC_COMMIT_LAG)
+    return entries.filter(created_at__gt=cutoff).aggregate(first=Min('id'))['first']
+
+
+def latest_token():
+    """Token of the current end of the log, short of entries that may still be committing"""
+    horizon = _horizon(ChangeLogEntry.objects.all())
+    if horizon is not None:
+        return str(horizon - 1)
+    return str(ChangeLogEntry.objects.aggregate(last=Max('id'))['last'] or 0)
+
+
+def prune(before):
+    """
+    Delete the entries created before ``before`` but the last of them, which
+    marks where the log starts; returns the number of entries deleted
+    """
+    last = ChangeLogEntry.objects.filter(created_at__lt=before).aggregate(last=Max('id'))['last']
+    if last is None:
+        return 0
+    deleted, _ = ChangeLogEntry.objects.filter(id__lt=last).delete()
+    return deleted
+
+
+def _collapse(entries):
+    """Net action per (model, object id): first and last action decide it"""
+    collapsed = {}
+    for entry_id, model, object_id, action, user_id in entries:
+        key = (model, object_id)
+        if key in collapsed:
+            collapsed[key]['action'] = action
+        else:
+            collapsed[key] = {'first': action, 'action': action, 'user_id': user_id}
+
+    changes = {}
+    for key, item in collapsed.items():
+        if item['first'] == 'insert' and item['action'] == 'delete':
+            continue  # Created and removed since the token
+        if item['first'] == 'insert':
+            item['action'] = 'insert'
+        changes[key] = item
+    return changes
+
+
+def changes_since(user_id, since, child_ids=(), models=None, limit=CHANGES_PAGE_SIZE):
+    """
+    Changes visible to ``user_id`` after token ``since``, including the
+    family-visible changes of ``child_ids``.
+
+    Returns ``{'changes': [...], 'sync_token': ..., 'has_more': ...}``; clients
+    keep requesting with the returned token while ``has_more`` is true.
+    Raises TokenExpired when entries after ``since`` have been pruned.
+    """
+    first = ChangeLogEntry.objects.aggregate(first=Min('id'))['first']
+    if first is not None and since < first - 1:
+        raise TokenExpired('Sync token expired, reload and sync from the start')
+
+    visible = Q(user_id=user_id) | Q(user__isnull=True)
+    if child_ids:
+        visible |= Q(user_id__in=child_ids, model__in=list(FAMILY_FIELDS))
+    entries = ChangeLogEntry.objects.filter(visible, id__gt=since)
+    if models:
+        entries = entries.filter(model__in=models)
+    horizon = _horizon(entries)
+    if horizon is not None:
+        entries = entries.filter(id__lt=horizon)
+    entries = list(
+        entries.order_by('id').values_list('id', 'model', 'object_id', 'action', 'user_id')[:limit + 1]
+    )
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+    changes = _collapse(entries)
+
+    ids_by_model = {}
+    for (model, object_id), item in changes.items():
+        if item['action'] != 'delete':
+            family = item['user_id'] not in (user_id, None)
+            ids_by_model.setdefault((model, family), []).append(object_id)
+    rows = {}
+    for (model, family), ids in ids_by_model.items():
+        fields = FAMILY_FIELDS[model] if family else FEED_FIELDS.get(model)
+        queryset = apps.get_model(model).objects.filter(pk__in=ids).values(*(fields or ()))
+        rows.update({(model, row['id']): row for row in queryset})
+
+    items = []
+    for key, item in changes.items():
+        data = rows.get(key)
+        action = item['action'] if data is not None else 'delete'
+        items.append({
+            'model': key[0],
+            'id': key[1],
+            'action': action,
+            'user_id': item['user_id'],
+            'data': data if action != 'delete' else None,
+        })
+
+    return {
+        'changes': items,
+        'sync_token': str(entries[-1][0]) if entries else str(since),
+        'has_more': has_more,
+    }
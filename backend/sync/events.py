@@ -0,0 +1,194 @@
+"""
+Replay of offline device events.
+
+Devices stamp every action with their own id and timestamp while offline and
+send them in order once they reconnect. A batch is applied in one transaction;
+each event runs in its own savepoint so a rejected event does not undo the
+others. Applied events are stored as SyncEvent rows, so resending a batch
+returns the stored results instead of applying anything twice.
+"""
+from datetime import datetime
+
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from dashboard.models import SystemNotification
+from focus.intervals import stop_session
+from focus.live import LIVE_STATUSES, track_session, untrack_session
+from focus.models import FocusSession
+from medication.models import MedicationLog, UserMedication
+from schedule.models import ActivityCompletion, ScheduleActivity
+from .models import SyncEvent
+
+
+class SyncError(ValueError):
+    pass
+
+
+def _datetime(value, name):
+    parsed = parse_datetime(value) if isinstance(value, str) else None
+    if parsed is None:
+        raise SyncError(f'{name} must be an ISO 8601 datetime')
+    return timezone.make_aware(parsed) if timezone.is_naive(parsed) else parsed
+
+
+def _choice(data, name, choices, default):
+    value = data.get(name, default)
+    if value not in dict(choices):
+        raise SyncError(f"{name} must be one of: {', '.join(dict(choices))}")
+    return value
+
+
+def focus_start(user, at, data):
+    # A new session ends whatever the device left running
+    for running in FocusSession.objects.filter(user=user, status__in=LIVE_STATUSES):
+        stop_session(running, 'cancelled', at=max(at, running.start_time))
+
+    session = FocusSession.objects.create(
+        user=user,
+        session_type=_choice(data, 'session_type', FocusSession.SESSION_TYPES, 'pomodoro'),
+        title=data.get('title', ''),
+        planned_duration=int(data.get('planned_duration', 25)),
+        status='active',
+        segment_started_at=at
+    )
+    # start_time is auto_now_add; keep the time the device started the session
+    FocusSession.objects.filter(pk=session.pk).update(start_time=at)
+    session.start_time = at
+    transaction.on_commit(lambda: track_session(session))
+    return {'session_id': session.id}
+
+
+def _event_session(user, data):
+    session_id = data.get('session_id')
+    if session_id is None and data.get('start_event_id'):
+        start = SyncEvent.objects.filter(
+            user=user, client_event_id=data['start_event_id'], event_type='focus_start'
+        ).first()
+        session_id = start.result.get('session_id') if start else None
+    if session_id is None:
+        raise SyncError('session_id or start_event_id of a synced focus_start is required')
+    return FocusSession.objects.get(id=session_id, user=user)
+
+
+def focus_end(user, at, data):
+    session = _event_session(user, data)
+    if session.status not in LIVE_STATUSES:
+        raise SyncError('Session is not active')
+
+    stop_session(session, data.get('status', 'completed'), at=at)
+    transaction.on_commit(lambda: untrack_session(user.id))
+    return {'session_id': session.id, 'actual_duration': session.actual_duration}
+
+
+def medication_taken(user, at, data):
+    user_medication = UserMedication.objects.get(id=data.get('user_medication_id'), user=user)
+    scheduled_time = _datetime(data.get('scheduled_time'), 'scheduled_time')
+
+    log, created = MedicationLog.objects.get_or_create(
+        user_medication=user_medication,
+        scheduled_time=scheduled_time,
+        defaults={'status': 'taken', 'actual_time': at, 'notes': data.get('notes', '')}
+    )
+    if not created:
+        log.status = 'taken'
+        log.actual_time = at
+        log.save(update_fields=['status', 'actual_time'])
+    return {'medication_log_id': log.id}
+
+
+def activity_completed(user, at, data):
+    activity = ScheduleActivity.objects.get(id=data.get('activity_id'), schedule__user=user)
+    scheduled_date = parse_date(data.get('scheduled_date') or '') or timezone.localtime(at).date()
+
+    completion, _ = ActivityCompletion.objects.get_or_create(
+        activity=activity,
+        user=user,
+        scheduled_date=scheduled_date,
+        defaults={
+            'scheduled_start_time': timezone.make_aware(
+                datetime.combine(scheduled_date, activity.start_time)
+            ),
+        }
+    )
+    completion.status = 'completed'
+    completion.actual_end_time = at
+    completion.rating = data.get('rating', completion.rating)
+    completion.completion_notes = data.get('notes', completion.completion_notes)
+    completion.save()
+    return {'activity_completion_id': completion.id}
+
+
+def break_requested(user, at, data):
+    parent_ids = list(user.parents.filter(is_active=True).values_list('parent_id', flat=True))
+    reason = data.get('reason')
+    notification = SystemNotification.objects.create(
+        title='Break requested',
+        message=f"{user.get_full_name() or user.username} requested a break at "
+                f"{timezone.localtime(at):%H:%M}" + (f": {reason}" if reason else ''),
+        notification_type='reminder',
+        priority=_choice(data, 'priority', SystemNotification.PRIORITY_LEVELS, 'medium')
+    )
+    notification.target_users.set(parent_ids)
+    return {'notification_id': notification.id}
+
+
+HANDLERS = {
+    'focus_start': focus_start,
+    'focus_end': focus_end,
+    'medication_taken': medication_taken,
+    'activity_completed': activity_completed,
+    'break_requested': break_requested,
+}
+
+
+def apply_events(user, device_id, events):
+    """
+    Apply validated events in order and return one result per event.
+
+    Each event is a dict with ``id``, ``type``, ``timestamp`` and ``data``.
+    """
+    results = []
+    with transaction.atomic():
+        applied = {
+            event.client_event_id: event
+            for event in SyncEvent.objects.filter(
+                user=user, client_event_id__in=[e['id'] for e in events]
+            )
+        }
+
+        for event in events:
+            event_id = event['id']
+            if event_id in applied:
+                results.append({'id': event_id, 'status': 'duplicate', 'result': applied[event_id].result})
+                continue
+
+            try:
+                with transaction.atomic():
+                    result = HANDLERS[event['type']](user, event['timestamp'], event['data'])
+                    applied[event_id] = SyncEvent.objects.create(
+                        user=user,
+                        device_id=device_id,
+                        client_event_id=event_id,
+                        event_type=event['type'],
+                        payload=event['data'],
+                        result=result,
+                        client_timestamp=event['timestamp']
+                    )
+            except IntegrityError as e:
+                # The same event may have been applied by a concurrent request
+                existing = SyncEvent.objects.filter(user=user, client_event_id=event_id).first()
+                if existing is None:
+                    results.append({'id': event_id, 'status': 'rejected', 'error': str(e)})
+                else:
+                    results.append({'id': event_id, 'status': 'duplicate', 'result': existing.result})
+                continue
+            except (ObjectDoesNotExist, ValueError, TypeError) as e:
+                error = 'Not found' if isinstance(e, ObjectDoesNotExist) else str(e)
+                results.append({'id': event_id, 'status': 'rejected', 'error': error})
+                continue
+
+            results.append({'id': event_id, 'status': 'applied', 'result': result})
+    return results
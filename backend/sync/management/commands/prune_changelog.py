@@ -0,0 +1,21 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from sync.delta import prune
+
+
+class Command(BaseCommand):
+    help = 'Delete delta sync change log entries older than the retention period (run daily)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.SYNC_LOG_RETENTION_DAYS,
+            help='Keep entries of the last N days (default: SYNC_LOG_RETENTION_DAYS)'
+        )
+
+    def handle(self, *args, **options):
+        deleted = prune(timezone.now() - timedelta(days=options['days']))
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} change log entries'))
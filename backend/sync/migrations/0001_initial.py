@@ -0,0 +1,35 @@
+# Generated by Django 5.2.6 on 2026-10-19 11:56
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('device_id', models.CharField(max_length=100)),
+                ('client_event_id', models.CharField(help_text='Id generated by the device', max_length=64)),
+                ('event_type', models.CharField(choices=[('focus_start', 'Focus Start'), ('focus_end', 'Focus End'), ('medication_taken', 'Medication Taken'), ('activity_completed', 'Activity Completed'), ('break_requested', 'Break Requested')], max_length=20)),
+                ('payload', models.JSONField(default=dict)),
+                ('result', models.JSONField(default=dict, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ('client_timestamp', models.DateTimeField(help_text='When the event happened on the device')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sync_events', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'unique_together': {('user', 'client_event_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+
+class SyncEvent(models.Model):
+    """Client-stamped event replayed by a device, kept for idempotent retries"""
+    EVENT_TYPES = (
+        ('focus_start', 'Focus Start'),
+        ('focus_end', 'Focus End'),
+        ('medication_taken', 'Medication Taken'),
+        ('activity_completed', 'Activity Completed'),
+        ('break_requested', 'Break Requested'),
+    )
+    
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='sync_events')
+    device_id = models.CharField(max_length=100)
+    client_event_id = models.CharField(max_length=64, help_text="Id generated by the device")
+    event_type = models.CharField(max_length=20, choices=EVENT_TYPES)
+    payload = models.JSONField(default=dict)
+    result = models.JSONField(default=dict, encoder=DjangoJSONEncoder)
+    client_timestamp = models.DateTimeField(help_text="When the event happened on the device")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ('user', 'client_event_id')
+    
+    def __str__(self):
+        return f"{self.user.username} - {self.event_type} from {self.device_id}"
+
+class ChangeLogEntry(models.Model):
+    """Insert/update/delete of a tracked row; the id is the delta-sync token"""
+    ACTIONS = (
+        ('insert', 'Insert'),
+        ('update', 'Update'),
+        ('delete', 'Delete'),
+    )
+    
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='change_log',
+        null=True, blank=True, help_text="Owner of the row; empty for shared rows"
+    )
+    model = models.CharField(max_length=100, help_text="app_label.model_name")
+    object_id = models.PositiveBigIntegerField()
+    action = models.CharField(max_length=6, choices=ACTIONS)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [models.Index(fields=['user', 'id'])]
+    
+    def __str__(self):
+        return f"#{self.id} {self.action} {self.model}:{self.object_id}"
@@ -0,0 +1,16 @@
+from rest_framework import serializers
+from utils.instrumentation import TimedSerializerMixin
+from .models import SyncEvent
+
+MAX_BATCH_SIZE = 500
+
+class SyncEventSerializer(TimedSerializerMixin, serializers.Serializer):
+    id = serializers.CharField(max_length=64)
+    type = serializers.ChoiceField(choices=SyncEvent.EVENT_TYPES)
+    timestamp = serializers.DateTimeField()
+    data = serializers.DictField(required=False, default=dict)
+
+class SyncBatchSerializer(TimedSerializerMixin, serializers.Serializer):
+    device_id = serializers.CharField(max_length=100)
+    since = serializers.CharField(required=False, allow_null=True, allow_blank=True)
+    events = SyncEventSerializer(many=True, max_length=MAX_BATCH_SIZE)
@@ -0,0 +1,69 @@
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+
+from chat.models import ChatMessage, ChatRoom
+from dashboard.exports import DATASETS as EXPORT_DATASETS
+from dashboard.models import SystemNotification, UserNotificationStatus
+from focus.models import FocusSession
+from medication.models import MedicationLog, MedicationReminder, MedicationSchedule, UserMedication
+from rewards.models import PointsTransaction, Reward, UserAchievement, UserPoints, UserReward
+from schedule.models import ActivityCompletion, Schedule, ScheduleActivity
+
+from .changelog import (
+    TRACKED_MODELS, medication_owner, message_participants, notification_targets,
+    owner, record_changes, room_participants, schedule_owner, shared, track,
+)
+
+# Parents read their children's history through the export
+track(FocusSession, owner, family_fields=['user', *EXPORT_DATASETS['focus'][2]])
+track(UserMedication, owner)
+track(MedicationSchedule, medication_owner)
+track(MedicationLog, medication_owner, family_fields=EXPORT_DATASETS['medication'][2])
+track(MedicationReminder, medication_owner)
+track(Schedule, owner)
+track(ScheduleActivity, schedule_owner)
+track(ActivityCompletion, owner)
+track(UserPoints, owner)
+track(PointsTransaction, owner)
+track(UserReward, owner)
+track(UserAchievement, owner)
+track(Reward, shared)
+# The fields of the chat serializers
+track(ChatRoom, room_participants, fields=[
+    'id', 'name', 'description', 'room_type', 'created_by', 'created_at', 'updated_at',
+])
+track(ChatMessage, message_participants, fields=[
+    'id', 'room', 'sender', 'content', 'message_type', 'file_attachment', 'is_edited', 'created_at',
+])
+track(SystemNotification, notification_targets)
+track(UserNotificationStatus, owner)
+
+
+def log_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    record_changes(sender, [instance], 'insert' if created else 'update')
+
+
+def log_delete(sender, instance, **kwargs):
+    # Owners are resolved before the row (and its m2m links) are gone
+    try:
+        record_changes(sender, [instance], 'delete')
+    except ObjectDoesNotExist:
+        pass
+
+
+def log_membership(sender, instance, action, pk_set, **kwargs):
+    """Users added to a room or notification receive it in their change feed"""
+    if action == 'post_add' and pk_set:
+        record_changes(type(instance), [instance], 'insert', user_ids=pk_set)
+    elif action == 'pre_remove' and pk_set:
+        record_changes(type(instance), [instance], 'delete', user_ids=pk_set)
+
+
+for model in TRACKED_MODELS:
+    post_save.connect(log_save, sender=model, dispatch_uid=f'changelog_save_{model._meta.label_lower}')
+    pre_delete.connect(log_delete, sender=model, dispatch_uid=f'changelog_delete_{model._meta.label_lower}')
+
+m2m_changed.connect(log_membership, sender=ChatRoom.participants.through)
+m2m_changed.connect(log_membership, sender=SystemNotification.target_users.through)
@@ -0,0 +1,204 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+
+from chat.models import ChatMessage, ChatRoom
+from dashboard.models import SystemNotification
+from focus.models import FocusSession
+from users.models import ParentChildRelation, User
+from .models import ChangeLogEntry
+
+
+@override_settings(SYNC_COMMIT_LAG=0)
+class DeltaSyncTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.parent = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        self.stranger = User.objects.create_user(username='stranger', password='pw-123456', user_type='child')
+        ParentChildRelation.objects.create(parent=self.parent, child=self.child)
+        self.client.force_authenticate(self.parent)
+        self.url = reverse('sync:changes')
+        self.token = self.client.get(self.url).data['sync_token']
+
+    def _session(self, user, **fields):
+        with self.captureOnCommitCallbacks(execute=True):
+            return FocusSession.objects.create(user=user, planned_duration=25, **fields)
+
+    def _changes(self, since=None, **query):
+        response = self.client.get(self.url, {'since': since or self.token, **query})
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data
+
+    def test_changes_of_the_user_and_their_children(self):
+        session = self._session(self.child, title='Homework')
+        self._session(self.stranger)
+
+        delta = self._changes()
+        self.assertEqual(
+            [(change['model'], change['id'], change['action']) for change in delta['changes']],
+            [('focus.focussession', session.id, 'insert')]
+        )
+        self.assertEqual(delta['changes'][0]['data']['title'], 'Homework')
+        self.assertFalse(delta['has_more'])
+        self.assertEqual(self._changes(since=delta['sync_token'])['changes'], [])
+
+    def test_children_rows_carry_only_exported_fields(self):
+        self._session(self.child, title='Homework', description='Private notes')
+
+        data = self._changes()['changes'][0]['data']
+        self.assertEqual(data['title'], 'Homework')
+        self.assertEqual(data['user'], self.child.id)
+        self.assertNotIn('description', data)
+
+        self.client.force_authenticate(self.child)
+        self.assertEqual(self._changes()['changes'][0]['data']['description'], 'Private notes')
+
+    def test_children_chats_stay_private(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            room = ChatRoom.objects.create(name='Friends', created_by=self.child)
+            room.participants.add(self.child, self.stranger)
+            message = ChatMessage.objects.create(room=room, sender=self.child, content='Hi')
+
+        self.assertEqual(self._changes()['changes'], [])
+
+        self.client.force_authenticate(self.child)
+        changes = self._changes()['changes']
+        self.assertEqual(
+            [(change['model'], change['id']) for change in changes],
+            [('chat.chatroom', room.id), ('chat.chatmessage', message.id)]
+        )
+        self.assertEqual(changes[1]['data']['content'], 'Hi')
+        self.assertNotIn('reply_to_id', changes[1]['data'])
+
+    def test_changes_are_collapsed_per_row(self):
+        updated = self._session(self.child)
+        with self.captureOnCommitCallbacks(execute=True):
+            updated.title = 'Reading'
+            updated.save()
+        removed = self._session(self.child)
+        with self.captureOnCommitCallbacks(execute=True):
+            removed.delete()
+
+        changes = self._changes()['changes']
+        self.assertEqual([(change['id'], change['action']) for change in changes], [(updated.id, 'insert')])
+        self.assertEqual(changes[0]['data']['title'], 'Reading')
+
+    def test_pages_follow_the_token(self):
+        sessions = [self._session(self.child) for _ in range(3)]
+
+        first = self._changes(limit=2)
+        self.assertTrue(first['has_more'])
+        second = self._changes(since=first['sync_token'], limit=2)
+        self.assertFalse(second['has_more'])
+        self.assertEqual(
+            [change['id'] for change in first['changes'] + second['changes']],
+            [session.id for session in sessions]
+        )
+
+    @override_settings(SYNC_COMMIT_LAG=5)
+    def test_entries_within_the_commit_lag_are_held_back(self):
+        older = self._session(self.child)
+        self._session(self.child)
+        ChangeLogEntry.objects.filter(object_id=older.id).update(created_at=timezone.now() - timedelta(seconds=10))
+
+        delta = self._changes()
+        self.assertEqual([change['id'] for change in delta['changes']], [older.id])
+        self.assertEqual(self._changes(since=delta['sync_token'])['changes'], [])
+
+    @override_settings(SYNC_COMMIT_LAG=5)
+    def test_feed_stops_before_a_lower_id_still_committing(self):
+        # The lower id committed last: a token past the newer entry would skip it
+        late = self._session(self.child)
+        early = self._session(self.child)
+        ChangeLogEntry.objects.filter(object_id=early.id).update(created_at=timezone.now() - timedelta(seconds=10))
+
+        delta = self._changes()
+        self.assertEqual(delta['changes'], [])
+        self.assertEqual(delta['sync_token'], self.token)
+
+        ChangeLogEntry.objects.filter(object_id=late.id).update(created_at=timezone.now() - timedelta(seconds=10))
+        self.assertEqual([change['id'] for change in self._changes()['changes']], [late.id, early.id])
+
+    def test_invalid_token(self):
+        self.assertEqual(self.client.get(self.url, {'since': 'abc'}).status_code, 400)
+
+    def test_pruning_expires_old_tokens(self):
+        old = [self._session(self.child) for _ in range(3)]
+        recent = self._session(self.child)
+        ChangeLogEntry.objects.filter(object_id__in=[s.id for s in old]).update(
+            created_at=timezone.now() - timedelta(days=40)
+        )
+
+        output = StringIO()
+        call_command('prune_changelog', '--days', '30', stdout=output)
+        self.assertIn('Deleted 2 change log entries', output.getvalue())
+
+        # The last pruned entry stays and marks the start of the log
+        remaining = ChangeLogEntry.objects.filter(model='focus.focussession')
+        self.assertEqual(sorted(remaining.values_list('object_id', flat=True)), [old[-1].id, recent.id])
+
+        response = self.client.get(self.url, {'since': self.token})
+        self.assertEqual(response.status_code, 410)
+
+        since = remaining.order_by('id').first().id - 1
+        changes = self._changes(since=since)['changes']
+        self.assertEqual([change['id'] for change in changes], [old[-1].id, recent.id])
+
+
+class BatchSyncTests(APITestCase):
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        ParentChildRelation.objects.create(parent=self.parent, child=self.child)
+        self.client.force_authenticate(self.child)
+
+    def _apply(self, *events):
+        response = self.client.post(reverse('sync:batch'), {
+            'device_id': 'tablet',
+            'events': [
+                {'id': str(i), 'type': event_type, 'timestamp': timezone.now().isoformat(), 'data': data}
+                for i, (event_type, data) in enumerate(events)
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200, response.data)
+        return response.data['results']
+
+    def test_choice_fields_are_validated(self):
+        results = self._apply(
+            ('break_requested', {'priority': 'extreme'}),
+            ('focus_start', {'session_type': 'nap'}),
+            ('break_requested', {'priority': 'high'}),
+        )
+        self.assertEqual([result['status'] for result in results], ['rejected', 'rejected', 'applied'])
+        self.assertIn('priority must be one of', results[0]['error'])
+        self.assertIn('session_type must be one of', results[1]['error'])
+
+        notification = SystemNotification.objects.get()
+        self.assertEqual(notification.priority, 'high')
+        self.assertEqual(list(notification.target_users.all()), [self.parent])
+        self.assertFalse(FocusSession.objects.exists())
+
+
+class ChangeLogTests(TransactionTestCase):
+    def test_changes_are_logged_after_commit(self):
+        child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        session = FocusSession.objects.create(user=child, planned_duration=25)
+
+        entry = ChangeLogEntry.objects.get(user=child, model='focus.focussession')
+        self.assertEqual((entry.object_id, entry.action), (session.pk, 'insert'))
+
+    def test_deleting_a_user_drops_their_entries(self):
+        child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        FocusSession.objects.create(user=child, planned_duration=25)
+
+        # The cascade logs deletes for a user that is gone by commit time
+        child.delete()
+        self.assertFalse(User.objects.filter(username='child').exists())
+        self.assertFalse(ChangeLogEntry.objects.exists())
@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = 'sync'
+
+urlpatterns = [
+    path('batch/', views.sync_batch, name='batch'),
+    path('changes/', views.changes, name='changes'),
+]
@@ -0,0 +1,62 @@
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+from utils.permissions import children_of
+from .delta import (
+    CHANGES_PAGE_SIZE, DEVICE_MODELS, TokenExpired, changes_since, latest_token, parse_token
+)
+from .events import apply_events
+from .serializers import SyncBatchSerializer
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def sync_batch(request):
+    """Apply a device's offline events and return changes since its last sync"""
+    serializer = SyncBatchSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    data = serializer.validated_data
+    
+    since = None
+    if data.get('since'):
+        try:
+            since = parse_token(data['since'])
+        except ValueError as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    results = apply_events(request.user, data['device_id'], data['events'])
+    
+    if since is None:
+        # First sync: the device starts from the current end of the log
+        delta = {'changes': [], 'sync_token': latest_token(), 'has_more': False}
+    else:
+        try:
+            delta = changes_since(request.user.id, since, models=DEVICE_MODELS)
+        except TokenExpired as e:
+            # The events are applied; the device reloads before syncing again
+            return Response({'results': results, 'error': str(e)}, status=status.HTTP_410_GONE)
+    
+    return Response({'results': results, **delta})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def changes(request):
+    """Inserts, updates and deletes since a sync token for the user and their children"""
+    since = request.GET.get('since')
+    if not since:
+        # Clients load full lists once and then follow the log from here
+        return Response({'changes': [], 'sync_token': latest_token(), 'has_more': False})
+    
+    try:
+        since = parse_token(since)
+        limit = min(max(int(request.GET.get('limit', CHANGES_PAGE_SIZE)), 1), CHANGES_PAGE_SIZE)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+    
+    try:
+        return Response(changes_since(
+            request.user.id, since, child_ids=list(children_of(request.user)), limit=limit
+        ))
+    except TokenExpired as e:
+        return Response({'error': str(e)}, status=status.HTTP_410_GONE)
@@ -1,14 +1,15 @@
 # User serializers
 from rest_framework import serializers
 from django.contrib.auth.password_validation import validate_password
+from utils.instrumentation import TimedSerializerMixin
 from .models import User, Profile, ParentChildRelation
 
-class ProfileSerializer(serializers.ModelSerializer):
+class ProfileSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Profile
         fields = ['avatar', 'bio', 'timezone', 'language', 'notifications_enabled']
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     profile = ProfileSerializer(read_only=True)
     password = serializers.CharField(write_only=True, validators=[validate_password])
     password_confirm = serializers.CharField(write_only=True)
@@ -35,7 +36,7 @@ class UserSerializer(serializers.ModelSerializer):
         Profile.objects.create(user=user)
         return user
 
-class UserUpdateSerializer(serializers.ModelSerializer):
+class UserUpdateSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     profile = ProfileSerializer()
     
     class Meta:
@@ -60,7 +61,7 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         
         return instance
 
-class ParentChildRelationSerializer(serializers.ModelSerializer):
+class ParentChildRelationSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     parent = UserSerializer(read_only=True)
     child = UserSerializer(read_only=True)
     parent_id = serializers.IntegerField(write_only=True)
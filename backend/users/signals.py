@@ -0,0 +1,15 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from utils.permissions import invalidate_relations
+from .models import ParentChildRelation
+
+
+@receiver(post_save, sender=ParentChildRelation)
+@receiver(post_delete, sender=ParentChildRelation)
+def invalidate_relation_cache(sender, instance, **kwargs):
+    """Drop the cached relationship graph of both ends of a relation"""
+    invalidate_relations(instance.parent_id, instance.child_id)
+    # Requests running during the transaction may have cached the old graph
+    transaction.on_commit(lambda: invalidate_relations(instance.parent_id, instance.child_id))
@@ -1,3 +1,53 @@
-from django.test import TestCase
+import shutil
+import tempfile
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+
+from utils.permissions import children_of, get_relations
+from .models import ParentChildRelation, User
+
+
+class RelationsCacheTests(APITestCase):
+    def setUp(self):
+        self.parent = User.objects.create_user(username='parent', password='pw-123456', user_type='parent')
+        self.child = User.objects.create_user(username='child', password='pw-123456', user_type='child')
+        self.relation = ParentChildRelation.objects.create(parent=self.parent, child=self.child)
+        self.client.force_authenticate(self.parent)
+        self.url = reverse('dashboard:export-history')
+
+    def _use_shared_cache(self):
+        location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, location)
+        settings = override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': location,
+        }})
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def _export_status(self):
+        return self.client.get(self.url, {'datasets': 'focus', 'child_id': self.child.id}).status_code
+
+    def test_revoked_link_denies_access(self):
+        self._use_shared_cache()
+        self.assertEqual(self._export_status(), 200)
+        self.assertIsNotNone(cache.get(f'relations:{self.parent.id}'))
+
+        self.relation.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.relation.save()
+        self.assertEqual(self._export_status(), 403)
+        self.assertEqual(children_of(self.parent), frozenset())
+
+    def test_process_local_cache_is_not_used(self):
+        # Another worker could not see the invalidation of a revoked link
+        self.assertEqual(get_relations(self.parent.id).children, {self.child.id})
+        self.assertIsNone(cache.get(f'relations:{self.parent.id}'))
+
+        self.relation.is_active = False
+        self.relation.save()
+        with self.assertNumQueries(1):
+            self.assertEqual(children_of(self.parent), frozenset())
@@ -3,6 +3,7 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.contrib.auth import authenticate
+from utils.permissions import children_of
 from .models import User, Profile, ParentChildRelation
 from .serializers import (
     UserSerializer, UserUpdateSerializer, 
@@ -21,7 +22,8 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [IsAuthenticated]
     
     def get_object(self):
-        return self.request.user
+        # The whole row: a user built from token claims defers most fields
+        return User.objects.select_related('profile').get(pk=self.request.user.pk)
 
 class UserListView(generics.ListAPIView):
     """List users (for admin/parent)"""
@@ -32,10 +34,7 @@ class UserListView(generics.ListAPIView):
         user = self.request.user
         if user.user_type == 'parent':
             # Parents can see their children
-            child_ids = ParentChildRelation.objects.filter(
-                parent=user, is_active=True
-            ).values_list('child_id', flat=True)
-            return User.objects.filter(id__in=child_ids)
+            return User.objects.filter(id__in=children_of(user))
         else:
             # Children can only see themselves
             return User.objects.filter(id=user.id)
@@ -59,7 +58,7 @@ class ParentChildRelationView(generics.ListCreateAPIView):
 @permission_classes([IsAuthenticated])
 def user_dashboard_data(request):
     """Get dashboard data for user"""
-    user = request.user
+    user = User.objects.select_related('profile').get(pk=request.user.pk)
     
     # Basic user info
     data = {
@@ -69,12 +68,8 @@ def user_dashboard_data(request):
     
     # Add specific data based on user type
     if user.user_type == 'parent':
-        children = ParentChildRelation.objects.filter(
-            parent=user, is_active=True
-        ).select_related('child')
-        data['children'] = [
-            UserSerializer(rel.child).data for rel in children
-        ]
+        children = User.objects.filter(id__in=children_of(user)).select_related('profile').order_by('id')
+        data['children'] = UserSerializer(children, many=True).data
     
     return Response(data)
 
@@ -0,0 +1,122 @@
+# Async variants of read-only dashboard views
+"""
+A dashboard is a set of independent query groups (functions of the user
+returning a dict) merged into one response. The sync views run the groups
+one after another; the async views run them at the same time.
+
+Django's async ORM methods (``aget``, ``acount``...) all run on one shared
+thread, so awaiting several of them together would still run the queries
+one by one. Each group therefore runs in its own worker thread, with that
+thread's own database connection. The threads come from a pool of
+ASYNC_QUERY_THREADS per worker process, which bounds the connections a
+worker opens; they follow the usual CONN_MAX_AGE / pool settings.
+
+Serve these views under ASGI (see ``dashboard_backend/asgi.py``); under WSGI
+each request would start an event loop of its own.
+"""
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .cache import request_cache_key
+from .conditional import is_not_modified, set_validators, user_etag
+
+_query_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_QUERY_THREADS, thread_name_prefix='dashboard-query'
+)
+
+
+def _in_worker_thread(group):
+    @functools.wraps(group)
+    def run(*args):
+        # Worker threads see no request signals, so expire connections here
+        close_old_connections()
+        try:
+            return group(*args)
+        finally:
+            close_old_connections()
+    return run
+
+
+def run_query_groups(groups, *args):
+    """Run query groups one after another and merge their results"""
+    results = {}
+    for group in groups:
+        results.update(group(*args))
+    return results
+
+
+async def gather_query_groups(groups, *args):
+    """Run independent query groups concurrently and merge their results"""
+    parts = await asyncio.gather(*(
+        sync_to_async(_in_worker_thread(group), thread_sensitive=False, executor=_query_executor)(*args)
+        for group in groups
+    ))
+    results = {}
+    for part in parts:
+        results.update(part)
+    return results
+
+
+class AsyncAPIView(APIView):
+    """
+    APIView with an async ``get``.
+
+    Authentication, permission and throttling checks run in a thread since
+    they may query the database; the handler itself is awaited.
+    """
+    view_is_async = True
+    http_method_names = ['get', 'head']
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            handler = getattr(self, request.method.lower(), None)
+            if request.method.lower() not in self.http_method_names or handler is None:
+                self.http_method_not_allowed(request, *args, **kwargs)
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncDashboardView(AsyncAPIView):
+    """
+    Async counterpart of a view decorated with ``@etag_per_user(cache_name)``
+    and ``@cache_per_user(cache_name)``; both share cache entries and ETags.
+    """
+    permission_classes = [IsAuthenticated]
+    cache_name = None
+    query_groups = ()
+
+    def build(self, results):
+        return results
+
+    async def get(self, request, *args, **kwargs):
+        etag = await sync_to_async(user_etag)(self.cache_name, request, kwargs)
+        if is_not_modified(request, etag):
+            return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+
+        key = await sync_to_async(request_cache_key)(self.cache_name, request, kwargs)
+        data = await cache.aget(key)
+        if data is None:
+            data = self.build(await gather_query_groups(self.query_groups, request.user))
+            await cache.aset(key, data, settings.USER_CACHE_TIMEOUT)
+        return set_validators(Response(data), etag)
@@ -0,0 +1,141 @@
+# Per-user caching of read endpoints
+"""
+Cached responses are keyed by user and by a per-user generation counter.
+Writes to a user's data bump the counter (see ``dashboard.signals``), which
+makes every cached entry of that user unreachable at once; old entries simply
+expire. Every key also carries the SHARED generation, bumped when catalog
+rows shown to all users (rewards, medications, ...) change. Recomputation of
+a missing entry is guarded by a short lock so that a burst of requests for the
+same key runs the expensive query only once.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from dashboard_backend.database import PROCESS_LOCAL_CACHES
+from . import metrics
+
+LOCK_TIMEOUT = 10  # Seconds a recompute may hold the lock
+LOCK_WAIT = 2  # Seconds to wait for another worker's result
+LOCK_POLL_INTERVAL = 0.05
+SHARED = 'shared'  # Generation of the catalogs every user sees
+
+lookups = metrics.Counter(
+    'user_cache_lookups_total', "Per-user cache lookups (wait: served another worker's result)",
+    ('result',),
+)
+
+
+def cache_is_shared():
+    """Whether every worker process sees the entries of the default cache"""
+    return settings.CACHES['default']['BACKEND'] not in PROCESS_LOCAL_CACHES
+
+
+def _generation_key(user_id):
+    return f'user_generation:{user_id}'
+
+
+def user_generations(user_ids):
+    """Current generation of each user, in the order given"""
+    keys = [_generation_key(user_id) for user_id in user_ids]
+    found = cache.get_many(keys)
+    missing = {key: 1 for key in keys if key not in found}
+    if missing:
+        # add() keeps a counter bumped concurrently
+        for key in missing:
+            cache.add(key, 1, None)
+        found.update(cache.get_many(list(missing)))
+    return [found.get(key, 1) for key in keys]
+
+
+def bump_generation(user_id):
+    """Invalidate every cached entry of a user, or of everyone for SHARED"""
+    try:
+        cache.incr(_generation_key(user_id))
+    except ValueError:
+        cache.set(_generation_key(user_id), 2, None)
+
+
+def user_cache_key(name, user_ids, *parts):
+    """Cache key for data of ``user_ids`` that changes with any of their generations"""
+    owners = [*user_ids, SHARED]
+    versions = '.'.join(
+        f'{owner}-{generation}'
+        for owner, generation in zip(owners, user_generations(owners))
+    )
+    suffix = hashlib.md5(repr(parts).encode()).hexdigest()
+    return f'user_cache:{name}:{versions}:{suffix}'
+
+
+def get_or_compute(key, compute, timeout=None):
+    """
+    Return the cached value of ``key`` or compute and store it.
+
+    Only one caller computes a missing value; the others wait up to LOCK_WAIT
+    seconds for its result before computing it themselves.
+    """
+    timeout = settings.USER_CACHE_TIMEOUT if timeout is None else timeout
+    value = cache.get(key)
+    if value is not None:
+        lookups.inc(result='hit')
+        return value
+
+    lock_key = f'{key}:lock'
+    if not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key)
+            if value is not None:
+                lookups.inc(result='wait')
+                return value
+        lookups.inc(result='miss')
+        return compute()
+
+    lookups.inc(result='miss')
+    try:
+        value = compute()
+        if value is not None:
+            cache.set(key, value, timeout)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+def request_cache_key(name, request, kwargs):
+    """Key of a per-user view response for the request's query string"""
+    params = sorted(request.query_params.lists())
+    return user_cache_key(name, [request.user.pk], params, sorted(kwargs.items()))
+
+
+def cache_per_user(name, timeout=None):
+    """
+    Cache successful responses of a function view per user and query string.
+
+    Apply below ``@api_view``/``@permission_classes`` so the view receives the
+    authenticated DRF request.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            key = request_cache_key(name, request, kwargs)
+
+            rejected = []
+
+            def compute():
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    rejected.append(response)
+                    return None
+                return response.data
+
+            data = get_or_compute(key, compute, timeout)
+            if rejected:
+                return rejected[0]
+            return Response(data)
+        return wrapper
+    return decorator
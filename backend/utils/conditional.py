@@ -0,0 +1,140 @@
+# Conditional GET (ETag / Last-Modified) for DRF views
+"""
+Validators are computed before the expensive part of a view runs:
+
+- list/detail views use ``max(updated_at)`` and the row count of their
+  queryset (one aggregate query) combined with the user's cache generation,
+  which also covers related rows and models without ``updated_at``;
+- per-user dashboards use the cache generation alone, within the same time
+  window as their cached data (``USER_CACHE_TIMEOUT``).
+
+A request whose If-None-Match (or If-Modified-Since) matches gets an empty
+304 response.
+"""
+import functools
+import hashlib
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import SHARED, user_generations
+
+
+def make_etag(*parts):
+    return '"%s"' % hashlib.md5(repr(parts).encode()).hexdigest()
+
+
+def _query_params(request):
+    return sorted(request.query_params.lists())
+
+
+def _generation(request):
+    user_id = request.user.pk
+    return tuple(user_generations([user_id, SHARED])) if user_id is not None else 0
+
+
+def is_not_modified(request, etag, last_modified=None):
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match:
+        etags = parse_etags(if_none_match)
+        return '*' in etags or etag in etags or etag.strip('"') in etags
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since is not None and last_modified is not None:
+        return int(last_modified.timestamp()) <= if_modified_since
+    return False
+
+
+def set_validators(response, etag, last_modified=None):
+    """Add validators to a response and make clients revalidate privately"""
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    patch_vary_headers(response, ('Authorization', 'Cookie'))
+    return response
+
+
+def conditional_response(request, etag, last_modified, render):
+    """Return 304 when the client's copy is current, otherwise ``render()``"""
+    if is_not_modified(request, etag, last_modified):
+        return set_validators(Response(status=status.HTTP_304_NOT_MODIFIED), etag, last_modified)
+
+    response = render()
+    if response.status_code == status.HTTP_200_OK:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified for generic list and retrieve views.
+
+    ``last_modified_field`` names the timestamp aggregated over the view's
+    queryset; set it to None for models without one.
+    """
+    last_modified_field = 'updated_at'
+
+    def get_validators(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+
+        model_fields = {field.name for field in queryset.model._meta.get_fields()}
+        field = self.last_modified_field if self.last_modified_field in model_fields else None
+
+        aggregates = {'count': Count('pk')}
+        if field:
+            aggregates['last_modified'] = Max(field)
+        state = queryset.order_by().aggregate(**aggregates)
+        last_modified = state.get('last_modified')
+
+        etag = make_etag(
+            type(self).__name__, dict(self.kwargs), _query_params(self.request),
+            state['count'], last_modified, _generation(self.request)
+        )
+        return etag, last_modified
+
+    def list(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        return conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators()
+        return conditional_response(
+            request, etag, last_modified, lambda: super(ConditionalGetMixin, self).retrieve(request, *args, **kwargs)
+        )
+
+
+def user_etag(name, request, kwargs):
+    """ETag of a per-user view from the user's cache generation"""
+    window = int(time.time() // max(settings.USER_CACHE_TIMEOUT, 1))
+    return make_etag(
+        name, sorted(kwargs.items()), _query_params(request), _generation(request), window
+    )
+
+
+def etag_per_user(name):
+    """
+    ETag for per-user function views from the user's cache generation.
+
+    Apply above ``@cache_per_user`` so a matching request skips the cache
+    lookup as well as the view.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            etag = user_etag(name, request, kwargs)
+            return conditional_response(
+                request, etag, None, lambda: view(request, *args, **kwargs)
+            )
+        return wrapper
+    return decorator
@@ -0,0 +1,97 @@
+# Read-replica routing for analytics reads
+"""
+Heavy statistics reads can be served by a read replica (the ``replica``
+database alias). Routing is opt-in: only code running inside
+``replica_reads()`` (or a view decorated with ``@read_from_replica``, which
+also covers the serializers it runs) reads from the replica; everything else,
+and every write, uses ``default``.
+
+Read-your-writes: when a user's data is written, the user is pinned to the
+primary for REPLICA_PIN_SECONDS (see ``dashboard.signals``), which should
+exceed the replica's usual lag. Analytics reads for a pinned user go to the
+primary, so a user never sees (or caches) numbers older than their own
+last write. Reads inside a transaction on the primary also stay there.
+
+Pins are stored in the default cache, which therefore has to be shared by
+all workers; settings refuse a per-process cache when a replica is used.
+Without a ``replica`` database configured, or with REPLICA_READS off,
+everything uses ``default``.
+"""
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from .permissions import children_of
+
+REPLICA_DB_ALIAS = 'replica'
+
+_replica_reads = ContextVar('replica_reads', default=False)
+
+
+def replica_configured():
+    return settings.REPLICA_READS and REPLICA_DB_ALIAS in settings.DATABASES
+
+
+def _pin_key(user_id):
+    return f'replica_pin:{user_id}'
+
+
+def pin_primary(user_id):
+    """Send the user's analytics reads to the primary for a while"""
+    if replica_configured():
+        cache.set(_pin_key(user_id), 1, settings.REPLICA_PIN_SECONDS)
+
+
+def is_pinned(user_ids):
+    return bool(cache.get_many([_pin_key(user_id) for user_id in user_ids]))
+
+
+@contextmanager
+def replica_reads(user_ids=()):
+    """Route reads in this block to the replica unless a user is pinned"""
+    use_replica = replica_configured() and not is_pinned(user_ids)
+    token = _replica_reads.set(use_replica)
+    try:
+        yield use_replica
+    finally:
+        _replica_reads.reset(token)
+
+
+def read_from_replica(view):
+    """
+    Serve a function view's reads from the replica.
+
+    The request's user and their children must not be pinned; apply below
+    ``@cache_per_user`` so cached responses skip the check.
+    """
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        user_ids = [request.user.pk]
+        if getattr(request.user, 'user_type', None) == 'parent':
+            user_ids += children_of(request.user)
+        with replica_reads(user_ids):
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not _replica_reads.get():
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # The replica holds the same rows as the primary
+        databases = {DEFAULT_DB_ALIAS, REPLICA_DB_ALIAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
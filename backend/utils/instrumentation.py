@@ -0,0 +1,217 @@
+# Per-request query and timing instrumentation
+"""
+RequestMetricsMiddleware measures every request:
+
+- SQL queries and their total time, on every database alias, including
+  queries run in worker threads by async views (the current request is
+  tracked in a ContextVar, which ``sync_to_async`` carries into threads)
+- time spent building serializer output, for serializers that mix in
+  TimedSerializerMixin (all of the project's serializers do)
+- total time and response size
+
+It adds a ``Server-Timing`` header (shown in the browser's network panel)
+and, with the ``request_metrics`` logger at INFO (REQUEST_METRICS_LOG_LEVEL,
+WARNING by default), logs one JSON line per request. ``max_repeats`` in that
+line is the largest number of times one SQL statement ran, so N+1 endpoints
+stand out. Requests slower than REQUEST_SLOW_MS are sampled at
+REQUEST_SLOW_SAMPLE_RATE and logged as a warning with their full query list.
+
+Per query the cost is one extra function call and a list append, so the
+middleware is meant to stay on in production. Queries a streaming response
+runs while its body is sent are not included.
+
+Latency, status and query counts per view are also exported at /metrics
+(see ``utils.metrics``).
+"""
+import json
+import logging
+import random
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.functional import SimpleLazyObject, empty
+
+from . import metrics
+
+logger = logging.getLogger('request_metrics')
+
+request_duration = metrics.Histogram(
+    'http_request_duration_seconds', 'Time to build the response, by view', ('view', 'method')
+)
+request_total = metrics.Counter(
+    'http_requests_total', 'Responses by view and status code', ('view', 'method', 'status')
+)
+request_queries = metrics.Histogram(
+    'http_request_queries', 'SQL queries run per request, by view', ('view',),
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200),
+)
+
+_current = ContextVar('request_metrics', default=None)
+# Per thread of the request, async views serialize in several at once
+_serializer_depth = ContextVar('serializer_depth', default=0)
+
+
+class RequestStats:
+    """Measurements of the request being handled"""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = []  # (sql, alias, milliseconds)
+        self.serializer_ms = 0.0
+
+    @property
+    def db_ms(self):
+        return sum(query[2] for query in self.queries)
+
+    def max_repeats(self):
+        if not self.queries:
+            return 0
+        return max(Counter(query[0] for query in self.queries).values())
+
+
+def current_stats():
+    """RequestStats of the current request, or None outside a request"""
+    return _current.get()
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries.append((sql, context['connection'].alias, (time.perf_counter() - start) * 1000))
+
+
+def _instrument_connection(connection, **kwargs):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+class TimedSerializerMixin:
+    """
+    Adds the time spent in ``to_representation`` to the request's
+    serializer_ms. Only the outermost serializer is timed, nested ones are
+    part of it; a ``many=True`` list times each item, so the query that loads
+    the list counts as database time.
+    """
+
+    def to_representation(self, instance):
+        stats = _current.get()
+        if stats is None or _serializer_depth.get():
+            return super().to_representation(instance)
+        depth = _serializer_depth.set(1)
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            _serializer_depth.reset(depth)
+            stats.serializer_ms += (time.perf_counter() - start) * 1000
+
+
+def _user_id(request):
+    user = getattr(request, 'user', None)
+    # Don't load a session user the request itself never looked at
+    if user is None or (isinstance(user, SimpleLazyObject) and user._wrapped is empty):
+        return None
+    return user.pk if user.is_authenticated else None
+
+
+connection_created.connect(_instrument_connection, dispatch_uid='request_metrics_queries')
+
+
+class RequestMetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _start(self):
+        # Connections opened before this module was loaded miss the signal
+        for connection in connections.all():
+            _instrument_connection(connection)
+        stats = RequestStats()
+        return stats, _current.set(stats)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats, token = self._start()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats, token = self._start()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._finish(request, response, stats)
+        return response
+
+    def _finish(self, request, response, stats):
+        total_ms = (time.perf_counter() - stats.start) * 1000
+        db_ms = stats.db_ms
+        size = None if response.streaming else len(response.content)
+
+        if settings.REQUEST_SERVER_TIMING:
+            response['Server-Timing'] = (
+                f'db;dur={db_ms:.1f};desc="{len(stats.queries)} queries", '
+                f'serialize;dur={stats.serializer_ms:.1f}, '
+                f'app;dur={total_ms:.1f}'
+            )
+
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else None
+        # Unresolved paths share one label, they are unbounded
+        view_label = view or '<unresolved>'
+        request_duration.observe(total_ms / 1000, view=view_label, method=request.method)
+        request_total.inc(view=view_label, method=request.method, status=response.status_code)
+        request_queries.observe(len(stats.queries), view=view_label)
+        metrics.maybe_flush()
+
+        if not logger.isEnabledFor(logging.INFO) and total_ms < settings.REQUEST_SLOW_MS:
+            return
+        line = {
+            'method': request.method,
+            'path': request.path,
+            'view': view,
+            'status': response.status_code,
+            'user_id': _user_id(request),
+            'duration_ms': round(total_ms, 2),
+            'queries': len(stats.queries),
+            'max_repeats': stats.max_repeats(),
+            'db_ms': round(db_ms, 2),
+            'serializer_ms': round(stats.serializer_ms, 2),
+            'response_bytes': size,
+        }
+        logger.info(json.dumps(line))
+
+        if total_ms >= settings.REQUEST_SLOW_MS and random.random() < settings.REQUEST_SLOW_SAMPLE_RATE:
+            repeated = Counter(query[0] for query in stats.queries)
+            logger.warning(json.dumps({
+                **line,
+                'slow': True,
+                'repeated_queries': [
+                    {'sql': sql, 'count': count} for sql, count in repeated.most_common() if count > 1
+                ],
+                'query_list': [
+                    {'sql': sql, 'db': alias, 'ms': round(ms, 2)}
+                    for sql, alias, ms in stats.queries[:settings.REQUEST_SLOW_MAX_QUERIES]
+                ],
+            }))
@@ -0,0 +1,260 @@
+# In-process metrics in the Prometheus text format
+"""
+Counters and histograms are updated by the code they measure (request
+latency in ``utils.instrumentation``, AI completions in ``chat.signals``,
+cache lookups). Collectors registered with ``register_collector`` compute
+gauges when /metrics is scraped, e.g. from the database; their output is
+cached for METRICS_COLLECT_SECONDS so frequent scrapes stay cheap.
+
+Each worker process keeps its own values. With several workers (gunicorn,
+uvicorn --workers) point METRICS_DIR at a directory all of them can write:
+every process then stores its values there as ``<pid>.json`` at most every
+METRICS_FLUSH_INTERVAL seconds, and /metrics adds up the files of all
+processes, including ones that have exited, so counters keep growing across
+workers. Empty the directory when deploying, as with prometheus_client's
+multiprocess mode. Without METRICS_DIR a scrape only sees the worker that
+answers it.
+"""
+import atexit
+import bisect
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COLLECTED_CACHE_KEY = 'metrics:collected'
+
+REGISTRY = {}
+_collectors = []
+_flush_lock = threading.Lock()
+_last_flush = time.monotonic()
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labels=(), register=True):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._values = {}  # Label values -> value
+        self._lock = threading.Lock()
+        if register:
+            REGISTRY[name] = self
+
+    def _key(self, labels):
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def meta(self):
+        return {'kind': self.kind, 'documentation': self.documentation, 'labels': self.labels}
+
+    def values(self):
+        with self._lock:
+            return dict(self._values)
+
+
+class Counter(Metric):
+    """
+    A value that only goes up. ``function`` may instead return the current
+    values ({label values: value}) of a count kept elsewhere.
+    """
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=(), function=None, register=True):
+        super().__init__(name, documentation, labels, register)
+        self.function = function
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def values(self):
+        if self.function is not None:
+            return dict(self.function())
+        return super().values()
+
+
+class Gauge(Metric):
+    """A current value, meant for collectors"""
+    kind = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DEFAULT_BUCKETS, register=True):
+        super().__init__(name, documentation, labels, register)
+        self.buckets = tuple(buckets)
+
+    def meta(self):
+        return {**super().meta(), 'buckets': self.buckets}
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._values.get(key)
+            if counts is None:
+                # Observations per bucket, then above the last bucket, then their sum
+                counts = self._values[key] = [0] * (len(self.buckets) + 2)
+            counts[index] += 1
+            counts[-1] += value
+
+    def set(self, cumulative, count, total, **labels):
+        """Replace the values with counts already computed per bucket (``le``)"""
+        counts = [cumulative[0]]
+        counts += [high - low for low, high in zip(cumulative, cumulative[1:])]
+        counts += [count - cumulative[-1], total]
+        with self._lock:
+            self._values[self._key(labels)] = counts
+
+    def values(self):
+        with self._lock:
+            return {key: list(counts) for key, counts in self._values.items()}
+
+
+def register_collector(collect):
+    """Add a function returning metrics (usually gauges) to compute at scrape time"""
+    _collectors.append(collect)
+    return collect
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _number(value):
+    if value == math.inf:
+        return '+Inf'
+    return str(value) if isinstance(value, int) else repr(float(value))
+
+
+def _labels(names, values, extra=()):
+    pairs = [*zip(names, values), *extra]
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def render(name, meta, values):
+    """One metric in the Prometheus text format"""
+    lines = [f"# HELP {name} {meta['documentation']}", f"# TYPE {name} {meta['kind']}"]
+    names = meta['labels']
+    for key, value in sorted(values.items()):
+        labels = _labels(names, key)
+        if meta['kind'] != 'histogram':
+            lines.append(f'{name}{labels} {_number(value)}')
+            continue
+        cumulative = 0
+        for bound, count in zip([*meta['buckets'], math.inf], value):
+            cumulative += count
+            lines.append(f"{name}_bucket{_labels(names, key, [('le', _number(bound))])} {cumulative}")
+        lines.append(f'{name}_sum{labels} {_number(value[-1])}')
+        lines.append(f'{name}_count{labels} {cumulative}')
+    return '\n'.join(lines) + '\n'
+
+
+def snapshot():
+    """Values of this process as {name: (meta, values)}"""
+    return {name: (metric.meta(), metric.values()) for name, metric in list(REGISTRY.items())}
+
+
+def flush():
+    """Write this process's values to METRICS_DIR"""
+    global _last_flush
+    directory = settings.METRICS_DIR
+    data = {
+        name: {'meta': meta, 'values': [[list(key), value] for key, value in values.items()]}
+        for name, (meta, values) in snapshot().items()
+    }
+    os.makedirs(directory, exist_ok=True)
+    # Readers must never see a half-written file
+    fd, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    with os.fdopen(fd, 'w') as file:
+        json.dump(data, file)
+    os.replace(temporary, os.path.join(directory, f'{os.getpid()}.json'))
+    _last_flush = time.monotonic()
+
+
+def maybe_flush():
+    """Flush when METRICS_DIR is set and the last flush is old enough"""
+    if not settings.METRICS_DIR or time.monotonic() - _last_flush < settings.METRICS_FLUSH_INTERVAL:
+        return
+    if _flush_lock.acquire(blocking=False):
+        try:
+            flush()
+        finally:
+            _flush_lock.release()
+
+
+def _load(path):
+    try:
+        with open(path) as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    return {
+        name: (metric['meta'], {tuple(key): value for key, value in metric['values']})
+        for name, metric in data.items()
+    }
+
+
+def _merge(into, values_by_name):
+    for name, (meta, values) in values_by_name.items():
+        merged = into.setdefault(name, (meta, {}))[1]
+        for key, value in values.items():
+            if key not in merged:
+                merged[key] = value
+            elif meta['kind'] == 'histogram':
+                merged[key] = [a + b for a, b in zip(merged[key], value)]
+            else:
+                merged[key] += value
+
+
+def collect_processes():
+    """Values of every worker process, added up"""
+    if not settings.METRICS_DIR:
+        return snapshot()
+    with _flush_lock:
+        flush()
+    merged = {}
+    for entry in os.scandir(settings.METRICS_DIR):
+        if entry.name.endswith('.json'):
+            _merge(merged, _load(entry.path))
+    return merged
+
+
+def _collected():
+    text = cache.get(COLLECTED_CACHE_KEY)
+    if text is None:
+        text = ''.join(
+            render(metric.name, metric.meta(), metric.values())
+            for collect in _collectors for metric in collect()
+        )
+        cache.set(COLLECTED_CACHE_KEY, text, settings.METRICS_COLLECT_SECONDS)
+    return text
+
+
+def generate_latest():
+    """The /metrics response body"""
+    parts = [render(name, meta, values) for name, (meta, values) in sorted(collect_processes().items())]
+    parts.append(_collected())
+    return ''.join(parts)
+
+
+@atexit.register
+def _flush_at_exit():
+    if settings.configured and settings.METRICS_DIR:
+        flush()
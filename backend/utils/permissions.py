@@ -1 +1,118 @@
-# Permission classes for Django REST Framework
\ No newline at end of file
+# Permission classes for Django REST Framework
+"""
+Parent/child scoping backed by a cached relationship graph.
+
+Each user's active children and parents are cached as frozen id sets, so
+scoping checks are set lookups instead of a ParentChildRelation query per
+request. Entries are dropped whenever a relation is saved or deleted (see
+``users.signals``).
+
+A revoked relation must stop granting access on every worker at once, so the
+graph is only cached when the default cache is shared between processes. With
+a process-local cache (locmem) every check queries the relations.
+"""
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db.models import Q
+from rest_framework.exceptions import APIException
+from rest_framework.permissions import BasePermission
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
+
+from users.models import ParentChildRelation
+from .cache import cache_is_shared
+
+# Bounds a stale graph cached by a request that read the relations just
+# before a revocation committed
+RELATIONS_CACHE_TIMEOUT = 60  # Seconds
+
+
+class Relations(NamedTuple):
+    children: frozenset
+    parents: frozenset
+
+
+def _relations_key(user_id):
+    return f'relations:{user_id}'
+
+
+def get_relations(user_id):
+    """Active children and parents of a user"""
+    shared = cache_is_shared()
+    key = _relations_key(user_id)
+    relations = cache.get(key) if shared else None
+    if relations is not None:
+        return Relations(*relations)
+
+    rows = ParentChildRelation.objects.filter(
+        Q(parent_id=user_id) | Q(child_id=user_id), is_active=True
+    ).values_list('parent_id', 'child_id')
+    children, parents = set(), set()
+    for parent_id, child_id in rows:
+        if parent_id == user_id:
+            children.add(child_id)
+        if child_id == user_id:
+            parents.add(parent_id)
+    relations = Relations(frozenset(children), frozenset(parents))
+    if shared:
+        cache.set(key, tuple(relations), RELATIONS_CACHE_TIMEOUT)
+    return relations
+
+
+def invalidate_relations(*user_ids):
+    cache.delete_many([_relations_key(user_id) for user_id in user_ids])
+
+
+def children_of(user):
+    return get_relations(user.pk).children
+
+
+def parents_of(user):
+    return get_relations(user.pk).parents
+
+
+def is_parent_of(user, child_id):
+    try:
+        return int(child_id) in children_of(user)
+    except (TypeError, ValueError):
+        return False
+
+
+def staff_user(request):
+    """
+    The staff user making a plain Django request, authenticated the way API
+    views do (session or token), for code running outside DRF views
+    """
+    drf_request = Request(request)
+    for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+        try:
+            result = authentication_class().authenticate(drf_request)
+        except APIException:
+            return None
+        if result is not None:
+            return result[0] if result[0].is_staff else None
+    return None
+
+
+def can_access_user(user, user_id):
+    """Users may access their own data and that of their active children"""
+    return str(user_id) == str(user.pk) or is_parent_of(user, user_id)
+
+
+class IsSelfOrParent(BasePermission):
+    """
+    Allows access to the ``child_id`` named in the URL, query string or body
+    when it is the requesting user or one of their active children.
+    """
+    message = 'Child not found or access denied'
+
+    def has_permission(self, request, view):
+        child_id = (
+            view.kwargs.get('child_id')
+            or request.query_params.get('child_id')
+            or (request.data.get('child_id') if hasattr(request.data, 'get') else None)
+        )
+        if not child_id:
+            return True
+        return bool(request.user and request.user.is_authenticated) and can_access_user(request.user, child_id)
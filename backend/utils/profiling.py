@@ -0,0 +1,297 @@
+# On-demand profiling for staff users
+"""
+Two ways to see where a slow endpoint spends its time, both off unless
+PROFILING_ENABLED is set:
+
+- ProfileRequestMiddleware runs a single request under cProfile when a
+  staff user sends ``X-Profile: 1`` (or ``?_profile=1``). The response
+  carries the profile's URL in ``X-Profile-Url``.
+- ``start_sampling(seconds)`` samples the stacks of every thread of the
+  current worker process every PROFILING_SAMPLE_INTERVAL seconds, which
+  costs little enough to run against live traffic.
+
+Profiles are written to ``profiles/`` in the default storage (MEDIA_ROOT)
+as folded stacks (``.folded``, one ``frame;frame;frame value`` line per
+stack), which flamegraph.pl and speedscope read. Request profiles also
+keep the raw cProfile stats (``.prof``) for ``pstats`` or snakeviz. File
+names contain a random part since media files may be served publicly.
+"""
+import cProfile
+import functools
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from utils.permissions import staff_user
+
+PROFILE_DIR = 'profiles'
+# Call paths below this share of the request's time are left out
+MIN_SHARE = 0.001
+MAX_DEPTH = 200
+
+_sampler_lock = threading.Lock()
+_sampler = None
+
+
+@functools.lru_cache(maxsize=8192)
+def _label(filename, lineno, name):
+    if filename == '~':  # Built-in function
+        return name
+    for root in sorted(sys.path, key=len, reverse=True):
+        if root and filename.startswith(root + os.sep):
+            filename = filename[len(root) + 1:]
+            break
+    return f'{name} ({filename}:{lineno})'
+
+
+def _save(name, content):
+    path = default_storage.save(f'{PROFILE_DIR}/{name}', ContentFile(content))
+    return default_storage.url(path)
+
+
+def _profile_name(kind):
+    return f"{timezone.now():%Y%m%d-%H%M%S}-{kind}-{uuid.uuid4().hex[:12]}"
+
+
+def _cycles(entries, callees):
+    """
+    Map each function to the recursion cycle it belongs to (Tarjan's
+    strongly connected components), a tuple of functions ordered by
+    cumulative time.
+    """
+    index, low, on_stack, stack, cycle_of = {}, {}, set(), [], {}
+    for start in entries:
+        if start in index:
+            continue
+        # Iterative, call graphs can be deeper than the recursion limit
+        work = [(start, iter(callees.get(start, ())))]
+        index[start] = low[start] = len(index)
+        stack.append(start)
+        on_stack.add(start)
+        while work:
+            func, children = work[-1]
+            for child in children:
+                if child not in index:
+                    index[child] = low[child] = len(index)
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(callees.get(child, ()))))
+                    break
+                if child in on_stack:
+                    low[func] = min(low[func], index[child])
+            else:
+                work.pop()
+                if work:
+                    low[work[-1][0]] = min(low[work[-1][0]], low[func])
+                if low[func] == index[func]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        members.append(member)
+                        if member == func:
+                            break
+                    cycle = tuple(sorted(members, key=lambda f: entries[f][3], reverse=True))
+                    for member in members:
+                        cycle_of[member] = cycle
+    return cycle_of
+
+
+def folded_from_stats(stats):
+    """
+    Folded stacks (values in microseconds) from ``pstats.Stats``.
+
+    cProfile only records caller -> callee edges, so stacks are rebuilt
+    from them: a function's time is split between its call paths in
+    proportion to the time of each edge. Like gprof, functions that call
+    each other recursively (Django's middleware chain does) are merged into
+    one frame, named after the outermost of them.
+    """
+    entries = stats.stats
+    callees = {}
+    for func, (_cc, _nc, _tt, _ct, callers) in entries.items():
+        for caller in callers:
+            if caller in entries:
+                callees.setdefault(caller, {})[func] = None
+    cycle_of = _cycles(entries, callees)
+
+    # The call graph between cycles, which has no loops left
+    own_time, total_time, edges, called = Counter(), Counter(), {}, set()
+    for func, (_cc, _nc, tt, ct, callers) in entries.items():
+        cycle = cycle_of[func]
+        own_time[cycle] += tt
+        total_time[cycle] = max(total_time[cycle], ct)
+        for caller, edge in callers.items():
+            if caller in entries and cycle_of[caller] != cycle:
+                edges.setdefault(cycle_of[caller], Counter())[cycle] += edge[3]
+                called.add(cycle)
+
+    total = sum(own_time.values()) or 1
+    folded = Counter()
+
+    def label(cycle):
+        if len(cycle) == 1:
+            return _label(*cycle[0])
+        return f'{_label(*cycle[0])} [+{len(cycle) - 1} recursive]'
+
+    def walk(cycle, labels, inclusive):
+        labels = labels + (label(cycle),)
+        share = min(inclusive / total_time[cycle], 1) if total_time[cycle] else 0
+        own = min(own_time[cycle] * share, inclusive)
+        folded[';'.join(labels)] += own
+        children = edges.get(cycle, {})
+        if len(labels) >= MAX_DEPTH or not children:
+            return
+        # Edge times of recursive calls overlap, keep children within the parent
+        scale = share * min(1, (inclusive - own) / (sum(children.values()) * share or 1))
+        for callee, edge_time in children.items():
+            if edge_time * scale / total >= MIN_SHARE:
+                walk(callee, labels, edge_time * scale)
+
+    for cycle in set(cycle_of.values()) - called:
+        if total_time[cycle] / total >= MIN_SHARE:
+            walk(cycle, (), total_time[cycle])
+    return ''.join(
+        f'{path} {round(seconds * 1e6)}\n'
+        for path, seconds in sorted(folded.items()) if round(seconds * 1e6) > 0
+    )
+
+
+def save_request_profile(profiler, request):
+    """Store a request's cProfile output and return the folded profile's URL"""
+    stats = pstats.Stats(profiler, stream=io.StringIO())
+    match = request.resolver_match
+    name = _profile_name(f"request-{match.url_name if match else 'unknown'}")
+    # The format Stats.dump_stats writes, which only accepts a file path
+    _save(f'{name}.prof', marshal.dumps(stats.stats))
+    return _save(f'{name}.folded', folded_from_stats(stats).encode())
+
+
+def wants_profile(request):
+    return settings.PROFILING_ENABLED and (
+        request.headers.get('X-Profile') == '1' or request.GET.get('_profile') == '1'
+    )
+
+
+class ProfileRequestMiddleware:
+    """Profile requests flagged with ``X-Profile: 1`` from staff users"""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        if not wants_profile(request) or staff_user(request) is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+        response['X-Profile-Url'] = save_request_profile(profiler, request)
+        return response
+
+    async def __acall__(self, request):
+        if not wants_profile(request) or await sync_to_async(staff_user)(request) is None:
+            return await self.get_response(request)
+
+        # Only covers the event loop thread, not the view's worker threads
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.disable()
+        response['X-Profile-Url'] = await sync_to_async(save_request_profile)(profiler, request)
+        return response
+
+
+class Sampler(threading.Thread):
+    """Samples the stacks of all other threads of this process"""
+
+    def __init__(self, seconds, interval):
+        super().__init__(name='profile-sampler', daemon=True)
+        self.seconds = seconds
+        self.interval = interval
+        self.name_on_disk = _profile_name(f'sample-{os.getpid()}') + '.folded'
+        self.samples = Counter()
+
+    def _stack(self, frame):
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(_label(code.co_filename, code.co_firstlineno, code.co_name))
+            frame = frame.f_back
+        return ';'.join(reversed(stack))
+
+    def run(self):
+        global _sampler
+        own_id = threading.get_ident()
+        names = {}
+        deadline = time.monotonic() + self.seconds
+        try:
+            while time.monotonic() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id:
+                        continue
+                    if thread_id not in names:
+                        names = {thread.ident: thread.name for thread in threading.enumerate()}
+                    thread_name = names.get(thread_id, str(thread_id))
+                    self.samples[f'{thread_name};{self._stack(frame)}'] += 1
+                time.sleep(self.interval)
+            _save(self.name_on_disk, ''.join(
+                f'{stack} {count}\n' for stack, count in sorted(self.samples.items())
+            ).encode())
+        finally:
+            with _sampler_lock:
+                _sampler = None
+
+
+def start_sampling(seconds):
+    """
+    Sample this worker for ``seconds`` in the background and return the
+    name the profile will be saved as, or None when a sampler is running.
+    """
+    global _sampler
+    with _sampler_lock:
+        if _sampler is not None:
+            return None
+        _sampler = Sampler(seconds, settings.PROFILING_SAMPLE_INTERVAL)
+        _sampler.start()
+        return f'{PROFILE_DIR}/{_sampler.name_on_disk}'
+
+
+def list_profiles():
+    """Stored profiles, newest first"""
+    try:
+        _dirs, files = default_storage.listdir(PROFILE_DIR)
+    except FileNotFoundError:
+        return []
+    return [
+        {
+            'name': name,
+            'size': default_storage.size(f'{PROFILE_DIR}/{name}'),
+            'url': default_storage.url(f'{PROFILE_DIR}/{name}'),
+        }
+        for name in sorted(files, reverse=True)
+    ]
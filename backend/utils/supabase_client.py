@@ -1,12 +1,123 @@
 # Supabase client configuration
-from supabase import create_client, Client
+"""
+One Supabase client per process (and one async client per event loop),
+created on first use. The client keeps its HTTP sessions, so later calls
+reuse open connections instead of creating a client, and a TLS handshake,
+each time.
+
+The shared client never stores or refreshes an auth session: it acts with
+the project API key only, so state from one caller cannot leak into another.
+
+Tests (or SUPABASE_CLIENT=fake) use the in-memory FakeSupabaseClient from
+``utils.supabase_fake`` instead of the network:
+
+    with override_supabase_client(FakeSupabaseClient({'tasks': []})):
+        ...
+"""
+import asyncio
+import threading
+import weakref
+from contextlib import contextmanager
+
 from decouple import config
+from supabase import AsyncClient, Client, acreate_client, create_client
+from supabase.lib.client_options import AsyncClientOptions, SyncClientOptions
+
+_lock = threading.Lock()
+_client = None
+_async_clients = weakref.WeakKeyDictionary()  # Event loop -> AsyncClient
+_override = None
+_async_override = None
+
+
+def _options(options_class):
+    return options_class(
+        auto_refresh_token=False,
+        persist_session=False,
+        postgrest_client_timeout=config('SUPABASE_TIMEOUT', default=10, cast=float),
+        storage_client_timeout=config('SUPABASE_STORAGE_TIMEOUT', default=20, cast=float),
+        function_client_timeout=config('SUPABASE_FUNCTION_TIMEOUT', default=5, cast=float),
+    )
+
+
+def _use_fake():
+    return config('SUPABASE_CLIENT', default='supabase') == 'fake'
+
 
 def get_supabase_client() -> Client:
     """
-    Initialize and return Supabase client
+    Return the shared Supabase client of this process
+    """
+    global _client
+    if _override is not None:
+        return _override
+    if _client is None:
+        with _lock:
+            if _client is None:
+                if _use_fake():
+                    from .supabase_fake import FakeSupabaseClient
+                    _client = FakeSupabaseClient()
+                else:
+                    _client = create_client(
+                        config('SUPABASE_PROJECT_URL'),
+                        config('SUPABASE_API_KEY'),
+                        options=_options(SyncClientOptions)
+                    )
+    return _client
+
+
+async def get_async_supabase_client() -> AsyncClient:
+    """
+    Return the shared async Supabase client of the running event loop
+    """
+    if _async_override is not None:
+        return _async_override
+    if _use_fake():
+        return get_supabase_client().as_async()
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = await acreate_client(
+            config('SUPABASE_PROJECT_URL'),
+            config('SUPABASE_API_KEY'),
+            options=_options(AsyncClientOptions)
+        )
+        # Another task of this loop may have created one meanwhile
+        client = _async_clients.setdefault(loop, client)
+    return client
+
+
+def set_supabase_client(client, async_client=None):
+    """
+    Make every caller use ``client`` (None restores the real client).
+
+    Without ``async_client`` a fake's async view of the same data is used.
     """
-    url: str = config('SUPABASE_PROJECT_URL')
-    key: str = config('SUPABASE_API_KEY')
-    supabase_client: Client = create_client(url, key)
-    return supabase_client
\ No newline at end of file
+    global _override, _async_override
+    if async_client is None and hasattr(client, 'as_async'):
+        async_client = client.as_async()
+    _override = client
+    _async_override = async_client
+
+
+@contextmanager
+def override_supabase_client(client, async_client=None):
+    global _override, _async_override
+    previous = (_override, _async_override)
+    set_supabase_client(client, async_client)
+    try:
+        yield client
+    finally:
+        _override, _async_override = previous
+
+
+def reset_supabase_clients():
+    """Drop the shared clients; the next call creates new ones"""
+    global _client
+    with _lock:
+        client, _client = _client, None
+        _async_clients.clear()
+    postgrest = getattr(client, '_postgrest', None)
+    if postgrest is not None:
+        postgrest.aclose()
@@ -0,0 +1,181 @@
+# In-memory stand-in for the Supabase client
+"""
+FakeSupabaseClient implements the table query builder subset used in this
+project (select/insert/upsert/update/delete with eq, neq, in_, order, limit
+and single) plus ``rpc`` on registered Python functions, against tables held
+in memory. ``as_async()`` returns a view of the same tables whose
+``execute()`` is awaitable, matching the async client.
+"""
+import copy
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+
+@dataclass
+class FakeResponse:
+    data: Any
+    count: Optional[int] = None
+
+
+@dataclass
+class _Filter:
+    column: str
+    test: Any
+
+    def __call__(self, row):
+        return self.test(row.get(self.column))
+
+
+@dataclass
+class _Query:
+    client: 'FakeSupabaseClient'
+    table: str
+    action: str = 'select'
+    values: Any = None
+    count: Optional[str] = None
+    on_conflict: str = 'id'
+    filters: list = field(default_factory=list)
+    ordering: list = field(default_factory=list)
+    row_limit: Optional[int] = None
+    single_row: bool = False
+
+    def select(self, *columns, count=None):
+        self.action, self.count = 'select', count
+        return self
+
+    def insert(self, values, **kwargs):
+        self.action, self.values = 'insert', values
+        return self
+
+    def upsert(self, values, on_conflict='id', **kwargs):
+        self.action, self.values, self.on_conflict = 'upsert', values, on_conflict
+        return self
+
+    def update(self, values, **kwargs):
+        self.action, self.values = 'update', values
+        return self
+
+    def delete(self, **kwargs):
+        self.action = 'delete'
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(_Filter(column, lambda v: v == value))
+        return self
+
+    def neq(self, column, value):
+        self.filters.append(_Filter(column, lambda v: v != value))
+        return self
+
+    def in_(self, column, values):
+        values = list(values)
+        self.filters.append(_Filter(column, lambda v: v in values))
+        return self
+
+    def order(self, column, desc=False, **kwargs):
+        self.ordering.append((column, desc))
+        return self
+
+    def limit(self, size, **kwargs):
+        self.row_limit = size
+        return self
+
+    def single(self):
+        self.single_row = True
+        return self
+
+    def _matches(self, row):
+        return all(test(row) for test in self.filters)
+
+    def execute(self):
+        rows = self.client.tables.setdefault(self.table, [])
+
+        if self.action in ('insert', 'upsert'):
+            new_rows = self.values if isinstance(self.values, list) else [self.values]
+            result = []
+            for values in new_rows:
+                row = {**copy.deepcopy(values)}
+                if 'id' not in row:
+                    row['id'] = max((r['id'] for r in rows if isinstance(r.get('id'), int)), default=0) + 1
+                existing = next(
+                    (r for r in rows if self.action == 'upsert' and r.get(self.on_conflict) == row.get(self.on_conflict)),
+                    None
+                )
+                if existing is not None:
+                    existing.update(row)
+                    row = existing
+                else:
+                    rows.append(row)
+                result.append(copy.deepcopy(row))
+            return FakeResponse(result)
+
+        matched = [row for row in rows if self._matches(row)]
+        if self.action == 'update':
+            for row in matched:
+                row.update(copy.deepcopy(self.values))
+        elif self.action == 'delete':
+            self.client.tables[self.table] = [row for row in rows if not self._matches(row)]
+
+        total = len(matched)
+        for column, desc in reversed(self.ordering):
+            matched.sort(key=lambda row: (row.get(column) is None, row.get(column)), reverse=desc)
+        if self.row_limit is not None:
+            matched = matched[:self.row_limit]
+        data = copy.deepcopy(matched)
+        if self.single_row:
+            data = data[0] if data else None
+        return FakeResponse(data, total if self.count else None)
+
+
+class _AsyncQuery(_Query):
+    async def execute(self):
+        return _Query.execute(self)
+
+
+@dataclass
+class _Call:
+    client: 'FakeSupabaseClient'
+    fn: str
+    params: dict
+
+    def execute(self):
+        if self.fn not in self.client.functions:
+            raise LookupError(f'Function {self.fn} is not registered on the fake client')
+        return FakeResponse(self.client.functions[self.fn](self.client, **self.params))
+
+
+class _AsyncCall(_Call):
+    async def execute(self):
+        return _Call.execute(self)
+
+
+class FakeSupabaseClient:
+    def __init__(self, tables=None, functions=None):
+        self.tables = {name: [dict(row) for row in rows] for name, rows in (tables or {}).items()}
+        self.functions = dict(functions or {})
+
+    def table(self, name):
+        return _Query(self, name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None, **kwargs):
+        return _Call(self, fn, params or {})
+
+    def as_async(self):
+        return FakeAsyncSupabaseClient(self)
+
+
+class FakeAsyncSupabaseClient:
+    """Async view of a FakeSupabaseClient's tables"""
+
+    def __init__(self, sync_client):
+        self.sync_client = sync_client
+
+    def table(self, name):
+        return _AsyncQuery(self.sync_client, name)
+
+    from_ = table
+
+    def rpc(self, fn, params=None, **kwargs):
+        return _AsyncCall(self.sync_client, fn, params or {})